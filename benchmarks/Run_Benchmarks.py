@@ -0,0 +1,244 @@
+"""Benchmarks the genre hot paths on synthetic libraries.
+
+This module times the genre normalization, deduplication, track genre
+lookup and genre grouping stages on synthetic libraries of increasing size
+(see benchmarks/Synthetic_Library.py) and reports the throughput and peak
+memory of each stage. It runs entirely offline: every artist is cached in
+memory, the genre indexes live in a temporary directory and are never
+saved, and nothing in data/ is read or written. Compare the output before and after a change to
+see whether it made a stage faster or slower.
+
+Usage:
+    python -m benchmarks.Run_Benchmarks
+    python -m benchmarks.Run_Benchmarks --sizes 1000 10000 100000 1000000 --json results.json
+"""
+
+import argparse
+import gc
+import json
+import os
+import platform
+import tempfile
+import time
+import tracemalloc
+from typing import Dict, List, Any, Callable, NamedTuple, Optional, Sequence
+from benchmarks.Synthetic_Library import SyntheticLibrary, generate_library
+from model.Genre_Tools import (
+    normalize_genre,
+    normalize_genres_batch,
+    deduplicate_hyphen_genres,
+    refresh_normalized_genres,
+    get_track_genres,
+    ArtistGenreResolver
+)
+from model.Genre_Rules import get_genre_rules
+from model.Genre_Index import GenreIndex
+from model.Genre_Matrix import TrackGenreMatrix
+from model.Playlist_Tools import process_tracks_batch_optimized
+
+# Playlist sizes benchmarked by default; 1000000 is supported but takes a few minutes
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+# Directory for the benchmark genre indexes, which are never saved, removed on exit
+_index_directory = tempfile.TemporaryDirectory(prefix='genre_index_benchmark_')
+
+
+class Stage(NamedTuple):
+    """A benchmarked stage.
+
+    Attributes:
+        name: Stage name.
+        unit: What the stage processes, e.g. "tracks".
+        setup: Called before each run with the library; returns the argument for run.
+        run: Runs the stage on setup's result and returns the number of items processed.
+    """
+    name: str
+    unit: str
+    setup: Callable[[SyntheticLibrary], Any]
+    run: Callable[[Any], int]
+
+
+def _cold_genres(library: SyntheticLibrary) -> List[str]:
+    """Get the library's distinct artist genres with the normalize_genre memo cleared."""
+    get_genre_rules().normalize.cache_clear()
+    return list(dict.fromkeys(genre for entry in library.artist_cache.values() for genre in entry['genres']))
+
+def _artist_genre_lists(library: SyntheticLibrary) -> List[List[str]]:
+    get_genre_rules().normalize.cache_clear()
+    return [entry['genres'] for entry in library.artist_cache.values()]
+
+def _stale_cache(library: SyntheticLibrary) -> Dict[str, Any]:
+    """Get a copy of the artist cache without precomputed normalized genres."""
+    get_genre_rules().normalize.cache_clear()
+    return {artist_id: entry.copy() for artist_id, entry in library.artist_cache.items()}
+
+def _run_normalize_genre(genres: List[str]) -> int:
+    for genre in genres:
+        normalize_genre(genre)
+    return len(genres)
+
+def _run_normalize_genres_batch(genre_lists: List[List[str]]) -> int:
+    normalize_genres_batch(genre_lists)
+    return len(genre_lists)
+
+def _run_deduplicate_hyphen_genres(genre_lists: List[List[str]]) -> int:
+    for genres in genre_lists:
+        deduplicate_hyphen_genres(genres)
+    return len(genre_lists)
+
+def _run_refresh_normalized_genres(artist_cache: Dict[str, Any]) -> int:
+    refresh_normalized_genres(artist_cache)
+    return len(artist_cache)
+
+def _run_get_track_genres(library: SyntheticLibrary) -> int:
+    for track in library.tracks:
+        get_track_genres(track, library.artist_cache)
+    return len(library.tracks)
+
+def _run_resolver(library: SyntheticLibrary) -> int:
+    resolver = ArtistGenreResolver(library.artist_cache)
+    for track in library.tracks:
+        resolver.track_genres(track)
+    return len(library.tracks)
+
+def _run_process_tracks_batch_optimized(library: SyntheticLibrary) -> int:
+    process_tracks_batch_optimized(library.tracks, library.artist_cache)
+    return len(library.tracks)
+
+def _fresh_index(library: SyntheticLibrary) -> Any:
+    return library, GenreIndex(os.path.join(_index_directory.name, 'genre_index.json'))
+
+def _synced_index(library: SyntheticLibrary) -> Any:
+    library, index = _fresh_index(library)
+    index.sync_playlist('benchmark', library.tracks, library.artist_cache)
+    return library, index
+
+def _run_create_genre_playlists(arguments: Any) -> int:
+    # The body of create_genre_playlists() after fetching the playlist
+    library, index = arguments
+    index.sync_playlist('benchmark', library.tracks, library.artist_cache)
+    index.genre_tracks('benchmark')
+    return len(library.tracks)
+
+def _run_track_genre_matrix(library: SyntheticLibrary) -> int:
+    TrackGenreMatrix.from_tracks(library.tracks, library.artist_cache, normalized=True).ranking()
+    return len(library.tracks)
+
+STAGES: List[Stage] = [
+    Stage('normalize_genre (cold)', 'genres', _cold_genres, _run_normalize_genre),
+    Stage('normalize_genres_batch', 'artists', _artist_genre_lists, _run_normalize_genres_batch),
+    Stage('deduplicate_hyphen_genres', 'artists', _artist_genre_lists, _run_deduplicate_hyphen_genres),
+    Stage('refresh_normalized_genres', 'artists', _stale_cache, _run_refresh_normalized_genres),
+    Stage('get_track_genres', 'tracks', lambda library: library, _run_get_track_genres),
+    Stage('ArtistGenreResolver', 'tracks', lambda library: library, _run_resolver),
+    Stage('process_tracks_batch_optimized', 'tracks', lambda library: library, _run_process_tracks_batch_optimized),
+    Stage('create_genre_playlists (cold index)', 'tracks', _fresh_index, _run_create_genre_playlists),
+    Stage('create_genre_playlists (warm index)', 'tracks', _synced_index, _run_create_genre_playlists),
+    Stage('TrackGenreMatrix ranking', 'tracks', lambda library: library, _run_track_genre_matrix),
+]
+
+
+def run_stage(stage: Stage, library: SyntheticLibrary, repeat: int = 3, measure_memory: bool = True) -> Dict[str, Any]:
+    """Benchmark a stage on a library.
+
+    The stage is timed repeat times without tracing and the fastest run is
+    kept; peak memory is measured in one extra run under tracemalloc, which
+    slows it down too much to time.
+
+    Args:
+        stage: The stage to run.
+        library: The library to run it on.
+        repeat: Number of timed runs. Defaults to 3.
+        measure_memory: Whether to measure peak memory. Defaults to True.
+
+    Returns:
+        Dictionary with the stage name, items processed, best time in seconds,
+        items per second and peak memory in MiB (None if not measured).
+    """
+    best: Optional[float] = None
+    items = 0
+    for _ in range(repeat):
+        argument = stage.setup(library)
+        gc.collect()
+        start = time.perf_counter()
+        items = stage.run(argument)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    peak_mib = None
+    if measure_memory:
+        argument = stage.setup(library)
+        gc.collect()
+        tracemalloc.start()
+        try:
+            stage.run(argument)
+            peak_mib = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+    return {
+        'stage': stage.name,
+        'unit': stage.unit,
+        'items': items,
+        'seconds': best,
+        'items_per_second': items / best if best else None,
+        'peak_mib': peak_mib
+    }
+
+def run_benchmarks(sizes: Sequence[int] = DEFAULT_SIZES, stages: Optional[Sequence[str]] = None,
+                   repeat: int = 3, measure_memory: bool = True, seed: int = 0) -> List[Dict[str, Any]]:
+    """Benchmark stages on synthetic libraries of several sizes, printing each result.
+
+    Args:
+        sizes: Playlist sizes in tracks. Defaults to DEFAULT_SIZES.
+        stages: Names of the stages to run, matched as substrings. Defaults to all.
+        repeat: Number of timed runs per stage. Defaults to 3.
+        measure_memory: Whether to measure peak memory. Defaults to True.
+        seed: Random seed of the synthetic libraries. Defaults to 0.
+
+    Returns:
+        List of results as returned by run_stage(), with the playlist size added.
+    """
+    selected = [
+        stage for stage in STAGES
+        if not stages or any(name.lower() in stage.name.lower() for name in stages)
+    ]
+    results = []
+    for size in sizes:
+        start = time.perf_counter()
+        library = generate_library(size, seed=seed)
+        print(f"\n📚 {size} tracks, {len(library.artist_cache)} artists "
+              f"(generated in {time.perf_counter() - start:.1f}s)")
+        print(f"   {'Stage':<38} {'Items':>9} {'Seconds':>9} {'Items/s':>12} {'Peak MiB':>9}")
+        for stage in selected:
+            result = run_stage(stage, library, repeat=repeat, measure_memory=measure_memory)
+            result['tracks'] = size
+            results.append(result)
+            peak = '-' if result['peak_mib'] is None else f"{result['peak_mib']:.1f}"
+            rate = '-' if result['items_per_second'] is None else f"{result['items_per_second']:,.0f}"
+            print(f"   {result['stage']:<38} {result['items']:>9} {result['seconds']:>9.3f} {rate:>12} {peak:>9}")
+        del library
+        gc.collect()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the genre hot paths on synthetic libraries.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="playlist sizes in tracks (default: %(default)s)")
+    parser.add_argument('--stages', nargs='+', help="only run stages whose names contain one of these")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per stage (default: %(default)s)")
+    parser.add_argument('--no-memory', action='store_true', help="skip the peak memory measurement")
+    parser.add_argument('--seed', type=int, default=0, help="random seed (default: %(default)s)")
+    parser.add_argument('--json', help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    print("⏱️  Genre Benchmarks")
+    print("=" * 60)
+    print(f"Python {platform.python_version()} on {platform.platform()}")
+    results = run_benchmarks(args.sizes, args.stages, repeat=args.repeat,
+                             measure_memory=not args.no_memory, seed=args.seed)
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump({'python': platform.python_version(), 'results': results}, f, indent=2)
+        print(f"\n✅ Results written to {args.json}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Deterministic synthetic music libraries for the benchmarks.
+
+This module generates an artist cache and a source playlist of any size
+without touching Spotify, Wikipedia or the files in data/. Genres are drawn
+from the genre rules plus generated compound and hyphenated variants, with
+Zipf-distributed popularity, and tracks are drawn from Zipf-distributed
+artist popularity, so a few genres and artists cover most tracks like in a
+real library. The same size and seed always produce the same library.
+"""
+
+import random
+from itertools import accumulate
+from typing import Dict, List, Any, NamedTuple
+from model.Artist_Record import ArtistRecord, SOURCE_SPOTIFY, SOURCE_WIKIDATA
+from model.Genre_Rules import get_genre_rules
+
+# Average number of tracks per artist in the playlist
+TRACKS_PER_ARTIST = 8
+
+# Number of distinct raw genres, before hyphenated and cased variants
+GENRE_COUNT = 3000
+
+# Words combined with rule values into compound genres, e.g. "swedish death metal"
+GENRE_PREFIXES = ['indie', 'alternative', 'experimental', 'modern', 'classic', 'dark', 'progressive',
+                  'swedish', 'brazilian', 'japanese', 'german', 'uk', 'la', 'chill', 'deep', 'neo']
+GENRE_BASES = ['pop', 'rock', 'metal', 'jazz', 'folk', 'house', 'techno', 'hip hop', 'rap', 'soul',
+               'punk', 'emo', 'trap', 'ambient', 'r&b', 'funk', 'country', 'blues', 'disco', 'samba']
+
+# Artist countries and their weights; None is an artist without a known country
+COUNTRIES = [None, 'United States', 'United Kingdom', 'Brazil', 'Japan', 'Sweden', 'Norway',
+             'Germany', 'France', 'Kingdom of Denmark', 'Finland', 'Canada']
+COUNTRY_WEIGHTS = [40, 20, 8, 6, 6, 3, 2, 4, 3, 1, 1, 6]
+
+# Number of artists per track and their weights
+ARTISTS_PER_TRACK = [1, 2, 3, 4]
+ARTISTS_PER_TRACK_WEIGHTS = [75, 18, 5, 2]
+
+# Number of genres per artist and their weights; artists without genres are common
+GENRES_PER_ARTIST = [0, 1, 2, 3, 4, 5, 6, 8]
+GENRES_PER_ARTIST_WEIGHTS = [12, 14, 18, 18, 14, 10, 8, 6]
+
+
+class SyntheticLibrary(NamedTuple):
+    """A generated artist cache and source playlist.
+
+    Attributes:
+        artist_cache: Dictionary mapping artist IDs to cache entries.
+        tracks: Playlist items, shaped like those returned by get_playlist_tracks().
+        genres: Distinct raw genres, most popular first.
+    """
+    artist_cache: Dict[str, ArtistRecord]
+    tracks: List[Dict[str, Any]]
+    genres: List[str]
+
+
+def _spotify_id(prefix: str, number: int) -> str:
+    """Make a 22 character ID like Spotify's, unique per prefix and number."""
+    return f"{prefix}{number:0{22 - len(prefix)}d}"
+
+def _zipf_weights(count: int, exponent: float = 1.1) -> List[float]:
+    """Get the cumulative weights of a Zipf distribution over count ranks."""
+    return list(accumulate(1.0 / (rank ** exponent) for rank in range(1, count + 1)))
+
+def generate_genres(rng: random.Random, count: int = GENRE_COUNT) -> List[str]:
+    """Generate distinct raw genres, as Spotify and Wikipedia report them.
+
+    Args:
+        rng: Random number generator.
+        count: Number of genres to generate.
+
+    Returns:
+        List of genres in random order, including rule values, compound genres
+        and variants that differ only by hyphens or case.
+    """
+    rules = get_genre_rules()
+    genres = dict.fromkeys(list(rules.genre_mappings) + [
+        value for table in (rules.genre_mappings, rules.special_cases) for values in table.values() for value in values
+    ] + GENRE_BASES)
+    while len(genres) < count:
+        genre = f"{rng.choice(GENRE_PREFIXES)} {rng.choice(GENRE_BASES)}"
+        if rng.random() < 0.3:
+            genre = f"{rng.choice(GENRE_PREFIXES)} {genre}"
+        variant = rng.random()
+        if variant < 0.05:
+            genre = genre.replace(' ', '-')
+        elif variant < 0.08:
+            genre = genre.title()
+        elif variant < 0.1:
+            genre += ' music'
+        genres[genre] = None
+    genres = list(genres)[:count]
+    rng.shuffle(genres)
+    return genres
+
+def generate_library(num_tracks: int, seed: int = 0) -> SyntheticLibrary:
+    """Generate a library with a playlist of a given size.
+
+    Args:
+        num_tracks: Number of tracks in the playlist.
+        seed: Random seed. Defaults to 0.
+
+    Returns:
+        The generated library. Every artist of every track is cached, so no
+        code path needs to fetch an artist from Spotify.
+    """
+    rng = random.Random(seed)
+    genres = generate_genres(rng)
+    genre_weights = _zipf_weights(len(genres))
+
+    num_artists = max(1, num_tracks // TRACKS_PER_ARTIST)
+    artist_cache: Dict[str, ArtistRecord] = {}
+    artist_ids = []
+    for number in range(num_artists):
+        artist_id = _spotify_id('a', number)
+        genre_count = rng.choices(GENRES_PER_ARTIST, GENRES_PER_ARTIST_WEIGHTS)[0]
+        artist_genres = list(dict.fromkeys(rng.choices(genres, cum_weights=genre_weights, k=genre_count)))
+        entry = ArtistRecord(
+            name=f"Artist {number}",
+            genres=artist_genres,
+            country=rng.choices(COUNTRIES, COUNTRY_WEIGHTS)[0]
+        )
+        entry.mark_fetched(SOURCE_SPOTIFY, SOURCE_WIKIDATA)
+        artist_cache[artist_id] = entry
+        artist_ids.append(artist_id)
+
+    artist_weights = _zipf_weights(num_artists, exponent=0.8)
+    tracks = []
+    for number in range(num_tracks):
+        artist_count = min(rng.choices(ARTISTS_PER_TRACK, ARTISTS_PER_TRACK_WEIGHTS)[0], num_artists)
+        track_artist_ids = dict.fromkeys(rng.choices(artist_ids, cum_weights=artist_weights, k=artist_count))
+        tracks.append({'track': {
+            'id': _spotify_id('t', number),
+            'name': f"Track {number}",
+            'artists': [{'id': artist_id, 'name': artist_cache[artist_id]['name']} for artist_id in track_artist_ids]
+        }})
+    return SyntheticLibrary(artist_cache, tracks, genres)
@@ -14,7 +14,8 @@ This script allows you to:
 
 from typing import Dict, List, Any
 from model.Artist_Genres import load_custom_genres, save_custom_genres, search_artist_by_name
-from model.Genre_Tools import get_artist_name_from_cache, load_artist_cache, normalize_genre
+from model.Genre_Tools import get_artist_name_from_cache, normalize_genres_batch
+from model.Artist_Cache import shared_artist_cache
 from model.spotify_client import sp
 
 def get_artist_by_id(artist_id: str) -> Dict[str, Any]:
@@ -26,15 +27,15 @@ def get_artist_by_id(artist_id: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing artist data, or empty dict if not found.
     """
-    # First try to get from cache
-    artist_cache = load_artist_cache()
-    cached_name = artist_cache.get(artist_id, {}).get('name')
+    # First try to get from the shared in-memory cache
+    cached_entry = shared_artist_cache.get(artist_id, {})
+    cached_name = cached_entry.get('name')
     
     if cached_name:
         return {
             'id': artist_id,
             'name': cached_name,
-            'genres': artist_cache.get(artist_id, {}).get('genres', [])
+            'genres': cached_entry.get('genres', [])
         }
     
     # Fallback to Spotify API
@@ -55,15 +56,8 @@ def add_artist_custom_genres(artist_id: str, artist_name: str, genres: List[str]
     # Load existing custom genres
     custom_genres = load_custom_genres()
     
-    # Normalize genres using the core normalize_genre function
-    normalized_genres = []
-    for genre in genres:
-        normalized = normalize_genre(genre)
-        if normalized:  # Only add if normalization returned results
-            normalized_genres.extend(normalized)
-    
-    # Remove duplicates while preserving order
-    normalized_genres = list(dict.fromkeys(normalized_genres))
+    # Normalize and deduplicate genres using the core normalization
+    normalized_genres = normalize_genres_batch([genres])[0]
     
     # Add or update the artist
     custom_genres[artist_id] = {
@@ -6,17 +6,19 @@ and speed up genre-based operations. Updates and saves the artist cache
 for use by other scripts.
 """
 
-from typing import Dict, List, Set, Any
+from typing import Dict, List, Set, Any, Optional
 from model.spotify_client import sp, get_tracks_batch, get_artists_batch
-from model.Genre_Tools import load_artist_cache, save_artist_cache, get_artist_genres, normalize_genre, deduplicate_hyphen_genres
-from model.Playlist_Tools import get_playlist_track_ids, RateLimiter, format_time
+from model.spotify_async import use_async_client, fetch_tracks_by_id, fetch_artists_by_id
+from model.Genre_Tools import load_artist_cache, save_artist_cache, get_artist_genres, normalize_genres_batch, tag_artist_entries
+from model.Artist_Record import ArtistRecord, SOURCE_SPOTIFY, SOURCE_WIKIPEDIA, SOURCE_WIKIDATA
+from model.Playlist_Tools import get_playlist_track_ids, format_time
 import time
-from model.config import PLAYLIST_ID, REQUESTS_PER_SECOND
+from model.settings import require_setting
 from datetime import timedelta
 from tqdm import tqdm
 from model.WikipediaAPI import get_artist_country_wikidata, get_artist_genres as get_wikipedia_genres
 
-def cache_artist_genres(playlist_id: str, progress_callback=None) -> None:
+def cache_artist_genres(playlist_id: str, progress_callback=None, use_async: Optional[bool] = None) -> None:
     """Cache genres for all artists in a playlist.
     
     Uses existing cache and updates it with new artist data.
@@ -25,10 +27,12 @@ def cache_artist_genres(playlist_id: str, progress_callback=None) -> None:
     Args:
         playlist_id: The Spotify playlist ID to cache artists from.
         progress_callback: Optional callback function to report progress.
+        use_async: Whether to fetch tracks and artists with the async client,
+            several batches at a time. Defaults to the SPOTIFY_ASYNC setting.
     """
-    # Initialize rate limiter using config value
-    rate_limiter = RateLimiter(requests_per_second=REQUESTS_PER_SECOND)
-    
+    if use_async is None:
+        use_async = use_async_client()
+
     # Load existing cache
     artist_cache: Dict[str, Dict[str, Any]] = load_artist_cache()
     cache_hits: int = 0
@@ -48,28 +52,32 @@ def cache_artist_genres(playlist_id: str, progress_callback=None) -> None:
     # Convert to list for batch processing
     track_ids_list = list(track_ids)
     
-    # Process tracks in batches of 50 (Spotify API limit)
-    for i in tqdm(range(0, len(track_ids_list), 50), desc="Processing track batches"):
-        batch_track_ids = track_ids_list[i:i + 50]
-        try:
-            tracks = sp.tracks(batch_track_ids)
-            for track in tracks['tracks']:
-                if track:  # Check if track exists
-                    for artist in track['artists']:
-                        artist_ids.add(artist['id'])
-            rate_limiter.wait()
-        except Exception as e:
-            print(f"\nError getting batch of tracks: {str(e)}")
-            # Fallback to individual requests
-            for track_id in batch_track_ids:
-                try:
-                    track = sp.track(track_id)
-                    for artist in track['artists']:
-                        artist_ids.add(artist['id'])
-                    rate_limiter.wait()
-                except Exception as e2:
-                    print(f"Error getting track {track_id}: {str(e2)}")
-                    continue
+    if use_async:
+        # Fetch the track batches concurrently
+        for track in fetch_tracks_by_id(track_ids_list).values():
+            for artist in track['artists']:
+                artist_ids.add(artist['id'])
+    else:
+        # Process tracks in batches of 50 (Spotify API limit)
+        for i in tqdm(range(0, len(track_ids_list), 50), desc="Processing track batches"):
+            batch_track_ids = track_ids_list[i:i + 50]
+            try:
+                tracks = sp.tracks(batch_track_ids)
+                for track in tracks['tracks']:
+                    if track:  # Check if track exists
+                        for artist in track['artists']:
+                            artist_ids.add(artist['id'])
+            except Exception as e:
+                print(f"\nError getting batch of tracks: {str(e)}")
+                # Fallback to individual requests
+                for track_id in batch_track_ids:
+                    try:
+                        track = sp.track(track_id)
+                        for artist in track['artists']:
+                            artist_ids.add(artist['id'])
+                    except Exception as e2:
+                        print(f"Error getting track {track_id}: {str(e2)}")
+                        continue
     
     total_artists = len(artist_ids)
     print(f"\nFound {total_artists} unique artists")
@@ -86,46 +94,43 @@ def cache_artist_genres(playlist_id: str, progress_callback=None) -> None:
     total_batches = len(uncached_artist_ids)
     if uncached_artist_ids:
         print("\nCaching artist genres using batch requests...")
+        # Fetch the artist batches concurrently up front
+        prefetched_artists = fetch_artists_by_id(uncached_artist_ids) if use_async else None
         
         for i in tqdm(range(0, len(uncached_artist_ids), batch_size), desc="Caching artist batches"):
             batch_artist_ids = uncached_artist_ids[i:i + batch_size]
             try:
-                artists = sp.artists(batch_artist_ids)
+                if prefetched_artists is not None:
+                    found_artists = [prefetched_artists[aid] for aid in batch_artist_ids if aid in prefetched_artists]
+                else:
+                    artists = sp.artists(batch_artist_ids)
+                    found_artists = [artist for artist in artists['artists'] if artist]  # Check if artist exists
                 
-                for artist in artists['artists']:
-                    if artist:  # Check if artist exists
-                        artist_id = artist['id']
-                        artist_name = artist['name']
-                        genres = artist['genres']
-                        # Fetch Wikipedia genres and combine
-                        wikipedia_genres = get_wikipedia_genres(artist_name) or []
-                        # Combine and deduplicate
-                        all_genres = list(dict.fromkeys(genres + wikipedia_genres))
-                        # Apply normalize_genre to each genre and flatten
-                        normalized = []
-                        for g in all_genres:
-                            normalized.extend(normalize_genre(g))
-                        # Remove duplicates while preserving order
-                        all_genres = list(dict.fromkeys(normalized))
-                        # Get country from Wikidata
-                        country = get_artist_country_wikidata(artist_name)
-                        # Add national level genres based on country
-                        if country:
-                            if 'Brazil' in country:
-                                all_genres.append('brazilian music')
-                            elif 'Japan' in country:
-                                all_genres.append('Japanese Music')
-                        # Deduplicate hyphen genres before saving
-                        all_genres = deduplicate_hyphen_genres(all_genres)
-                        # Update cache with name, genres, and country
-                        artist_cache[artist_id] = {
-                            'name': artist_name,
-                            'genres': all_genres,
-                            'country': country
-                        }
-                        cache_misses += 1
+                # Fetch Wikipedia genres and combine with the Spotify genres
+                raw_genre_lists = []
+                for artist in found_artists:
+                    wikipedia_genres = get_wikipedia_genres(artist['name']) or []
+                    raw_genre_lists.append(artist['genres'] + wikipedia_genres)
+                # Normalize the whole batch at once, each unique genre only once
+                normalized_genre_lists = normalize_genres_batch(raw_genre_lists)
                 
-                rate_limiter.wait()
+                batch_entries: Dict[str, ArtistRecord] = {}
+                for artist, all_genres in zip(found_artists, normalized_genre_lists):
+                    artist_name = artist['name']
+                    # Get country from Wikidata
+                    country = get_artist_country_wikidata(artist_name)
+                    batch_entries[artist['id']] = ArtistRecord(
+                        name=artist_name,
+                        genres=all_genres,
+                        country=country
+                    )
+                # Add national level genres for the whole batch and deduplicate hyphen genres
+                tag_artist_entries(batch_entries)
+                # Update cache with name, genres, and country
+                for artist_id, entry in batch_entries.items():
+                    entry.mark_fetched(SOURCE_SPOTIFY, SOURCE_WIKIPEDIA, SOURCE_WIKIDATA)
+                    artist_cache[artist_id] = entry
+                    cache_misses += 1
                 
                 # Save cache periodically and print progress
                 if cache_misses % 50 == 0:
@@ -146,40 +151,31 @@ def cache_artist_genres(playlist_id: str, progress_callback=None) -> None:
             except Exception as e:
                 print(f"\nError getting batch of artists: {str(e)}")
                 # Fallback to individual requests for failed batch
+                fallback_entries: Dict[str, ArtistRecord] = {}
                 for artist_id in batch_artist_ids:
                     try:
                         genres = get_artist_genres(artist_id, artist_cache)
                         # Fetch Wikipedia genres and combine
                         artist_name = sp.artist(artist_id)['name']
                         wikipedia_genres = get_wikipedia_genres(artist_name) or []
-                        all_genres = list(dict.fromkeys(genres + wikipedia_genres))
-                        # Apply normalize_genre to each genre and flatten
-                        normalized = []
-                        for g in all_genres:
-                            normalized.extend(normalize_genre(g))
-                        # Remove duplicates while preserving order
-                        all_genres = list(dict.fromkeys(normalized))
+                        all_genres = normalize_genres_batch([genres + wikipedia_genres])[0]
                         # Get country from Wikidata
                         country = get_artist_country_wikidata(artist_name)
-                        # Add national level genres based on country
-                        if country:
-                            if 'Brazil' in country:
-                                all_genres.append('brazilian music')
-                            elif 'Japan' in country:
-                                all_genres.append('Japanese Music')
-                        # Deduplicate hyphen genres before saving
-                        all_genres = deduplicate_hyphen_genres(all_genres)
-                        # Update cache with name, genres, and country
-                        artist_cache[artist_id] = {
-                            'name': artist_name,
-                            'genres': all_genres,
-                            'country': country
-                        }
-                        cache_misses += 1
-                        rate_limiter.wait()
+                        fallback_entries[artist_id] = ArtistRecord(
+                            name=artist_name,
+                            genres=all_genres,
+                            country=country
+                        )
                     except Exception as e2:
                         print(f"Error getting artist {artist_id}: {str(e2)}")
                         continue
+                # Add national level genres for the artists found and deduplicate hyphen genres
+                tag_artist_entries(fallback_entries)
+                # Update cache with name, genres, and country
+                for artist_id, entry in fallback_entries.items():
+                    entry.mark_fetched(SOURCE_SPOTIFY, SOURCE_WIKIPEDIA, SOURCE_WIKIDATA)
+                    artist_cache[artist_id] = entry
+                    cache_misses += 1
     
     # Save final cache
     save_artist_cache(artist_cache)
@@ -203,11 +199,11 @@ def main(playlist_id: str = None, progress_callback=None):
     """
     # Use provided playlist_id or fall back to config
     if playlist_id is None:
-        playlist_id = PLAYLIST_ID
+        playlist_id = require_setting('PLAYLIST_ID')
     
     print("\U0001F3B5 Artist Cacher")
     print("=" * 60)
     cache_artist_genres(playlist_id, progress_callback=progress_callback)
 
 if __name__ == "__main__":
-    cache_artist_genres(PLAYLIST_ID)
+    cache_artist_genres(require_setting('PLAYLIST_ID'))
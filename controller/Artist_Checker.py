@@ -11,6 +11,7 @@ from model.Playlist_Tools import sp
 from model.spotify_client import get_artist_with_retry
 from model.Genre_Tools import load_artist_cache, save_artist_cache, get_artist_name_from_cache
 from model.Artist_Genres import search_artist_by_name, extract_artist_id_from_url
+from model.Artist_Record import ArtistRecord
 
 # Cache file path
 ARTIST_CACHE_FILE = "data/artist_genre_cache.json"
@@ -27,11 +28,11 @@ def update_tracks_for_artist(artist_id: str, artist_genres: List[str], cache: Di
     artist_name = get_artist_name_from_cache(artist_id, cache)
     
     # Update artist cache with name and genres
-    cache[artist_id] = {
-        'name': artist_name,
-        'genres': artist_genres,
-        'country': cache.get(artist_id, {}).get('country')
-    }
+    cache[artist_id] = ArtistRecord(
+        name=artist_name,
+        genres=artist_genres,
+        country=cache.get(artist_id, {}).get('country')
+    )
     save_artist_cache(cache)
     print(f"\nUpdated cache for artist {artist_name} ({artist_id})")
 
@@ -45,21 +46,20 @@ def print_artist_genres(artist_id: str):
         # Load current cache
         cache = load_artist_cache()
         
-        # Try to get artist name from cache first
-        artist_name = get_artist_name_from_cache(artist_id, cache)
-        
-        # Get artist data from API if not in cache
+        # Get artist data from API if not in cache, otherwise the name from cache
         if artist_id not in cache or not cache[artist_id].get('genres'):
             artist = get_artist_with_retry(artist_id)
             artist_name = artist['name']
             
             # Update cache with artist data
-            cache[artist_id] = {
-                'name': artist_name,
-                'genres': artist.get('genres', []),
-                'country': cache.get(artist_id, {}).get('country')
-            }
+            cache[artist_id] = ArtistRecord(
+                name=artist_name,
+                genres=artist.get('genres', []),
+                country=cache.get(artist_id, {}).get('country')
+            )
             save_artist_cache(cache)
+        else:
+            artist_name = get_artist_name_from_cache(artist_id, cache)
         
         print(f"\nGenres for {artist_name}:")
         
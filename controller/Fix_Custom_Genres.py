@@ -12,11 +12,12 @@ This script:
 
 import time
 from typing import Dict, List, Set, Any
-from model.config import REQUESTS_PER_SECOND, PLAYLIST_ID
+from model.settings import require_setting
 from model.spotify_client import sp
-from model.Playlist_Tools import get_existing_playlists, get_playlist_track_ids, RateLimiter, get_playlist_tracks, find_matching_playlists
-from model.Genre_Tools import normalize_genre, load_artist_cache, save_artist_cache, deduplicate_hyphen_genres
+from model.Playlist_Tools import get_existing_playlists, get_playlist_track_ids, get_playlist_tracks, find_matching_playlists
+from model.Genre_Tools import normalize_genres_batch, normalize_genre_list, load_artist_cache, save_artist_cache, get_artist_normalized_genres, refresh_normalized_genres
 from model.Artist_Genres import load_custom_genres, save_custom_genres
+from model.Artist_Record import ArtistRecord
 
 def fix_custom_genres(progress_callback=None) -> Dict[str, Dict[str, Any]]:
     """Fix existing custom genres by normalizing them using the same logic as other scripts.
@@ -37,23 +38,22 @@ def fix_custom_genres(progress_callback=None) -> Dict[str, Dict[str, Any]]:
     fixed_genres = {}
     total_fixed = 0
     
+    # Normalize every artist's genres in one batch, using the same logic as Artist_Cacher and Update_Cache
+    normalized_by_id = dict(zip(
+        custom_genres,
+        normalize_genres_batch(
+            artist_data['genres'] if isinstance(artist_data, dict) and artist_data.get('genres') else []
+            for artist_data in custom_genres.values()
+        )
+    ))
+    
     for idx, (artist_id, artist_data) in enumerate(custom_genres.items()):
         if isinstance(artist_data, dict) and 'genres' in artist_data:
             raw_genres = artist_data['genres']
             artist_name = artist_data.get('name', f'Artist_{artist_id}')
             
-            # Normalize genres using the same logic as Artist_Cacher and Update_Cache
             if raw_genres:
-                # Apply normalize_genre to each genre and flatten
-                normalized = []
-                for g in raw_genres:
-                    normalized.extend(normalize_genre(g))
-                
-                # Remove duplicates while preserving order
-                normalized_genres = list(dict.fromkeys(normalized))
-                
-                # Deduplicate hyphen genres before saving (same as other scripts)
-                normalized_genres = deduplicate_hyphen_genres(normalized_genres)
+                normalized_genres = normalized_by_id[artist_id]
                 
                 # Check if normalization changed anything
                 if normalized_genres != raw_genres:
@@ -106,35 +106,34 @@ def update_artist_cache_with_fixed_genres(fixed_genres: Dict[str, Dict[str, Any]
             artist_cache[artist_id]['genres'] = custom_genre_list.copy()
         else:
             # Create new entry
-            artist_cache[artist_id] = {
-                'name': fixed_data.get('name', f'Artist_{artist_id}'),
-                'genres': custom_genre_list,
-                'country': None
-            }
+            artist_cache[artist_id] = ArtistRecord(
+                name=fixed_data.get('name', f'Artist_{artist_id}'),
+                genres=custom_genre_list,
+                country=None
+            )
         
         if progress_callback:
             progress_callback((idx + 1) / len(fixed_genres))
     
+    # Store the normalized genres of the updated entries with the cache
+    refresh_normalized_genres(artist_cache)
+    
     # Save updated cache
     save_artist_cache(artist_cache)
     
     print("✅ Updated artist cache with fixed custom genres")
 
-def get_original_playlist_tracks_by_artist(playlist_id: str, rate_limiter: RateLimiter) -> Dict[str, List[str]]:
+def get_original_playlist_tracks_by_artist(playlist_id: str) -> Dict[str, List[str]]:
     """Get all tracks from the original playlist, grouped by artist ID.
     
     Args:
         playlist_id: The Spotify playlist ID to analyze.
-        rate_limiter: Rate limiter instance for API calls.
     
     Returns:
         Dictionary mapping artist IDs to lists of track IDs.
     """
     print("📋 Loading tracks from original playlist...")
     
-    # Apply rate limiting before the first API call
-    rate_limiter.wait()
-    
     # Get all tracks from the original playlist
     tracks = get_playlist_tracks(playlist_id)
     
@@ -153,24 +152,20 @@ def get_original_playlist_tracks_by_artist(playlist_id: str, rate_limiter: RateL
     print(f"📊 Found {len(artist_tracks)} artists in original playlist")
     return artist_tracks
 
-def create_new_playlist(playlist_name: str, track_ids: List[str], rate_limiter: RateLimiter) -> bool:
+def create_new_playlist(playlist_name: str, track_ids: List[str]) -> bool:
     """Create a new playlist and add tracks to it.
     
     Args:
         playlist_name: Name for the new playlist.
         track_ids: List of track IDs to add to the playlist.
-        rate_limiter: Rate limiter instance for API calls.
         
     Returns:
         True if successful, False otherwise.
     """
     try:
-        # Apply rate limiting before API calls
-        rate_limiter.wait()
         user_id = sp.current_user()['id']
         
         # Create the playlist
-        rate_limiter.wait()
         playlist = sp.user_playlist_create(
             user=user_id,
             name=playlist_name,
@@ -183,7 +178,6 @@ def create_new_playlist(playlist_name: str, track_ids: List[str], rate_limiter:
         # Add tracks to playlist in chunks of 50
         for i in range(0, len(track_ids), 50):
             chunk = track_ids[i:i + 50]
-            rate_limiter.wait()
             sp.playlist_add_items(playlist_id, chunk)
         
         print(f"   ➕ Added {len(track_ids)} tracks to '{playlist_name}'")
@@ -203,15 +197,9 @@ def redo_playlist_additions(playlist_id: str, fixed_genres: Dict[str, Dict[str,
     print("\n🎵 Redoing playlist additions with fixed custom genres...")
     print(f"📋 Working with original playlist: {playlist_id}")
     
-    # Initialize rate limiter with more conservative settings
-    # Use 2 requests per second instead of 3 to be safer
-    rate_limiter = RateLimiter(requests_per_second=2.0)
-    
     # Get tracks from original playlist, grouped by artist
-    original_artist_tracks = get_original_playlist_tracks_by_artist(playlist_id, rate_limiter)
+    original_artist_tracks = get_original_playlist_tracks_by_artist(playlist_id)
     
-    # Get existing playlists with rate limiting
-    rate_limiter.wait()
     existing_playlists = get_existing_playlists()
     print(f"📊 Found {len(existing_playlists)} existing playlists")
     
@@ -230,12 +218,14 @@ def redo_playlist_additions(playlist_id: str, fixed_genres: Dict[str, Dict[str,
     # Collect all tracks by normalized genre for potential new playlist creation
     genre_tracks: Dict[str, Set[str]] = {}
     
+    # Artist cache holding the precomputed normalized genres
+    artist_cache = load_artist_cache()
+    
     # Process each artist in batches to avoid overwhelming the API
     total_updates = 0
     artists_processed = 0
     playlists_updated = set()
     batch_size = 5  # Process 5 artists at a time
-    pause_between_batches = 10  # Pause 10 seconds between batches
     
     # Convert to list for batch processing
     artists_list = list(artists_with_genres.items())
@@ -258,11 +248,12 @@ def redo_playlist_additions(playlist_id: str, fixed_genres: Dict[str, Dict[str,
             print(f"   Fixed genres: {', '.join(raw_genres)}")
             print(f"   Tracks in original playlist: {len(artist_tracks)}")
             
-            # Normalize all genres first (for playlist matching)
-            all_normalized_genres = set()
-            for raw_genre in raw_genres:
-                normalized_genres = normalize_genre(raw_genre)
-                all_normalized_genres.update(normalized_genres)
+            # Normalized genres for playlist matching, precomputed in the cache entry
+            cached_entry = artist_cache.get(artist_id)
+            if cached_entry is not None and cached_entry.get('genres') == raw_genres:
+                all_normalized_genres = set(get_artist_normalized_genres(cached_entry))
+            else:
+                all_normalized_genres = set(normalize_genre_list(raw_genres))
             
             print(f"   Normalized for playlists: {', '.join(all_normalized_genres)}")
             
@@ -292,8 +283,7 @@ def redo_playlist_additions(playlist_id: str, fixed_genres: Dict[str, Dict[str,
                         f"Playlist_{playlist_id}"
                     )
                     
-                    # Get existing tracks in playlist with rate limiting
-                    rate_limiter.wait()
+                    # Get existing tracks in playlist
                     existing_tracks = get_playlist_track_ids(playlist_id)
                     
                     # Filter out tracks that already exist
@@ -305,7 +295,6 @@ def redo_playlist_additions(playlist_id: str, fixed_genres: Dict[str, Dict[str,
                         # Add tracks in batches of 50
                         for i in range(0, len(new_tracks), 50):
                             batch = new_tracks[i:i + 50]
-                            rate_limiter.wait()
                             sp.playlist_add_items(playlist_id, batch)
                         
                         total_updates += len(new_tracks)
@@ -319,11 +308,6 @@ def redo_playlist_additions(playlist_id: str, fixed_genres: Dict[str, Dict[str,
             
             artists_processed += 1
         
-        # Pause between batches to avoid overwhelming the API
-        if batch_end < len(artists_list):
-            print(f"\n⏸️  Pausing {pause_between_batches} seconds between batches...")
-            time.sleep(pause_between_batches)
-        
         # Progress update after each batch
         if progress_callback:
             progress_callback((batch_start + batch_size) / len(artists_list))
@@ -346,7 +330,7 @@ def redo_playlist_additions(playlist_id: str, fixed_genres: Dict[str, Dict[str,
                 # Convert set to list for playlist creation
                 track_ids_list = list(track_ids)
                 
-                if create_new_playlist(playlist_name, track_ids_list, rate_limiter):
+                if create_new_playlist(playlist_name, track_ids_list):
                     new_playlists_created += 1
                     total_updates += len(track_ids_list)
             else:
@@ -370,7 +354,7 @@ def main(playlist_id: str = None, progress_callback=None):
     """
     # Use provided playlist_id or fall back to config
     if playlist_id is None:
-        playlist_id = PLAYLIST_ID
+        playlist_id = require_setting('PLAYLIST_ID')
     
     print("\U0001F527 Custom Genre Fixer and Playlist Redo")
     print("=" * 60)
@@ -0,0 +1,177 @@
+"""Finds related genres in a playlist from how often they occur together.
+
+This module computes the genre by genre co-occurrence matrix of a playlist
+as a sparse product of its track by genre matrix with itself, scores every
+co-occurring pair of genres by Jaccard similarity or pointwise mutual
+information (PMI), and prints the most related genres of each genre. Use it
+to decide which genre playlists to split or merge.
+
+Usage:
+    python -m controller.Genre_Analytics
+    python -m controller.Genre_Analytics --metric pmi --top-k 10 --min-tracks 5
+"""
+
+import argparse
+from typing import Dict, List, Any, Tuple
+import numpy as np
+from scipy import sparse
+from model.Playlist_Tools import get_playlist_tracks
+from model.Genre_Tools import get_artist_cache_view
+from model.Genre_Matrix import TrackGenreMatrix
+from model.settings import require_setting
+
+# Supported similarity metrics
+SIMILARITY_METRICS = ('jaccard', 'pmi')
+
+# Related genres: (genre, similarity, shared track count)
+RelatedGenre = Tuple[str, float, int]
+
+
+def genre_cooccurrence(matrix: TrackGenreMatrix) -> sparse.csr_matrix:
+    """Count the tracks shared by every pair of genres.
+
+    Args:
+        matrix: The playlist's track by genre matrix.
+
+    Returns:
+        Symmetric genre by genre CSR matrix of shared track counts; the
+        diagonal holds each genre's own track count.
+    """
+    incidence = matrix.matrix
+    return (incidence.T @ incidence).tocsr()
+
+def _genre_pairs(cooccurrence: sparse.csr_matrix) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Get the co-occurring pairs of distinct genres.
+
+    Returns:
+        Arrays of row genre columns, related genre columns and shared track counts.
+    """
+    pairs = cooccurrence.tocoo()
+    off_diagonal = (pairs.row != pairs.col) & (pairs.data > 0)
+    return pairs.row[off_diagonal], pairs.col[off_diagonal], pairs.data[off_diagonal]
+
+def _similarities(rows: np.ndarray, cols: np.ndarray, shared: np.ndarray, counts: np.ndarray,
+                  total_tracks: int, metric: str) -> np.ndarray:
+    """Score genre pairs from their shared and individual track counts."""
+    shared = shared.astype(np.float64)
+    counts = counts.astype(np.float64)
+    if metric == 'jaccard':
+        return shared / (counts[rows] + counts[cols] - shared)
+    if metric == 'pmi':
+        return np.log2(shared * total_tracks / (counts[rows] * counts[cols]))
+    raise ValueError(f"Unknown similarity metric {metric!r}, expected one of {SIMILARITY_METRICS}")
+
+def genre_similarity(cooccurrence: sparse.csr_matrix, total_tracks: int, metric: str = 'jaccard') -> sparse.csr_matrix:
+    """Score every pair of co-occurring genres.
+
+    Jaccard similarity is the number of shared tracks divided by the number
+    of tracks with either genre. PMI is log2 of how much more often two genres
+    occur together than they would if they were independent; it is positive
+    for genres that attract each other and can be negative.
+
+    Args:
+        cooccurrence: Genre co-occurrence matrix from genre_cooccurrence().
+        total_tracks: Number of tracks in the playlist, used by PMI.
+        metric: 'jaccard' or 'pmi'. Defaults to 'jaccard'.
+
+    Returns:
+        Genre by genre CSR matrix of similarities for pairs of distinct genres
+        that share at least one track.
+
+    Raises:
+        ValueError: If the metric is not supported.
+    """
+    rows, cols, shared = _genre_pairs(cooccurrence)
+    values = _similarities(rows, cols, shared, cooccurrence.diagonal(), total_tracks, metric)
+    return sparse.csr_matrix((values, (rows, cols)), shape=cooccurrence.shape)
+
+def top_related_genres(matrix: TrackGenreMatrix, top_k: int = 10, metric: str = 'jaccard',
+                       min_tracks: int = 3) -> Dict[str, List[RelatedGenre]]:
+    """Find the most related genres of every genre.
+
+    Args:
+        matrix: The playlist's track by genre matrix.
+        top_k: Number of related genres to keep per genre. Defaults to 10.
+        metric: 'jaccard' or 'pmi'. Defaults to 'jaccard'.
+        min_tracks: Genres with fewer tracks are left out, as their scores are
+            mostly noise (especially PMI). Defaults to 3.
+
+    Returns:
+        Dictionary mapping each genre to its related genres, most similar first
+        (ties alphabetically). Genres without related genres are left out.
+
+    Raises:
+        ValueError: If the metric is not supported.
+    """
+    cooccurrence = genre_cooccurrence(matrix)
+    counts = cooccurrence.diagonal()
+    rows, cols, shared = _genre_pairs(cooccurrence)
+    frequent = counts >= min_tracks
+    keep = frequent[rows] & frequent[cols]
+    rows, cols, shared = rows[keep], cols[keep], shared[keep]
+    values = _similarities(rows, cols, shared, counts, len(matrix), metric)
+
+    # Sort each genre's pairs by similarity (descending), ties alphabetically
+    name_ranks = np.empty(len(matrix.genres), dtype=np.int64)
+    name_ranks[sorted(range(len(matrix.genres)), key=matrix.genres.__getitem__)] = np.arange(len(matrix.genres))
+    order = np.lexsort((name_ranks[cols], -values, rows))
+    rows, cols, shared, values = rows[order], cols[order], shared[order], values[order]
+
+    # Each genre's pairs are one slice, of which the first top_k are kept
+    bounds = np.searchsorted(rows, np.arange(len(matrix.genres) + 1))
+    related: Dict[str, List[RelatedGenre]] = {}
+    for row in np.flatnonzero(bounds[1:] > bounds[:-1]):
+        start, end = bounds[row], min(bounds[row + 1], bounds[row] + top_k)
+        related[matrix.genres[row]] = [
+            (matrix.genres[col], float(value), int(count))
+            for col, value, count in zip(cols[start:end], values[start:end], shared[start:end])
+        ]
+    return related
+
+def analyze_playlist_genres(playlist_id: str, top_k: int = 5, metric: str = 'jaccard',
+                            min_tracks: int = 3) -> Dict[str, List[RelatedGenre]]:
+    """Print the most related genres of every genre in a playlist.
+
+    Args:
+        playlist_id: The Spotify playlist ID to analyze.
+        top_k: Number of related genres to print per genre. Defaults to 5.
+        metric: 'jaccard' or 'pmi'. Defaults to 'jaccard'.
+        min_tracks: Genres with fewer tracks are left out. Defaults to 3.
+
+    Returns:
+        Dictionary mapping each genre to its related genres, as returned by
+        top_related_genres().
+    """
+    # Get all tracks from the playlist
+    tracks: List[Dict[str, Any]] = get_playlist_tracks(playlist_id)
+
+    # Build the track by normalized genre matrix
+    print(f"Processing {len(tracks)} tracks with pre-loaded artist cache...")
+    matrix = TrackGenreMatrix.from_tracks(tracks, get_artist_cache_view(), normalized=True)
+    related = top_related_genres(matrix, top_k=top_k, metric=metric, min_tracks=min_tracks)
+
+    # Print genres by frequency, each with its related genres
+    counts = dict(zip(matrix.genres, matrix.genre_counts().tolist()))
+    print(f"\nMost related genres by {metric}:")
+    for genre in sorted(related, key=lambda genre: (-counts[genre], genre)):
+        print(f"- {genre} ({counts[genre]} tracks):")
+        for related_genre, similarity, shared in related[genre]:
+            print(f"    {related_genre}: {similarity:.3f} ({shared} shared tracks)")
+    print(f"\nGenres with related genres: {len(related)}")
+    return related
+
+def main():
+    parser = argparse.ArgumentParser(description="Find genres that often occur together in the playlist.")
+    parser.add_argument('--metric', choices=SIMILARITY_METRICS, default='jaccard',
+                        help="similarity metric (default: %(default)s)")
+    parser.add_argument('--top-k', type=int, default=5,
+                        help="related genres to print per genre (default: %(default)s)")
+    parser.add_argument('--min-tracks', type=int, default=3,
+                        help="leave out genres with fewer tracks (default: %(default)s)")
+    args = parser.parse_args()
+
+    analyze_playlist_genres(require_setting('PLAYLIST_ID'), top_k=args.top_k, metric=args.metric,
+                            min_tracks=args.min_tracks)
+
+if __name__ == "__main__":
+    main()
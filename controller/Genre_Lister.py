@@ -5,16 +5,11 @@ and normalization for efficiency and accuracy. Prints the total number of
 unique genres found.
 """
 
-from typing import Dict, List, Set, Any
-from model.config import REQUESTS_PER_SECOND
-from model.Playlist_Tools import (
-    get_playlist_tracks,
-    get_track_genres,
-    sp,
-    RateLimiter
-)
-from model.Genre_Tools import load_artist_cache, normalize_genre
-from model.config import PLAYLIST_ID
+from typing import Dict, List, Any, Mapping
+from model.Playlist_Tools import get_playlist_tracks
+from model.Genre_Tools import get_artist_cache_view
+from model.Genre_Matrix import TrackGenreMatrix
+from model.settings import require_setting
 
 def list_playlist_genres(playlist_id: str) -> None:
     """List all unique genres found in a playlist with optimized batch processing.
@@ -22,42 +17,24 @@ def list_playlist_genres(playlist_id: str) -> None:
     Args:
         playlist_id: The Spotify playlist ID to analyze for genres.
     """
-    # Initialize rate limiter
-    rate_limiter = RateLimiter(requests_per_second=REQUESTS_PER_SECOND)
-    
     # Get all tracks from the playlist
     tracks: List[Dict[str, Any]] = get_playlist_tracks(playlist_id)
     
-    # Load artist cache for better performance
-    artist_cache: Dict[str, Dict[str, Any]] = load_artist_cache()
+    # Read-only view of the artist cache for better performance
+    artist_cache: Mapping[str, Dict[str, Any]] = get_artist_cache_view()
     
     # Process tracks with pre-loaded cache
     print(f"Processing {len(tracks)} tracks with pre-loaded artist cache...")
 
-    track_genres_map: Dict[str, List[str]] = {}
-    # Step 1: Collect raw genres for all tracks
-    for track in tracks:
-        if track and track['track']:
-            track_id = track['track']['id']
-            raw_genres = get_track_genres(track, artist_cache)
-            track_genres_map[track_id] = raw_genres
-
-    # Step 2: Create a normalization map for all unique raw genres
-    all_raw_genres = set(g for genres in track_genres_map.values() for g in genres)
-    normalization_map = {genre: normalize_genre(genre) for genre in all_raw_genres}
-
-    # Step 3: Collect all unique normalized genres using the map
-    unique_normalized_genres: Set[str] = set()
-    for raw_genres in track_genres_map.values():
-        for raw_genre in raw_genres:
-            normalized_genres = normalization_map.get(raw_genre, [])
-            unique_normalized_genres.update(normalized_genres)
+    # Build the track by normalized genre matrix; every column is a genre of some track
+    matrix = TrackGenreMatrix.from_tracks(tracks, artist_cache, normalized=True)
+    unique_normalized_genres: List[str] = matrix.unique_genres()
     
     # Print results
     print("\nUnique genres found in playlist:")
-    for genre in sorted(unique_normalized_genres):
+    for genre in unique_normalized_genres:
         print(f"- {genre}")
     print(f"\nTotal unique genres: {len(unique_normalized_genres)}")
 
 if __name__ == "__main__":
-    list_playlist_genres(PLAYLIST_ID)
+    list_playlist_genres(require_setting('PLAYLIST_ID'))
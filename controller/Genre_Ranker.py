@@ -2,38 +2,36 @@
 
 This module ranks and lists genres found in a playlist by frequency, using 
 batch processing and normalization for accurate statistics. Prints the 
-percentage and count for each genre.
+percentage and count for each genre. Counts are column sums of the 
+playlist's sparse track by genre matrix, optionally restricted to the 
+tracks by artists from one country.
 """
 
-from collections import defaultdict
-from typing import Dict, List, Any, Set
-from model.config import REQUESTS_PER_SECOND
+from typing import Dict, List, Any, Set, Optional
 from model.Playlist_Tools import (
     get_playlist_tracks,
-    get_track_genres,
-    sp,
-    RateLimiter
+    sp
 )
-from model.Genre_Tools import load_artist_cache, get_custom_artist_genres, normalize_genre
+from model.Genre_Tools import load_artist_cache
+from model.Genre_Matrix import TrackGenreMatrix
+from model.Artist_Genres import custom_genre_store
+from model.Artist_Record import ArtistRecord, SOURCE_SPOTIFY, SOURCE_WIKIDATA
+from model.Country_Tags import country_tagger
 from model.WikipediaAPI import get_artist_country_wikidata
-from model.config import PLAYLIST_ID
+from model.settings import require_setting
 
 
-def rank_playlist_genres(playlist_id: str) -> None:
+def rank_playlist_genres(playlist_id: str, country: Optional[str] = None) -> None:
     """List genres found in a playlist, ranked by frequency with optimized batch processing.
     
     Args:
         playlist_id: The Spotify playlist ID to analyze for genre ranking.
+        country: Optional country; if given, only tracks with an artist from 
+            this country are counted.
     """
-    # Initialize rate limiter
-    rate_limiter = RateLimiter(requests_per_second=REQUESTS_PER_SECOND)
-    
     # Get all tracks from the playlist
     tracks: List[Dict[str, Any]] = get_playlist_tracks(playlist_id)
     
-    # Dictionary to store genre counts
-    genre_counts: Dict[str, int] = defaultdict(int)
-    
     # Load artist cache for better performance
     artist_cache: Dict[str, Dict[str, Any]] = load_artist_cache()
     
@@ -48,11 +46,13 @@ def rank_playlist_genres(playlist_id: str) -> None:
     uncached_artist_ids = [aid for aid in all_artist_ids if aid not in artist_cache]
     if uncached_artist_ids:
         print(f"Pre-loading {len(uncached_artist_ids)} uncached artists...")
+        custom_genres_by_id = custom_genre_store.get_many(uncached_artist_ids)
         
         for i in range(0, len(uncached_artist_ids), 50):
             batch_artist_ids = uncached_artist_ids[i:i + 50]
             try:
                 artists = sp.artists(batch_artist_ids)
+                batch_entries: Dict[str, ArtistRecord] = {}
                 
                 for artist in artists['artists']:
                     if artist:  # Check if artist exists
@@ -61,27 +61,23 @@ def rank_playlist_genres(playlist_id: str) -> None:
                         genres = artist['genres']
                         
                         # Add custom genres if available
-                        custom_genres = get_custom_artist_genres(artist_id)
-                        genres.extend(custom_genres)
+                        genres.extend(custom_genres_by_id.get(artist_id, []))
                         
                         # Get country from Wikipedia/Wikidata
-                        country = get_artist_country_wikidata(artist_name)
-                        
-                        # Add national level genres based on Wikipedia country
-                        if country:
-                            if 'Brazil' in country:
-                                genres.append('brazilian music')
-                            elif 'Japan' in country:
-                                genres.append('Japanese Music')
+                        artist_country = get_artist_country_wikidata(artist_name)
                         
-                        # Update cache with name, genres, and country
-                        artist_cache[artist_id] = {
-                            'name': artist_name,
-                            'genres': genres,
-                            'country': country
-                        }
+                        batch_entries[artist_id] = ArtistRecord(
+                            name=artist_name,
+                            genres=genres,
+                            country=artist_country
+                        )
+                        batch_entries[artist_id].mark_fetched(SOURCE_SPOTIFY, SOURCE_WIKIDATA)
                 
-                rate_limiter.wait()
+                # Add national level genres for the whole batch based on Wikipedia countries
+                country_tagger.add_artist_tags_batch(batch_entries)
+                
+                # Update cache with name, genres, and country
+                artist_cache.update(batch_entries)
                 
             except Exception as e:
                 print(f"Error getting batch of artists: {str(e)}")
@@ -90,43 +86,25 @@ def rank_playlist_genres(playlist_id: str) -> None:
     # Process tracks with pre-loaded cache
     print(f"Processing {len(tracks)} tracks with pre-loaded artist cache...")
 
-    track_genres_map: Dict[str, List[str]] = {}
-    # Step 1: Collect raw genres for all tracks
-    for track in tracks:
-        if track and track['track']:
-            track_id = track['track']['id']
-            raw_genres = get_track_genres(track, artist_cache)
-            track_genres_map[track_id] = raw_genres
-
-    # Step 2: Create a normalization map for all unique raw genres
-    all_raw_genres = set(g for genres in track_genres_map.values() for g in genres)
-    normalization_map = {genre: normalize_genre(genre) for genre in all_raw_genres}
-
-    # Step 3: Count genres using the normalization map
-    genre_counts: Dict[str, int] = defaultdict(int)
-    for track_id, raw_genres in track_genres_map.items():
-        # Use a set to count each normalized genre only once per track
-        normalized_genres_per_track: Set[str] = set()
-        for raw_genre in raw_genres:
-            normalized_genres = normalization_map.get(raw_genre, [])
-            for normalized_genre in normalized_genres:
-                normalized_genres_per_track.add(normalized_genre)
-        
-        for genre in normalized_genres_per_track:
-            genre_counts[genre] += 1
+    # Build the track by normalized genre matrix, counting each genre once per track
+    matrix = TrackGenreMatrix.from_tracks(tracks, artist_cache, normalized=True)
+    
+    if country:
+        track_mask = matrix.country_mask(country)
+        total = int(track_mask.sum())
+        print(f"Counting {total} tracks with artists from {country}...")
+    else:
+        track_mask = None
+        total = len(matrix)
     
-    # Sort genres by count (descending)
-    sorted_genres: List[tuple[str, int]] = sorted(
-        genre_counts.items(),
-        key=lambda x: (-x[1], x[0])  # Sort by count (descending) then alphabetically
-    )
+    # Rank genres by count (descending) then alphabetically
+    ranking = matrix.ranking(track_mask, total=total)
     
     # Print results
     print("\nGenres ranked by frequency:")
-    for genre, count in sorted_genres:
-        percentage: float = (count / len(tracks)) * 100
+    for genre, count, percentage in ranking:
         print(f"- {genre}: {count} tracks ({percentage:.1f}%)")
-    print(f"\nTotal unique genres: {len(genre_counts)}")
+    print(f"\nTotal unique genres: {len(ranking)}")
 
 if __name__ == "__main__":
-    rank_playlist_genres(PLAYLIST_ID) 
\ No newline at end of file
+    rank_playlist_genres(require_setting('PLAYLIST_ID')) 
\ No newline at end of file
@@ -7,8 +7,7 @@ for manual or automated genre assignment.
 
 from typing import Dict, Any
 import json
-from model.Playlist_Tools import sp
-from model.spotify_client import get_artist_with_retry
+from model.spotify_client import artist_loader
 from model.Genre_Tools import load_artist_cache, get_artist_name_from_cache
 
 # Cache file path
@@ -50,40 +49,14 @@ def list_artists_without_genres():
             else:
                 uncached_artist_ids.append(artist_id)
         
-        # For artists not in cache, fetch from Spotify API
+        # For artists not in cache, fetch from Spotify API in one batch
         if uncached_artist_ids:
-            try:
-                # Get artist data in batch
-                artists = sp.artists(uncached_artist_ids)
-                
-                for artist in artists['artists']:
-                    if artist:  # Check if artist exists
-                        artist_id = artist['id']
-                        artist_name = artist['name']
-                        
-                        # Format for JSON storage
-                        artists_data[artist_id] = {
-                            "name": artist_name,
-                            "genres": []  # Empty genres list
-                        }
-                        
-            except Exception as e:
-                print(f"Error getting batch of artists: {str(e)}")
-                # Fallback to individual requests
-                for artist_id in uncached_artist_ids:
-                    try:
-                        artist = get_artist_with_retry(artist_id)
-                        artist_name = artist['name']
-                        
-                        # Format for JSON storage
-                        artists_data[artist_id] = {
-                            "name": artist_name,
-                            "genres": []  # Empty genres list
-                        }
-                        
-                    except Exception as e2:
-                        print(f"Error getting artist info for {artist_id}: {str(e2)}")
-                        continue
+            for artist_id, artist in artist_loader.load_many(uncached_artist_ids).items():
+                # Format for JSON storage
+                artists_data[artist_id] = {
+                    "name": artist['name'],
+                    "genres": []  # Empty genres list
+                }
     
     # Save results to JSON file
     save_artists_to_json(artists_data)
@@ -8,7 +8,9 @@ updates the cache.
 import json
 import os
 from typing import Dict, List, Set, Optional, Any
-from model.Genre_Tools import load_artist_cache, save_artist_cache, get_artist_genres, normalize_genre, deduplicate_hyphen_genres, get_artist_name_from_cache
+from model.Genre_Tools import load_artist_cache, save_artist_cache, get_artist_genres, normalize_genres_batch, get_artist_name_from_cache
+from model.Artist_Record import ArtistRecord
+from model.Country_Tags import country_tagger
 
 def get_artists_without_genres(artist_cache: Dict[str, Dict[str, Any]]) -> List[str]:
     """Get list of artist IDs that have no genres or only have generic regional genres in cache.
@@ -20,7 +22,7 @@ def get_artists_without_genres(artist_cache: Dict[str, Dict[str, Any]]) -> List[
         List of artist IDs that have no genres or only have generic regional genres.
     """
     artists_without_genres = []
-    generic_regional_genres = {"brazilian music", "japanese music"}
+    generic_regional_genres = country_tagger.artist_tag_names()
     
     for artist_id, data in artist_cache.items():
         genres = data.get('genres', [])
@@ -86,26 +88,12 @@ def manual_genre_input():
                 print("No valid genres entered. Please try again or press Enter to skip.")
                 continue
             
-            # Normalize genres
-            normalized_genres = []
-            for genre in genres:
-                normalized = normalize_genre(genre)
-                normalized_genres.extend(normalized)
-            
-            # Remove duplicates while preserving order
-            seen = set()
-            unique_normalized_genres = []
-            for genre in normalized_genres:
-                if genre not in seen:
-                    seen.add(genre)
-                    unique_normalized_genres.append(genre)
-            
-            # Deduplicate hyphen genres
-            unique_normalized_genres = deduplicate_hyphen_genres(unique_normalized_genres)
+            # Normalize genres, removing duplicates and hyphen variants
+            unique_normalized_genres = normalize_genres_batch([genres])[0]
             
             # Update cache
             if artist_id not in artist_cache:
-                artist_cache[artist_id] = {}
+                artist_cache[artist_id] = ArtistRecord()
             
             artist_cache[artist_id]['genres'] = unique_normalized_genres
             processed += 1
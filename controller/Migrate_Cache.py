@@ -0,0 +1,94 @@
+"""Migrates the artist cache between storage formats.
+
+This module migrates the artist genre cache from the JSON file into the SQLite
+store or into shard files, and exports them back to JSON for compatibility with
+tools that read the JSON file directly.
+"""
+
+import os
+from model.Artist_Cache import shared_artist_cache, ARTIST_CACHE_FILE
+from model.Artist_Cache_Store import ARTIST_CACHE_DB_FILE, migrate_json_to_sqlite, export_sqlite_to_json
+from model.Artist_Cache_Shards import ARTIST_CACHE_SHARDS_DIR, migrate_json_to_shards, export_shards_to_json
+
+def migrate_to_sqlite() -> None:
+    """Import the JSON artist cache into the SQLite store."""
+    if not os.path.exists(ARTIST_CACHE_FILE):
+        print(f"❌ {ARTIST_CACHE_FILE} not found")
+        return
+    if os.path.exists(ARTIST_CACHE_DB_FILE):
+        response = input(f"{ARTIST_CACHE_DB_FILE} already exists. Overwrite matching entries? (y/n): ")
+        if response.lower() != 'y':
+            print("Cancelled.")
+            return
+    shared_artist_cache.flush()
+    count = migrate_json_to_sqlite(ARTIST_CACHE_FILE, ARTIST_CACHE_DB_FILE)
+    print(f"✅ Migrated {count} artists to {ARTIST_CACHE_DB_FILE}")
+    print(f"   {ARTIST_CACHE_FILE} was kept as a backup; the SQLite store is now used.")
+
+def export_to_json() -> None:
+    """Export the SQLite store back to the JSON artist cache file."""
+    if not os.path.exists(ARTIST_CACHE_DB_FILE):
+        print(f"❌ {ARTIST_CACHE_DB_FILE} not found")
+        return
+    shared_artist_cache.flush()
+    count = export_sqlite_to_json(ARTIST_CACHE_FILE, ARTIST_CACHE_DB_FILE)
+    print(f"✅ Exported {count} artists to {ARTIST_CACHE_FILE}")
+    print(f"   Remove {ARTIST_CACHE_DB_FILE} to switch back to the JSON cache.")
+
+def migrate_to_shards() -> None:
+    """Split the JSON artist cache into shard files."""
+    if not os.path.exists(ARTIST_CACHE_FILE):
+        print(f"❌ {ARTIST_CACHE_FILE} not found")
+        return
+    if os.path.exists(ARTIST_CACHE_DB_FILE):
+        print(f"❌ {ARTIST_CACHE_DB_FILE} exists; export it to JSON and remove it first")
+        return
+    if os.path.isdir(ARTIST_CACHE_SHARDS_DIR):
+        response = input(f"{ARTIST_CACHE_SHARDS_DIR} already exists. Overwrite all shards? (y/n): ")
+        if response.lower() != 'y':
+            print("Cancelled.")
+            return
+    shared_artist_cache.flush()
+    count = migrate_json_to_shards(ARTIST_CACHE_FILE, ARTIST_CACHE_SHARDS_DIR)
+    shared_artist_cache.invalidate()
+    print(f"✅ Split {count} artists into {ARTIST_CACHE_SHARDS_DIR}")
+    print(f"   {ARTIST_CACHE_FILE} was kept as a backup; the shard files are now used.")
+
+def export_shards() -> None:
+    """Merge the shard files back into the JSON artist cache file."""
+    if not os.path.isdir(ARTIST_CACHE_SHARDS_DIR):
+        print(f"❌ {ARTIST_CACHE_SHARDS_DIR} not found")
+        return
+    shared_artist_cache.flush()
+    count = export_shards_to_json(ARTIST_CACHE_FILE, ARTIST_CACHE_SHARDS_DIR)
+    print(f"✅ Exported {count} artists to {ARTIST_CACHE_FILE}")
+    print(f"   Remove {ARTIST_CACHE_SHARDS_DIR} to switch back to the JSON cache.")
+
+def main():
+    """Main function for the cache migration tool."""
+    print("🗄️  Artist Cache Migration")
+    print("=" * 60)
+    while True:
+        print("\nOptions:")
+        print("1. Migrate JSON cache to SQLite")
+        print("2. Export SQLite cache to JSON")
+        print("3. Split JSON cache into shard files")
+        print("4. Merge shard files into JSON")
+        print("5. Exit")
+        choice = input("\nSelect option (1-5): ").strip()
+        if choice == '1':
+            migrate_to_sqlite()
+        elif choice == '2':
+            export_to_json()
+        elif choice == '3':
+            migrate_to_shards()
+        elif choice == '4':
+            export_shards()
+        elif choice == '5':
+            print("👋 Goodbye!")
+            break
+        else:
+            print("❌ Invalid option")
+
+if __name__ == "__main__":
+    main()
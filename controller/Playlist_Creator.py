@@ -5,21 +5,19 @@ batch processing and caching. Minimizes API calls and speeds up playlist
 creation by batching and checking for existing playlists.
 """
 
-import time
 from typing import Dict, List, Set, Any
-from model.config import PLAYLIST_ID, REQUESTS_PER_SECOND
+from model.settings import require_setting
 from model.Playlist_Tools import (
     get_existing_playlists,
     get_playlist_track_ids,
     create_genre_playlists,
-    sp,
-    RateLimiter
+    get_genre_playlist_tracks,
+    sp
 )
 import streamlit as st
 
 def create_genre_playlists_optimized(playlist_id: str) -> None:
     """Create genre playlists with optimized batch processing and caching (read-only cache)."""
-    rate_limiter = RateLimiter(requests_per_second=REQUESTS_PER_SECOND)
     progress_bar = st.progress(0, text="Processing tracks...")
     cancelled = False
     def progress_callback(current, total):
@@ -41,7 +39,9 @@ def create_genre_playlists_optimized(playlist_id: str) -> None:
             continue
         playlist_name: str = f"{genre.title()}"
         if playlist_name in existing_playlists:
-            playlists_to_update.append((playlist_name, existing_playlists[playlist_name], track_ids))
+            # Existing playlists also get the tracks whose genres normalize to their genre
+            playlists_to_update.append((playlist_name, existing_playlists[playlist_name],
+                                        track_ids | get_genre_playlist_tracks(playlist_id, genre)))
         else:
             playlists_to_create.append((playlist_name, track_ids))
     if playlists_to_create:
@@ -66,12 +66,9 @@ def create_genre_playlists_optimized(playlist_id: str) -> None:
                         return
                     chunk: List[str] = track_ids_list[i:i + 50]
                     sp.playlist_add_items(playlist_id, chunk)
-                    rate_limiter.wait()
                 st.write(f"Added {len(track_ids)} tracks to '{playlist_name}'")
-                rate_limiter.wait()
             except Exception as e:
                 st.error(f"Error creating playlist for {genre}: {str(e)}")
-                time.sleep(5)
                 continue
     if playlists_to_update:
         st.write(f"\nUpdating {len(playlists_to_update)} existing playlists...")
@@ -92,14 +89,12 @@ def create_genre_playlists_optimized(playlist_id: str) -> None:
                             return
                         chunk: List[str] = track_ids_list[i:i + 50]
                         sp.playlist_add_items(playlist_id, chunk)
-                        rate_limiter.wait()
                     st.write(f"Added {len(new_track_ids)} tracks to '{playlist_name}'")
                 else:
                     st.write(f"No new tracks to add to '{playlist_name}'")
             except Exception as e:
                 st.error(f"Error updating playlist for {genre}: {str(e)}")
-                time.sleep(5)
                 continue
 
 if __name__ == "__main__":
-    create_genre_playlists_optimized(PLAYLIST_ID)
\ No newline at end of file
+    create_genre_playlists_optimized(require_setting('PLAYLIST_ID'))
\ No newline at end of file
@@ -1,118 +1,313 @@
 """Updates all artists in the cache with the latest genres and country info.
 
-This module updates all artists in the cache with the latest genres and country 
-info from Spotify and Wikipedia. Uses batch processing for efficiency and 
-saves the updated cache.
+This module updates all artists in the cache with the latest genres and country
+info from Spotify and Wikipedia. Uses batch processing for efficiency and
+saves the updated cache. Each entry records when its Spotify, Wikipedia and
+Wikidata data was fetched, so a stale-only refresh can re-fetch just the
+entries older than the configured per-source TTLs, stalest first, within a
+budget of API calls per run.
 """
 
 import time
 import sys
 import os
-from typing import Dict, Any
+from typing import Dict, List, Any, Optional, Tuple
 
 # Add the parent directory to the Python path so we can import from model
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from model.spotify_client import sp, get_artist_with_retry
-from model.Genre_Tools import load_artist_cache, save_artist_cache, get_custom_artist_genres, normalize_genre, deduplicate_hyphen_genres
+from model.spotify_async import use_async_client, fetch_artists_by_id
+from model.Genre_Tools import load_artist_cache, save_artist_cache, normalize_genres_batch, tag_artist_entries, refresh_normalized_genres
+from model.Artist_Genres import custom_genre_store
+from model.Artist_Record import ArtistRecord, SOURCE_SPOTIFY, SOURCE_WIKIPEDIA, SOURCE_WIKIDATA
+from model.Country_Tags import country_tagger
+from model.settings import get_setting
 from tqdm import tqdm
-from model.WikipediaAPI import get_artist_genres as get_wikipedia_genres, get_artist_country_wikidata
+from model.WikipediaAPI import (
+    get_artist_genres as get_wikipedia_genres, get_artist_country_wikidata,
+    WIKIPEDIA_GENRES_REQUESTS, WIKIDATA_COUNTRY_REQUESTS
+)
 
 BATCH_SIZE = 50
+SECONDS_PER_DAY = 24 * 60 * 60
 
-def main(progress_callback=None):
+def build_artist_entry(artist: Dict[str, Any], artist_cache: Dict[str, Dict[str, Any]],
+                       custom_genres: List[str], refresh_country: Optional[bool] = None) -> ArtistRecord:
+    """Build the cache entry for an artist from fresh Spotify data.
+
+    Combines the Spotify genres with Wikipedia and custom genres and
+    normalizes them. National level genres are added, and hyphen duplicates
+    removed, for a whole batch of entries at once by tag_artist_entries().
+
+    Args:
+        artist: Artist object returned by the Spotify API.
+        artist_cache: The artist cache, used for the previous entry.
+        custom_genres: Custom genres for the artist.
+        refresh_country: True to look up the country again, False to keep the
+            cached country even if it is missing, None to look it up only if
+            it is missing. Defaults to None.
+
+    Returns:
+        The new cache entry, with fetch times carried over and updated.
+    """
+    artist_id = artist['id']
+    artist_name = artist['name']
+    genres = artist.get('genres', [])
+    # Fetch Wikipedia genres and combine with the Spotify and custom genres
+    wikipedia_genres = get_wikipedia_genres(artist_name) or []
+    all_genres = normalize_genres_batch([genres + wikipedia_genres + custom_genres])[0]
+    # Get country from cache or Wikipedia/Wikidata
+    previous = artist_cache.get(artist_id)
+    fetched_sources = [SOURCE_SPOTIFY, SOURCE_WIKIPEDIA]
+    country = None if refresh_country or previous is None else previous.get('country')
+    if refresh_country or (refresh_country is None and not country):
+        country = get_artist_country_wikidata(artist_name)
+        fetched_sources.append(SOURCE_WIKIDATA)
+    entry = ArtistRecord(
+        name=artist_name,
+        genres=all_genres,
+        country=country
+    )
+    if previous is not None and previous.get('fetched_at'):
+        entry['fetched_at'] = previous['fetched_at']
+    entry.mark_fetched(*fetched_sources)
+    return entry
+
+def get_spotify_artists(batch_ids: List[str], prefetched: Optional[Dict[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Get a batch of artists from Spotify, or from artists fetched up front.
+
+    Args:
+        batch_ids: Spotify artist IDs of the batch.
+        prefetched: Artists fetched up front by the async client, or None to request the batch now.
+
+    Returns:
+        The batch's artists that exist on Spotify.
+    """
+    if prefetched is not None:
+        return [prefetched[artist_id] for artist_id in batch_ids if artist_id in prefetched]
+    return [artist for artist in sp.artists(batch_ids)['artists'] if artist]
+
+def main(progress_callback=None, use_async: Optional[bool] = None):
+    """Re-fetch every artist in the cache.
+
+    Args:
+        progress_callback: Optional callback function to report progress.
+        use_async: Whether to fetch the artists with the async client, several
+            batches at a time. Defaults to the SPOTIFY_ASYNC setting.
+    """
+    if use_async is None:
+        use_async = use_async_client()
     print("Updating all artists in the cache...")
     artist_cache: Dict[str, Dict[str, Any]] = load_artist_cache()
     artist_ids = list(artist_cache.keys())
     total_artists = len(artist_ids)
+    # Look up custom genres for every artist once instead of per artist
+    custom_genres_by_id = custom_genre_store.get_many(artist_ids)
     updated_count = 0
     start_time = time.time()
+    # Fetch the Spotify batches concurrently up front
+    prefetched = fetch_artists_by_id(artist_ids) if use_async else None
 
     for i in tqdm(range(0, total_artists, BATCH_SIZE), desc="Updating artist batches"):
         batch_ids = artist_ids[i:i+BATCH_SIZE]
+        batch_entries: Dict[str, ArtistRecord] = {}
         try:
-            artists = sp.artists(batch_ids)
-            for artist in artists['artists']:
-                if artist:
-                    artist_id = artist['id']
-                    artist_name = artist['name']
-                    genres = artist.get('genres', [])
-                    # Fetch Wikipedia genres and combine
-                    wikipedia_genres = get_wikipedia_genres(artist_name) or []
-                    all_genres = list(dict.fromkeys(genres + wikipedia_genres))
-                    # Add custom genres if available
-                    custom_genres = get_custom_artist_genres(artist_id)
-                    all_genres.extend([g for g in custom_genres if g not in all_genres])
-                    # Apply normalize_genre to each genre and flatten
-                    normalized = []
-                    for g in all_genres:
-                        normalized.extend(normalize_genre(g))
-                    # Remove duplicates while preserving order
-                    all_genres = list(dict.fromkeys(normalized))
-                    # Get country from cache or Wikipedia/Wikidata
-                    country = artist_cache.get(artist_id, {}).get('country')
-                    if not country:
-                        country = get_artist_country_wikidata(artist_name)
-                    # Add national level genres based on Wikipedia country
-                    if country:
-                        if 'Brazil' in country:
-                            all_genres.append('brazilian music')
-                        elif 'Japan' in country:
-                            all_genres.append('Japanese Music')
-                    # Deduplicate hyphen genres before saving
-                    all_genres = deduplicate_hyphen_genres(all_genres)
-                    artist_cache[artist_id] = {
-                        'name': artist_name,
-                        'genres': all_genres,
-                        'country': country
-                    }
-                    updated_count += 1
+            for artist in get_spotify_artists(batch_ids, prefetched):
+                artist_id = artist['id']
+                batch_entries[artist_id] = build_artist_entry(
+                    artist, artist_cache, custom_genres_by_id.get(artist_id, [])
+                )
             if progress_callback:
                 progress_callback(min(i + BATCH_SIZE, total_artists) / total_artists)
-            time.sleep(0.1)
         except Exception as e:
             print(f"Error updating batch {i//BATCH_SIZE+1}: {str(e)}")
             # Fallback to individual requests
+            batch_entries = {}
             for artist_id in batch_ids:
                 try:
                     artist_data = get_artist_with_retry(artist_id)
-                    artist_name = artist_data['name']
-                    genres = artist_data.get('genres', [])
-                    # Fetch Wikipedia genres and combine
-                    wikipedia_genres = get_wikipedia_genres(artist_name) or []
-                    all_genres = list(dict.fromkeys(genres + wikipedia_genres))
-                    custom_genres = get_custom_artist_genres(artist_id)
-                    all_genres.extend([g for g in custom_genres if g not in all_genres])
-                    # Apply normalize_genre to each genre and flatten
-                    normalized = []
-                    for g in all_genres:
-                        normalized.extend(normalize_genre(g))
-                    all_genres = list(dict.fromkeys(normalized))
-                    # Get country from cache or Wikipedia/Wikidata
-                    country = artist_cache.get(artist_id, {}).get('country')
-                    if not country:
-                        country = get_artist_country_wikidata(artist_name)
-                    if country:
-                        if 'Brazil' in country:
-                            all_genres.append('brazilian music')
-                        elif 'Japan' in country:
-                            all_genres.append('Japanese Music')
-                    # Deduplicate hyphen genres before saving
-                    all_genres = deduplicate_hyphen_genres(all_genres)
-                    artist_cache[artist_id] = {
-                        'name': artist_name,
-                        'genres': all_genres,
-                        'country': country
-                    }
-                    updated_count += 1
-                    time.sleep(0.1)
+                    batch_entries[artist_id] = build_artist_entry(
+                        artist_data, artist_cache, custom_genres_by_id.get(artist_id, [])
+                    )
                 except Exception as e2:
                     print(f"  Error updating artist {artist_id}: {str(e2)}")
                     continue
+        # Add national level genres for the whole batch
+        tag_artist_entries(batch_entries)
+        artist_cache.update(batch_entries)
+        updated_count += len(batch_entries)
 
+    # Store every artist's normalized genres with the rebuilt cache
+    refresh_normalized_genres(artist_cache)
     save_artist_cache(artist_cache)
     elapsed = time.time() - start_time
     print(f"\nUpdated {updated_count} artists in {elapsed:.1f} seconds")
 
+def get_source_ttls() -> Dict[str, float]:
+    """Get the configured time-to-live of each data source.
+
+    Returns:
+        Dictionary mapping source names to TTLs in seconds.
+    """
+    return {
+        SOURCE_SPOTIFY: get_setting('SPOTIFY_TTL_DAYS', 30) * SECONDS_PER_DAY,
+        SOURCE_WIKIPEDIA: get_setting('WIKIPEDIA_TTL_DAYS', 90) * SECONDS_PER_DAY,
+        SOURCE_WIKIDATA: get_setting('WIKIDATA_TTL_DAYS', 180) * SECONDS_PER_DAY,
+    }
+
+def find_stale_artists(artist_cache: Dict[str, Dict[str, Any]], ttls: Dict[str, float],
+                       now: Optional[float] = None) -> List[Tuple[float, str, List[str]]]:
+    """Find cache entries with data older than the source TTLs.
+
+    Staleness is the age of the data divided by the source's TTL; data that
+    was never fetched counts as infinitely stale.
+
+    Args:
+        artist_cache: The artist cache.
+        ttls: Dictionary mapping source names to TTLs in seconds.
+        now: Current Unix timestamp. Defaults to now.
+
+    Returns:
+        List of (staleness, artist ID, stale sources) tuples, stalest first.
+    """
+    now = time.time() if now is None else now
+    stale = []
+    for artist_id, entry in artist_cache.items():
+        fetched_at = entry.get('fetched_at') or {}
+        staleness = 0.0
+        stale_sources = []
+        for source, ttl in ttls.items():
+            timestamp = fetched_at.get(source)
+            age_ratio = float('inf') if timestamp is None else (now - timestamp) / ttl
+            if age_ratio >= 1:
+                stale_sources.append(source)
+                staleness = max(staleness, age_ratio)
+        if stale_sources:
+            stale.append((staleness, artist_id, stale_sources))
+    stale.sort(key=lambda item: item[0], reverse=True)
+    return stale
+
+def refresh_stale_artists(progress_callback=None, max_calls: Optional[int] = None,
+                          use_async: Optional[bool] = None) -> None:
+    """Re-fetch only the cache entries whose data is older than the source TTLs.
+
+    Genres are rebuilt from both Spotify and Wikipedia, so an artist whose
+    Spotify or Wikipedia data is stale re-fetches both; the Wikidata country
+    is refreshed on its own TTL. Artists are processed stalest first until
+    the API call budget is used up. Each Spotify batch request counts as one
+    call, and each Wikipedia or Wikidata lookup as the most HTTP requests it
+    can make, retries included. Countries are only looked up for artists
+    whose Wikidata data is stale, so no lookup happens outside the budget.
+    Artists missing from Spotify's response are marked fetched, so they do
+    not use up the budget again on the next run.
+
+    Args:
+        progress_callback: Optional callback function to report progress.
+        max_calls: Maximum API calls for this run. Defaults to the
+            UPDATE_CACHE_MAX_CALLS setting.
+        use_async: Whether to fetch the artists with the async client, several
+            batches at a time. Defaults to the SPOTIFY_ASYNC setting.
+    """
+    if max_calls is None:
+        max_calls = get_setting('UPDATE_CACHE_MAX_CALLS', 1000)
+    if use_async is None:
+        use_async = use_async_client()
+    artist_cache: Dict[str, Dict[str, Any]] = load_artist_cache()
+    stale = find_stale_artists(artist_cache, get_source_ttls())
+    print(f"Found {len(stale)} artists with stale data")
+
+    # Pick the stalest artists that fit in the call budget
+    genre_refresh_ids: List[str] = []
+    country_only_ids: List[str] = []
+    country_refresh_ids = set()
+    calls = 0
+    for _, artist_id, sources in stale:
+        refresh_genres = SOURCE_SPOTIFY in sources or SOURCE_WIKIPEDIA in sources
+        refresh_country = SOURCE_WIKIDATA in sources
+        if not refresh_genres and not artist_cache[artist_id].get('name'):
+            # The country is looked up by name, so there is nothing to refresh
+            continue
+        cost = WIKIDATA_COUNTRY_REQUESTS if refresh_country else 0
+        if refresh_genres:
+            # One Wikipedia lookup, plus a new Spotify batch every BATCH_SIZE artists
+            cost += WIKIPEDIA_GENRES_REQUESTS + (1 if len(genre_refresh_ids) % BATCH_SIZE == 0 else 0)
+        if calls + cost > max_calls:
+            # Too expensive for the remaining budget; cheaper refreshes may still fit
+            continue
+        calls += cost
+        if refresh_country:
+            country_refresh_ids.add(artist_id)
+        if refresh_genres:
+            genre_refresh_ids.append(artist_id)
+        else:
+            country_only_ids.append(artist_id)
+    total = len(genre_refresh_ids) + len(country_only_ids)
+    print(f"Refreshing {total} artists using up to {calls} of {max_calls} API calls")
+    if total == 0:
+        return
+
+    custom_genres_by_id = custom_genre_store.get_many(genre_refresh_ids)
+    updated_count = 0
+    start_time = time.time()
+    # Fetch the Spotify batches concurrently up front
+    prefetched = fetch_artists_by_id(genre_refresh_ids) if use_async and genre_refresh_ids else None
+
+    for i in tqdm(range(0, len(genre_refresh_ids), BATCH_SIZE), desc="Refreshing artist batches"):
+        batch_ids = genre_refresh_ids[i:i+BATCH_SIZE]
+        batch_entries: Dict[str, ArtistRecord] = {}
+        try:
+            for artist in get_spotify_artists(batch_ids, prefetched):
+                artist_id = artist['id']
+                batch_entries[artist_id] = build_artist_entry(
+                    artist, artist_cache, custom_genres_by_id.get(artist_id, []),
+                    refresh_country=artist_id in country_refresh_ids
+                )
+        except Exception as e:
+            print(f"Error refreshing batch {i//BATCH_SIZE+1}: {str(e)}")
+        else:
+            # Spotify no longer has these artists; record the attempt so they
+            # are not picked again before the TTLs run out
+            missing_ids = [artist_id for artist_id in batch_ids if artist_id not in batch_entries]
+            for artist_id in missing_ids:
+                artist_cache[artist_id].mark_fetched(SOURCE_SPOTIFY, SOURCE_WIKIPEDIA)
+            if missing_ids:
+                print(f"  {len(missing_ids)} artists in batch {i//BATCH_SIZE+1} were not found on Spotify")
+        # Add national level genres for the whole batch
+        tag_artist_entries(batch_entries)
+        artist_cache.update(batch_entries)
+        updated_count += len(batch_entries)
+        if progress_callback:
+            progress_callback(min(i + BATCH_SIZE, len(genre_refresh_ids)) / total)
+
+    country_entries: Dict[str, Dict[str, Any]] = {}
+    for idx, artist_id in enumerate(country_only_ids):
+        entry = artist_cache[artist_id]
+        try:
+            country = get_artist_country_wikidata(entry.get('name'))
+        except Exception as e:
+            print(f"  Error refreshing country for {artist_id}: {str(e)}")
+            continue
+        if country:
+            entry['country'] = country
+            country_entries[artist_id] = entry
+        entry.mark_fetched(SOURCE_WIKIDATA)
+        updated_count += 1
+        if progress_callback:
+            progress_callback((len(genre_refresh_ids) + idx + 1) / total)
+    # Add national level genres based on the new Wikipedia countries
+    country_tagger.add_artist_tags_batch(country_entries)
+
+    save_artist_cache(artist_cache)
+    elapsed = time.time() - start_time
+    print(f"\nRefreshed {updated_count} stale artists in {elapsed:.1f} seconds")
+
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    print("Options:")
+    print("1. Update all artists")
+    print("2. Refresh stale artists only")
+    choice = input("\nSelect option (1-2): ").strip()
+    if choice == '2':
+        refresh_stale_artists()
+    else:
+        main()
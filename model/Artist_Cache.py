@@ -0,0 +1,380 @@
+"""Process-wide in-memory artist genre cache.
+
+This module provides the shared ArtistCache object that loads the artist cache
+once, serves lookups from memory, and only re-reads the cache files when their
+modification time or size changes. Also selects the storage backend: the JSON
+file (optionally with an append-only journal of changes), or the SQLite store
+once the cache has been migrated to it. With ARTIST_CACHE_SNAPSHOT enabled,
+lookups made before the full cache is needed are served from a memory-mapped
+binary snapshot instead of parsing the cache files. Once the cache has been
+split into shard files, the shared cache is a ShardedArtistCache that only
+loads the shards it is asked about. Saves are handed to the
+write-behind flusher, which coalesces them into atomic writes.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Any, Callable, Iterable, List, Mapping, MutableMapping, Optional, Set, Tuple
+from model.Artist_Cache_Store import ArtistCacheStore, ARTIST_CACHE_DB_FILE
+from model.Artist_Cache_Shards import ShardedArtistCache, ARTIST_CACHE_SHARDS_DIR, SHARD_INDEX_FILE, write_artist_shards
+from model.Artist_Cache_Journal import ArtistCacheJournal
+from model.Artist_Cache_Snapshot import ArtistSnapshot, ARTIST_CACHE_SNAPSHOT_FILE, open_artist_snapshot, write_artist_snapshot
+from model.Artist_Record import TrackedArtistCache, decode_artist_cache, loads_artist_cache, dumps_artist_cache
+from model.Cache_Flusher import atomic_write_text, write_behind_flusher
+from model.File_Changes import FileChangeChecker, file_signature
+from model.settings import get_setting
+
+# Cache file paths
+ARTIST_CACHE_FILE = "data/artist_genre_cache.json"
+
+# SQLite store, opened lazily once the database file exists
+_artist_cache_store: Optional[ArtistCacheStore] = None
+
+# Journal of single-artist changes, used when ARTIST_CACHE_JOURNAL is enabled
+_artist_cache_journal: Optional[ArtistCacheJournal] = None
+
+def _use_sqlite_store() -> bool:
+    """Check whether the artist cache has been migrated to SQLite.
+
+    Returns:
+        True if the SQLite database file exists, False otherwise.
+    """
+    return os.path.exists(ARTIST_CACHE_DB_FILE)
+
+def _use_sharded_store() -> bool:
+    """Check whether the artist cache has been split into shard files.
+
+    Returns:
+        True if the shard directory exists, False otherwise.
+    """
+    return os.path.isdir(ARTIST_CACHE_SHARDS_DIR)
+
+def get_artist_cache_store() -> ArtistCacheStore:
+    """Get the shared SQLite store for the artist cache.
+
+    Returns:
+        The process-wide ArtistCacheStore instance.
+    """
+    global _artist_cache_store
+    if _artist_cache_store is None:
+        _artist_cache_store = ArtistCacheStore(ARTIST_CACHE_DB_FILE)
+    return _artist_cache_store
+
+def get_artist_cache_journal() -> ArtistCacheJournal:
+    """Get the shared journal for the JSON artist cache.
+
+    Returns:
+        The process-wide ArtistCacheJournal instance.
+    """
+    global _artist_cache_journal
+    if _artist_cache_journal is None:
+        _artist_cache_journal = ArtistCacheJournal(
+            ARTIST_CACHE_FILE,
+            max_bytes=get_setting('ARTIST_CACHE_JOURNAL_MAX_BYTES', 1024 * 1024)
+        )
+    return _artist_cache_journal
+
+def read_artist_cache_files() -> MutableMapping[str, Dict[str, Any]]:
+    """Read the artist cache from its storage backend.
+
+    Returns:
+        Dictionary mapping artist IDs to their ArtistRecord entries, or a
+        ShardedArtistCache that loads shards on demand. With the SQLite
+        store or the journal, a TrackedArtistCache that records which
+        artists change.
+    """
+    if _use_sqlite_store():
+        return TrackedArtistCache(get_artist_cache_store().load_all())
+    if _use_sharded_store():
+        return ShardedArtistCache(ARTIST_CACHE_SHARDS_DIR)
+    journal = get_artist_cache_journal()
+    if get_setting('ARTIST_CACHE_JOURNAL', False) or journal.exists():
+        return TrackedArtistCache(decode_artist_cache(journal.load()))
+    if os.path.exists(ARTIST_CACHE_FILE):
+        try:
+            with open(ARTIST_CACHE_FILE, 'r', encoding='utf-8') as f:
+                return loads_artist_cache(f.read())
+        except (json.JSONDecodeError, FileNotFoundError) as e:
+            print(f"Error loading cache: {e}")
+            return {}
+    return {}
+
+def write_artist_cache_files(cache: MutableMapping[str, Dict[str, Any]],
+                             changes: Optional[Tuple[Set[str], Set[str]]] = None) -> None:
+    """Write the artist cache to its storage backend.
+
+    With the SQLite store only the changed artists are written, as
+    row-level upserts and deletes. With shard files only the changed shards
+    are rewritten. In journal mode the changed entries and removed artists
+    are appended to the journal instead of rewriting the cache file.
+    Otherwise, or if the changes are not known, the JSON file is replaced
+    atomically.
+
+    Args:
+        cache: Dictionary mapping artist IDs to their cached data.
+        changes: Tuple of (IDs of added or changed artists, IDs of removed
+            artists) since the last write, as returned by
+            TrackedArtistCache.take_changes(). Defaults to None, which
+            writes the whole cache.
+    """
+    if _use_sqlite_store():
+        store = get_artist_cache_store()
+        if changes is None:
+            dirty, deleted = cache.keys(), store.artist_ids() - cache.keys()
+        else:
+            dirty, deleted = changes
+        store.upsert_many({artist_id: cache[artist_id] for artist_id in dirty if artist_id in cache})
+        store.delete_many([artist_id for artist_id in deleted if artist_id not in cache])
+        return
+    if _use_sharded_store():
+        if isinstance(cache, ShardedArtistCache):
+            cache.save()
+        else:
+            write_artist_shards(ARTIST_CACHE_SHARDS_DIR, cache)
+        return
+    journal = get_artist_cache_journal()
+    if get_setting('ARTIST_CACHE_JOURNAL', False) and changes is not None:
+        dirty, deleted = changes
+        journal.append(
+            {artist_id: cache[artist_id] for artist_id in dirty if artist_id in cache},
+            [artist_id for artist_id in deleted if artist_id not in cache]
+        )
+        return
+    journal.wait_for_compaction()
+    atomic_write_text(ARTIST_CACHE_FILE, dumps_artist_cache(cache))
+    # The full rewrite already contains any journaled changes
+    if journal.exists():
+        journal.clear()
+
+def artist_cache_signature() -> Tuple:
+    """Get a signature of the artist cache files that changes whenever they are written.
+
+    Returns:
+        Tuple of (modification time, size) pairs for every backing file.
+    """
+    if _use_sqlite_store():
+        paths = [ARTIST_CACHE_DB_FILE, ARTIST_CACHE_DB_FILE + '-wal']
+    elif _use_sharded_store():
+        # The index is rewritten after every save of the shards
+        paths = [os.path.join(ARTIST_CACHE_SHARDS_DIR, SHARD_INDEX_FILE)]
+    else:
+        journal = get_artist_cache_journal()
+        paths = [ARTIST_CACHE_FILE, journal.journal_file, journal.compacting_file]
+    return tuple(file_signature(path) for path in paths)
+
+
+class ArtistCache:
+    """Shared in-memory artist cache.
+
+    Loads the cache once and serves every caller from the same dictionary.
+    The backing files are checked at most once per check_interval seconds
+    and re-read only if their modification time or size changed. Until the
+    full dictionary is needed, lookups can be answered from a binary
+    snapshot of the cache that is rebuilt whenever the files are re-read or
+    written. Saves are written behind by the shared flusher; while a save is
+    pending the in-memory dictionary is never replaced by a reload. Functions
+    added with add_write_listener() are told which artists each write changed.
+    """
+
+    def __init__(self, check_interval: float = 1.0):
+        """Initialize an empty, not yet loaded cache.
+
+        Args:
+            check_interval: Minimum seconds between checks of the backing files. Defaults to 1.0.
+        """
+        self._lock = threading.RLock()
+        self._data: Optional[MutableMapping[str, Dict[str, Any]]] = None
+        self._files = FileChangeChecker(artist_cache_signature, check_interval)
+        self._snapshot: Optional[ArtistSnapshot] = None
+        self._snapshot_files = FileChangeChecker(artist_cache_signature, check_interval)
+        self._writing = False
+        self._write_listeners: List[Callable[[Mapping[str, Dict[str, Any]], Optional[Set[str]]], None]] = []
+
+    def add_write_listener(self, listener: Callable[[Mapping[str, Dict[str, Any]], Optional[Set[str]]], None]) -> None:
+        """Call a function after every write of the cache.
+
+        Listeners are called from the flusher thread, and errors they raise
+        are printed rather than failing the write. Sharded caches are not
+        reported, since reading every shard would defeat loading them on demand.
+
+        Args:
+            listener: Function called with the written cache and the IDs of
+                the artists added, changed or removed since the previous
+                write, or None if they are not known.
+        """
+        self._write_listeners.append(listener)
+
+    def data(self) -> MutableMapping[str, Dict[str, Any]]:
+        """Get the shared cache dictionary, loading or reloading it if needed.
+
+        Callers that modify the dictionary should persist it with save().
+
+        Returns:
+            Dictionary mapping artist IDs to their cached data, or a
+            ShardedArtistCache when the cache is stored as shards.
+        """
+        with self._lock:
+            changed, signature = self._files.check(force=self._data is None)
+            if changed and (self._data is None or not self._has_unsaved_changes()):
+                self._data = read_artist_cache_files()
+                self._files.record(signature)
+                # Shards are already loaded on demand, so they need no snapshot
+                if get_setting('ARTIST_CACHE_SNAPSHOT', False) and isinstance(self._data, dict):
+                    self._write_snapshot(self._data, signature)
+            return self._data
+
+    def view(self) -> Mapping[str, Dict[str, Any]]:
+        """Get a read-only mapping for cache lookups.
+
+        Returns the in-memory dictionary once it has been loaded. Before that,
+        returns the binary snapshot if it is enabled and up to date, so that
+        lookups do not have to parse the whole cache.
+
+        Returns:
+            Mapping of artist IDs to their cached data.
+        """
+        with self._lock:
+            if self._data is None and get_setting('ARTIST_CACHE_SNAPSHOT', False) and not _use_sharded_store():
+                snapshot = self._open_snapshot()
+                if snapshot is not None:
+                    return snapshot
+            return self.data()
+
+    def _open_snapshot(self) -> Optional[ArtistSnapshot]:
+        """Open the binary snapshot, or return None if it is missing or stale."""
+        changed, signature = self._snapshot_files.check(force=self._snapshot is None)
+        if not changed:
+            return self._snapshot
+        self._close_snapshot()
+        self._snapshot = open_artist_snapshot(ARTIST_CACHE_SNAPSHOT_FILE, signature)
+        self._snapshot_files.record(signature)
+        return self._snapshot
+
+    def _close_snapshot(self) -> None:
+        if self._snapshot is not None:
+            self._snapshot.close()
+            self._snapshot = None
+            self._snapshot_files.reset()
+
+    def _write_snapshot(self, cache: Dict[str, Dict[str, Any]], signature: Tuple) -> None:
+        """Rebuild the binary snapshot from a freshly read or written cache.
+
+        Args:
+            cache: The cache, as stored in the files.
+            signature: Signature of the cache files holding it.
+        """
+        # The snapshot file can't be replaced while it is mapped on Windows
+        self._close_snapshot()
+        try:
+            write_artist_snapshot(ARTIST_CACHE_SNAPSHOT_FILE, cache, signature)
+        except (OSError, ValueError) as e:
+            print(f"Error writing artist cache snapshot: {e}")
+
+    def get(self, artist_id: str, default: Any = None) -> Any:
+        """Get the cache entry for an artist.
+
+        Args:
+            artist_id: The Spotify artist ID to look up.
+            default: Value to return if the artist is not cached.
+
+        Returns:
+            The cache entry, or the default.
+        """
+        return self.view().get(artist_id, default)
+
+    def get_many(self, artist_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Get cache entries for several artists.
+
+        Args:
+            artist_ids: Spotify artist IDs to look up.
+
+        Returns:
+            Dictionary mapping the cached artist IDs to their entries. Missing IDs are omitted.
+        """
+        view = self.view()
+        return {artist_id: view[artist_id] for artist_id in artist_ids if artist_id in view}
+
+    def __contains__(self, artist_id: str) -> bool:
+        return artist_id in self.view()
+
+    def __len__(self) -> int:
+        return len(self.view())
+
+    def save(self, cache: Optional[MutableMapping[str, Dict[str, Any]]] = None) -> None:
+        """Make the cache the shared in-memory copy and schedule it to be persisted.
+
+        The write happens in the background, coalesced with other saves made
+        within CACHE_FLUSH_INTERVAL seconds. Use flush() to write immediately.
+
+        Args:
+            cache: Cache dictionary to save. Defaults to the shared dictionary.
+        """
+        with self._lock:
+            if cache is None:
+                cache = self.data()
+            self._data = cache
+            self._files.postpone()
+        write_behind_flusher.mark_dirty(ARTIST_CACHE_FILE, self._write)
+
+    def flush(self) -> None:
+        """Write a pending save now instead of waiting for the flusher."""
+        write_behind_flusher.flush(ARTIST_CACHE_FILE)
+
+    def _has_unsaved_changes(self) -> bool:
+        return self._writing or write_behind_flusher.is_dirty(ARTIST_CACHE_FILE)
+
+    def _write(self) -> None:
+        """Write the in-memory cache to its storage backend. Called by the flusher."""
+        with self._lock:
+            if self._data is None:
+                return
+            # Copying the top-level dictionary is atomic, so other threads can
+            # keep adding artists while the copy is written. Shards copy
+            # themselves as they are written.
+            tracked = self._data if isinstance(self._data, TrackedArtistCache) else None
+            changes = tracked.take_changes() if tracked is not None else None
+            cache = self._data.copy() if isinstance(self._data, dict) else self._data
+            self._writing = True
+        try:
+            write_artist_cache_files(cache, changes)
+        except RuntimeError:
+            # An entry was changed while it was being serialized; retry on the next flush
+            if tracked is not None:
+                tracked.restore_changes(*changes)
+            write_behind_flusher.mark_dirty(ARTIST_CACHE_FILE, self._write)
+        except Exception:
+            if tracked is not None:
+                tracked.restore_changes(*changes)
+            raise
+        else:
+            if isinstance(cache, dict):
+                if get_setting('ARTIST_CACHE_SNAPSHOT', False):
+                    # The snapshot was built from the files just replaced, so rebuild it from what was written
+                    with self._lock:
+                        self._write_snapshot(cache, artist_cache_signature())
+                changed_ids = None if changes is None else changes[0] | changes[1]
+                for listener in self._write_listeners:
+                    try:
+                        listener(cache, changed_ids)
+                    except Exception as e:
+                        print(f"Error updating after artist cache write: {e}")
+        finally:
+            with self._lock:
+                self._writing = False
+                self._files.refresh()
+
+    def invalidate(self) -> None:
+        """Drop the in-memory copy so the next access re-reads the backing files.
+
+        Writers that change the cache files without going through save()
+        should call this afterwards.
+        """
+        with self._lock:
+            self._data = None
+            self._files.reset()
+            self._close_snapshot()
+
+
+# Process-wide shared artist cache
+shared_artist_cache = ArtistCache()
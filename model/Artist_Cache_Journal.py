@@ -0,0 +1,173 @@
+"""Append-only mutation journal for the artist genre cache.
+
+This module records changes to the artist cache as small JSON lines appended to
+a log next to the cache snapshot, so single-artist edits cost O(1) I/O instead
+of rewriting the whole cache. The journal is replayed on load and compacted
+into a fresh snapshot by a background thread once it exceeds a size threshold.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, Any, Iterable, Mapping, Optional
+from model.Artist_Record import dumps_artist_cache
+
+
+class ArtistCacheJournal:
+    """Append-only journal of artist cache changes.
+
+    Each line is a JSON record {"id": artist_id, "entry": {...}} that stores
+    an artist's whole entry, or {"id": artist_id, "delete": true} for a
+    removed artist. Journals written with per-field {"set", "unset"} records
+    are still replayed.
+    During compaction the journal is rotated to a '.compacting' file, so new
+    appends never block on the snapshot rewrite.
+
+    Attributes:
+        snapshot_file: Path to the JSON cache snapshot.
+        journal_file: Path to the journal file.
+        max_bytes: Journal size that triggers compaction.
+    """
+
+    def __init__(self, snapshot_file: str, max_bytes: int = 1024 * 1024):
+        """Initialize the journal for a cache snapshot.
+
+        Args:
+            snapshot_file: Path to the JSON cache snapshot.
+            max_bytes: Journal size in bytes that triggers compaction. Defaults to 1 MB.
+        """
+        self.snapshot_file = snapshot_file
+        self.journal_file = snapshot_file + '.journal'
+        self.compacting_file = self.journal_file + '.compacting'
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._compaction_thread: Optional[threading.Thread] = None
+
+    def exists(self) -> bool:
+        """Check whether there are journal records that have not been compacted yet."""
+        return os.path.exists(self.journal_file) or os.path.exists(self.compacting_file)
+
+    def size(self) -> int:
+        """Get the size of the active journal file in bytes."""
+        try:
+            return os.path.getsize(self.journal_file)
+        except OSError:
+            return 0
+
+    def load(self) -> Dict[str, Dict[str, Any]]:
+        """Load the snapshot and replay the journal on top of it.
+
+        Returns:
+            Dictionary mapping artist IDs to their cached data.
+        """
+        with self._lock:
+            cache = _read_snapshot(self.snapshot_file)
+            _replay(self.compacting_file, cache)
+            _replay(self.journal_file, cache)
+        return cache
+
+    def append(self, entries: Mapping[str, Mapping[str, Any]], removed: Iterable[str] = ()) -> None:
+        """Append change records for one or more artists.
+
+        Args:
+            entries: Dictionary mapping added or changed artist IDs to their entries.
+            removed: IDs of removed artists. Defaults to none.
+        """
+        lines = [
+            json.dumps({'id': artist_id, 'entry': dict(entry.items())}, ensure_ascii=False) + '\n'
+            for artist_id, entry in entries.items()
+        ]
+        lines.extend(json.dumps({'id': artist_id, 'delete': True}) + '\n' for artist_id in removed)
+        if not lines:
+            return
+        data = ''.join(lines).encode('utf-8')
+        with self._lock:
+            with open(self.journal_file, 'ab+') as f:
+                # Start on a new line if a crash left a partially written last line
+                if f.seek(0, os.SEEK_END) > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        data = b'\n' + data
+                f.write(data)
+                f.flush()
+                os.fsync(f.fileno())
+        if self.size() > self.max_bytes:
+            self.compact_in_background()
+
+    def clear(self) -> None:
+        """Remove the journal after the snapshot has been rewritten in full."""
+        with self._lock:
+            for path in (self.compacting_file, self.journal_file):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def compact_in_background(self) -> None:
+        """Start a background compaction unless one is already running."""
+        with self._lock:
+            if self._compaction_thread and self._compaction_thread.is_alive():
+                return
+            # If a previous compaction was interrupted, finish that one first
+            if not os.path.exists(self.compacting_file):
+                if not os.path.exists(self.journal_file):
+                    return
+                os.replace(self.journal_file, self.compacting_file)
+            self._compaction_thread = threading.Thread(target=self._compact, daemon=True)
+            self._compaction_thread.start()
+
+    def wait_for_compaction(self) -> None:
+        """Block until a running background compaction has finished."""
+        thread = self._compaction_thread
+        if thread:
+            thread.join()
+
+    def _compact(self) -> None:
+        """Fold the rotated journal into a fresh snapshot."""
+        try:
+            # The snapshot and rotated journal are only rewritten here, so they
+            # can be read without holding the lock
+            cache = _read_snapshot(self.snapshot_file)
+            _replay(self.compacting_file, cache)
+            temp_file = self.snapshot_file + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(dumps_artist_cache(cache))
+                f.flush()
+                os.fsync(f.fileno())
+            with self._lock:
+                os.replace(temp_file, self.snapshot_file)
+                os.remove(self.compacting_file)
+        except Exception as e:
+            print(f"Error compacting artist cache journal: {e}")
+
+
+def _read_snapshot(snapshot_file: str) -> Dict[str, Dict[str, Any]]:
+    """Read the JSON cache snapshot, returning an empty cache if it is missing or corrupted."""
+    if not os.path.exists(snapshot_file):
+        return {}
+    try:
+        with open(snapshot_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (json.JSONDecodeError, FileNotFoundError) as e:
+        print(f"Error loading cache: {e}")
+        return {}
+
+
+def _replay(journal_file: str, cache: Dict[str, Dict[str, Any]]) -> None:
+    """Apply the records of a journal file to a cache in order."""
+    if not os.path.exists(journal_file):
+        return
+    with open(journal_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a partially written last line
+                continue
+            if record.get('delete'):
+                cache.pop(record['id'], None)
+            elif 'entry' in record:
+                cache[record['id']] = record['entry']
+            else:
+                entry = cache.setdefault(record['id'], {})
+                entry.update(record.get('set', {}))
+                for field in record.get('unset', []):
+                    entry.pop(field, None)
@@ -0,0 +1,255 @@
+"""Sharded storage for the artist genre cache.
+
+This module splits the artist cache into 256 JSON shard files keyed by the
+first two characters of the base62 Spotify artist ID. The ShardedArtistCache
+mapping loads a shard only when an artist in it is looked up, and saving
+rewrites only the shards whose contents changed, so batch lookups and caching
+jobs never have to hold the full cache in memory. A small index file records
+the number of artists per shard so the cache size is known without loading it.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections.abc import MutableMapping
+from typing import Dict, Any, Iterable, Iterator, Set
+from model.Artist_Record import loads_artist_cache, dumps_artist_cache
+from model.Cache_Flusher import atomic_write_json, atomic_write_text
+
+# Shard directory path
+ARTIST_CACHE_SHARDS_DIR = "data/artist_cache_shards"
+
+SHARD_COUNT = 256
+SHARD_INDEX_FILE = "index.json"
+_BASE62 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+_BASE62_VALUES = {char: value for value, char in enumerate(_BASE62)}
+
+def shard_index(artist_id: str) -> int:
+    """Get the shard an artist belongs to.
+
+    Args:
+        artist_id: The Spotify artist ID.
+
+    Returns:
+        Shard number between 0 and SHARD_COUNT - 1.
+    """
+    try:
+        prefix = _BASE62_VALUES[artist_id[0]] * 62 + _BASE62_VALUES[artist_id[1]]
+    except (KeyError, IndexError):
+        # Not a base62 Spotify ID
+        return zlib.crc32(artist_id.encode('utf-8')) % SHARD_COUNT
+    return prefix % SHARD_COUNT
+
+def _dump_shard(shard: Dict[str, Dict[str, Any]]) -> str:
+    return dumps_artist_cache(shard)
+
+def _digest(text: str) -> bytes:
+    return hashlib.sha1(text.encode('utf-8')).digest()
+
+_EMPTY_SHARD_DIGEST = _digest(_dump_shard({}))
+
+
+class ShardedArtistCache(MutableMapping):
+    """Artist cache mapping backed by lazily loaded shard files.
+
+    Behaves like the artist cache dictionary. Lookups, assignments and
+    deletions only load the shard of the artist involved; iterating loads
+    every shard. Entries modified in place are detected on save() by
+    comparing each loaded shard with what was last read or written.
+
+    Attributes:
+        directory: Directory holding the shard files.
+    """
+
+    def __init__(self, directory: str = ARTIST_CACHE_SHARDS_DIR):
+        """Open a shard directory without loading any shards.
+
+        Args:
+            directory: Directory holding the shard files. Defaults to ARTIST_CACHE_SHARDS_DIR.
+        """
+        self.directory = directory
+        self._lock = threading.RLock()
+        self._shards: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        self._digests: Dict[int, bytes] = {}
+        self._dirty: Set[int] = set()
+        self._counts = self._read_index()
+
+    @property
+    def index_file(self) -> str:
+        """Path of the file recording the number of artists per shard."""
+        return os.path.join(self.directory, SHARD_INDEX_FILE)
+
+    def shard_file(self, index: int) -> str:
+        """Get the path of a shard file.
+
+        Args:
+            index: Shard number.
+
+        Returns:
+            Path of the shard's JSON file.
+        """
+        return os.path.join(self.directory, f"shard_{index:02x}.json")
+
+    def loaded_shard_count(self) -> int:
+        """Get the number of shards currently held in memory."""
+        return len(self._shards)
+
+    def _read_index(self) -> Dict[int, int]:
+        try:
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                return {int(index): count for index, count in json.load(f).items()}
+        except (OSError, json.JSONDecodeError, ValueError):
+            # Without an index every shard is loaded to count its artists
+            return {}
+
+    def _shard(self, index: int) -> Dict[str, Dict[str, Any]]:
+        """Get a shard, loading it from disk on first access."""
+        shard = self._shards.get(index)
+        if shard is not None:
+            return shard
+        with self._lock:
+            shard = self._shards.get(index)
+            if shard is not None:
+                return shard
+            shard = {}
+            self._digests[index] = _EMPTY_SHARD_DIGEST
+            path = self.shard_file(index)
+            if os.path.exists(path):
+                try:
+                    with open(path, 'r', encoding='utf-8') as f:
+                        text = f.read()
+                    shard = loads_artist_cache(text)
+                    self._digests[index] = _digest(text)
+                except json.JSONDecodeError as e:
+                    print(f"Error loading cache shard {path}: {e}")
+            self._shards[index] = shard
+            self._counts[index] = len(shard)
+            return shard
+
+    def __getitem__(self, artist_id: str) -> Dict[str, Any]:
+        return self._shard(shard_index(artist_id))[artist_id]
+
+    def __contains__(self, artist_id: object) -> bool:
+        return isinstance(artist_id, str) and artist_id in self._shard(shard_index(artist_id))
+
+    def __setitem__(self, artist_id: str, entry: Dict[str, Any]) -> None:
+        index = shard_index(artist_id)
+        with self._lock:
+            self._shard(index)[artist_id] = entry
+            self._dirty.add(index)
+
+    def __delitem__(self, artist_id: str) -> None:
+        index = shard_index(artist_id)
+        with self._lock:
+            del self._shard(index)[artist_id]
+            self._dirty.add(index)
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(SHARD_COUNT):
+            yield from list(self._shard(index))
+
+    def __len__(self) -> int:
+        return sum(
+            len(self._shards[index]) if index in self._shards
+            else self._counts[index] if index in self._counts
+            else len(self._shard(index))
+            for index in range(SHARD_COUNT)
+        )
+
+    def get_many(self, artist_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Get cache entries for several artists, loading only the shards they fall in.
+
+        Args:
+            artist_ids: Spotify artist IDs to look up.
+
+        Returns:
+            Dictionary mapping the cached artist IDs to their entries. Missing IDs are omitted.
+        """
+        entries = {}
+        for artist_id in artist_ids:
+            entry = self._shard(shard_index(artist_id)).get(artist_id)
+            if entry is not None:
+                entries[artist_id] = entry
+        return entries
+
+    def save(self) -> int:
+        """Write the shards that changed since they were loaded or last saved.
+
+        Returns:
+            Number of shard files written.
+        """
+        written = 0
+        with self._lock:
+            loaded = list(self._shards.items())
+        for index, shard in loaded:
+            # Copying is atomic, so other threads can keep adding artists
+            text = _dump_shard(shard.copy())
+            digest = _digest(text)
+            with self._lock:
+                if index not in self._dirty and self._digests.get(index) == digest:
+                    continue
+                self._dirty.discard(index)
+            atomic_write_text(self.shard_file(index), text)
+            with self._lock:
+                self._digests[index] = digest
+                self._counts[index] = len(shard)
+            written += 1
+        if written:
+            self._write_index()
+        return written
+
+    def _write_index(self) -> None:
+        with self._lock:
+            counts = {str(index): count for index, count in sorted(self._counts.items())}
+        atomic_write_json(self.index_file, counts)
+
+
+def write_artist_shards(directory: str, cache: Dict[str, Dict[str, Any]]) -> None:
+    """Write a full artist cache dictionary as shard files.
+
+    Every shard and the index are rewritten, so shards of artists missing
+    from the cache end up empty.
+
+    Args:
+        directory: Directory to write the shard files to.
+        cache: Dictionary mapping artist IDs to their cached data.
+    """
+    shards: Dict[int, Dict[str, Dict[str, Any]]] = {index: {} for index in range(SHARD_COUNT)}
+    for artist_id, entry in cache.items():
+        shards[shard_index(artist_id)][artist_id] = entry
+    sharded = ShardedArtistCache(directory)
+    for index, shard in shards.items():
+        atomic_write_text(sharded.shard_file(index), _dump_shard(shard))
+        sharded._counts[index] = len(shard)
+    sharded._write_index()
+
+def migrate_json_to_shards(json_file: str, directory: str = ARTIST_CACHE_SHARDS_DIR) -> int:
+    """Split the JSON artist cache into shard files.
+
+    Args:
+        json_file: Path to the artist cache JSON file.
+        directory: Directory to write the shard files to. Defaults to ARTIST_CACHE_SHARDS_DIR.
+
+    Returns:
+        Number of artists written.
+    """
+    with open(json_file, 'r', encoding='utf-8') as f:
+        cache: Dict[str, Dict[str, Any]] = json.load(f)
+    write_artist_shards(directory, cache)
+    return len(cache)
+
+def export_shards_to_json(json_file: str, directory: str = ARTIST_CACHE_SHARDS_DIR) -> int:
+    """Merge the shard files back into a single JSON artist cache file.
+
+    Args:
+        json_file: Path of the JSON file to write.
+        directory: Directory holding the shard files. Defaults to ARTIST_CACHE_SHARDS_DIR.
+
+    Returns:
+        Number of artists written.
+    """
+    cache = dict(ShardedArtistCache(directory).items())
+    atomic_write_text(json_file, dumps_artist_cache(cache))
+    return len(cache)
@@ -0,0 +1,273 @@
+"""Compact binary snapshot of the artist genre cache.
+
+This module writes and reads a memory-mapped snapshot of the artist cache so
+lookups can be served at startup without parsing the JSON cache into nested
+dictionaries. The snapshot holds a string table of interned genre and country
+names, fixed-width artist records sorted by ID, an array of genre IDs, a
+blob of artist names and a blob of the other entry fields (normalized
+genres, rules version, fetch times) as compact JSON per artist. The
+snapshot is a read-only view that is rebuilt from the full cache.
+
+File layout (little-endian):
+    header    magic, version, counts, source signature hash, section offsets
+    strings   uint32 offsets[string_count + 1] followed by a UTF-8 blob
+    records   artist_count fixed-width records sorted by artist ID
+    genre_ids uint32 string indexes referenced by the records
+    names     UTF-8 blob of artist names referenced by the records
+    extras    UTF-8 blob of JSON objects with the other fields, referenced by the records
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from typing import Dict, List, Any, Iterator, Optional
+from model.Artist_Record import ArtistRecord
+
+# Snapshot file path
+ARTIST_CACHE_SNAPSHOT_FILE = "data/artist_genre_cache.snapshot"
+
+_MAGIC = b'SPGC'
+_VERSION = 2
+# magic, version, artist count, string count, source signature hash,
+# strings offset, records offset, genre IDs offset, names offset, extras offset
+_HEADER = struct.Struct('<4sIII8sQQQQQ')
+# artist ID, name offset, name length, country string index,
+# first genre ID index, genre count, extras offset, extras length
+_RECORD = struct.Struct('<22sIIIIHII')
+_CORE_FIELDS = ('name', 'genres', 'country')
+_ID_LENGTH = 22
+_NONE = 0xFFFFFFFF
+
+
+def signature_hash(signature: Any) -> bytes:
+    """Hash a cache file signature into the 8 bytes stored in the snapshot header.
+
+    Args:
+        signature: Signature of the cache files the snapshot was built from.
+
+    Returns:
+        8-byte digest of the signature.
+    """
+    return hashlib.sha1(repr(signature).encode('utf-8')).digest()[:8]
+
+
+def write_artist_snapshot(path: str, cache: Dict[str, Dict[str, Any]], signature: Any) -> None:
+    """Write a binary snapshot of the artist cache.
+
+    The file is written to a temporary path and renamed into place, so readers
+    never see a partially written snapshot.
+
+    Args:
+        path: Path of the snapshot file to write.
+        cache: Dictionary mapping artist IDs to their cached data.
+        signature: Signature of the cache files the cache was read from.
+
+    Raises:
+        ValueError: If an artist ID is not a 22-character Spotify ID.
+    """
+    strings: Dict[str, int] = {}
+
+    def intern(value: Optional[str]) -> int:
+        if value is None:
+            return _NONE
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    records = bytearray()
+    genre_ids: List[int] = []
+    names = bytearray()
+    extras = bytearray()
+    for artist_id in sorted(cache):
+        encoded_id = artist_id.encode('ascii')
+        if len(encoded_id) != _ID_LENGTH:
+            raise ValueError(f"Unexpected artist ID format: {artist_id}")
+        entry = cache[artist_id]
+        name = entry.get('name')
+        if name is None:
+            name_offset, name_length = 0, _NONE
+        else:
+            encoded_name = name.encode('utf-8')
+            name_offset, name_length = len(names), len(encoded_name)
+            names += encoded_name
+        genres = entry.get('genres') or []
+        first_genre = len(genre_ids)
+        genre_ids.extend(intern(genre) for genre in genres)
+        extra = {key: value for key, value in entry.items() if key not in _CORE_FIELDS}
+        if extra:
+            encoded_extra = json.dumps(extra, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            extra_offset, extra_length = len(extras), len(encoded_extra)
+            extras += encoded_extra
+        else:
+            extra_offset, extra_length = 0, 0
+        records += _RECORD.pack(
+            encoded_id, name_offset, name_length,
+            intern(entry.get('country')), first_genre, len(genres),
+            extra_offset, extra_length
+        )
+
+    string_offsets = [0]
+    string_blob = bytearray()
+    for value in strings:
+        string_blob += value.encode('utf-8')
+        string_offsets.append(len(string_blob))
+    strings_section = struct.pack(f'<{len(string_offsets)}I', *string_offsets) + bytes(string_blob)
+    genre_ids_section = struct.pack(f'<{len(genre_ids)}I', *genre_ids)
+
+    strings_offset = _HEADER.size
+    records_offset = strings_offset + len(strings_section)
+    genre_ids_offset = records_offset + len(records)
+    names_offset = genre_ids_offset + len(genre_ids_section)
+    extras_offset = names_offset + len(names)
+    header = _HEADER.pack(
+        _MAGIC, _VERSION, len(cache), len(strings), signature_hash(signature),
+        strings_offset, records_offset, genre_ids_offset, names_offset, extras_offset
+    )
+
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(header)
+        f.write(strings_section)
+        f.write(records)
+        f.write(genre_ids_section)
+        f.write(names)
+        f.write(extras)
+    os.replace(temp_path, path)
+
+
+class ArtistSnapshot(Mapping):
+    """Read-only, memory-mapped view of an artist cache snapshot.
+
+    Behaves like the artist cache dictionary for lookups: entries are decoded
+    on access into ArtistRecord objects, using a binary
+    search over the sorted artist records.
+
+    Attributes:
+        path: Path of the snapshot file.
+        source_hash: Hash of the cache file signature the snapshot was built from.
+    """
+
+    def __init__(self, path: str):
+        """Open a snapshot file.
+
+        Args:
+            path: Path of the snapshot file.
+
+        Raises:
+            ValueError: If the file is not a snapshot of a supported version.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (magic, version, self._count, string_count, self.source_hash,
+         self._strings_offset, self._records_offset, self._genre_ids_offset,
+         self._names_offset, self._extras_offset) = _HEADER.unpack_from(self._map, 0)
+        if magic != _MAGIC or version != _VERSION:
+            self._map.close()
+            raise ValueError(f"{path} is not a supported artist cache snapshot")
+        self._strings_blob_offset = self._strings_offset + 4 * (string_count + 1)
+        self._strings: List[Optional[str]] = [None] * string_count
+
+    def close(self) -> None:
+        """Unmap the snapshot file."""
+        self._map.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __iter__(self) -> Iterator[str]:
+        for index in range(self._count):
+            yield self._record_id(index).decode('ascii')
+
+    def __contains__(self, artist_id: object) -> bool:
+        return isinstance(artist_id, str) and self._find(artist_id) is not None
+
+    def __getitem__(self, artist_id: str) -> ArtistRecord:
+        index = self._find(artist_id) if isinstance(artist_id, str) else None
+        if index is None:
+            raise KeyError(artist_id)
+        return self._decode(index)
+
+    def _record_id(self, index: int) -> bytes:
+        offset = self._records_offset + index * _RECORD.size
+        return self._map[offset:offset + _ID_LENGTH]
+
+    def _find(self, artist_id: str) -> Optional[int]:
+        """Binary search the sorted records for an artist ID."""
+        try:
+            key = artist_id.encode('ascii')
+        except UnicodeEncodeError:
+            return None
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._record_id(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._record_id(low) == key:
+            return low
+        return None
+
+    def _string(self, index: int) -> Optional[str]:
+        """Decode an entry of the string table, caching the result."""
+        if index == _NONE:
+            return None
+        value = self._strings[index]
+        if value is None:
+            start, end = struct.unpack_from('<II', self._map, self._strings_offset + 4 * index)
+            offset = self._strings_blob_offset
+            value = self._strings[index] = self._map[offset + start:offset + end].decode('utf-8')
+        return value
+
+    def _decode(self, index: int) -> ArtistRecord:
+        """Decode an artist record into a cache entry."""
+        (_, name_offset, name_length, country, first_genre, genre_count,
+         extra_offset, extra_length) = _RECORD.unpack_from(
+            self._map, self._records_offset + index * _RECORD.size
+        )
+        if name_length == _NONE:
+            name = None
+        else:
+            start = self._names_offset + name_offset
+            name = self._map[start:start + name_length].decode('utf-8')
+        genre_ids = struct.unpack_from(
+            f'<{genre_count}I', self._map, self._genre_ids_offset + 4 * first_genre
+        )
+        extra = {}
+        if extra_length:
+            start = self._extras_offset + extra_offset
+            extra = json.loads(self._map[start:start + extra_length].decode('utf-8'))
+        return ArtistRecord(
+            name,
+            [self._string(genre_id) for genre_id in genre_ids],
+            self._string(country),
+            **extra
+        )
+
+
+def open_artist_snapshot(path: str, signature: Any) -> Optional[ArtistSnapshot]:
+    """Open a snapshot if it exists and was built from the current cache files.
+
+    Args:
+        path: Path of the snapshot file.
+        signature: Current signature of the cache files.
+
+    Returns:
+        The opened snapshot, or None if it is missing, unreadable or stale.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        snapshot = ArtistSnapshot(path)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Error opening artist cache snapshot: {e}")
+        return None
+    if snapshot.source_hash != signature_hash(signature):
+        snapshot.close()
+        return None
+    return snapshot
@@ -0,0 +1,239 @@
+"""SQLite-backed storage for the artist genre cache.
+
+This module stores the artist genre cache in a SQLite database with one row per
+artist, keyed by Spotify artist ID. Single-artist edits become row-level upserts
+instead of rewriting the whole JSON cache. Includes a one-shot migrator from the
+JSON cache file and an export back to JSON for compatibility.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, Any, Iterable, Optional, Set
+from model.Artist_Record import ArtistRecord, dumps_artist_cache
+from model.Cache_Flusher import atomic_write_text
+
+# Database file path
+ARTIST_CACHE_DB_FILE = "data/artist_genre_cache.db"
+
+# Columns stored directly; any other entry fields are kept in the 'extra' column
+_CORE_FIELDS = ('name', 'genres', 'country')
+
+
+class ArtistCacheStore:
+    """SQLite store for artist cache entries.
+
+    Uses WAL mode so readers are not blocked by writers, and a primary key
+    on the artist ID so lookups and upserts touch a single row.
+
+    Attributes:
+        db_file: Path to the SQLite database file.
+    """
+
+    def __init__(self, db_file: str = ARTIST_CACHE_DB_FILE):
+        """Open (and create if needed) the cache database.
+
+        Args:
+            db_file: Path to the SQLite database file. Defaults to ARTIST_CACHE_DB_FILE.
+        """
+        self.db_file = db_file
+        self._lock = threading.Lock()
+        directory = os.path.dirname(db_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS artists ('
+            'artist_id TEXT PRIMARY KEY, '
+            'name TEXT, '
+            'genres TEXT NOT NULL, '
+            'country TEXT, '
+            'extra TEXT'
+            ') WITHOUT ROWID'
+        )
+        self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM artists').fetchone()[0]
+
+    def __contains__(self, artist_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT 1 FROM artists WHERE artist_id = ?', (artist_id,)
+            ).fetchone()
+        return row is not None
+
+    def get(self, artist_id: str) -> Optional[ArtistRecord]:
+        """Get a single cache entry.
+
+        Args:
+            artist_id: The Spotify artist ID to look up.
+
+        Returns:
+            The cache entry, or None if the artist is not stored.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT artist_id, name, genres, country, extra FROM artists WHERE artist_id = ?',
+                (artist_id,)
+            ).fetchone()
+        return _row_to_entry(row)[1] if row else None
+
+    def get_many(self, artist_ids: Iterable[str]) -> Dict[str, ArtistRecord]:
+        """Get cache entries for several artists.
+
+        Args:
+            artist_ids: Spotify artist IDs to look up.
+
+        Returns:
+            Dictionary mapping the stored artist IDs to their entries. Missing IDs are omitted.
+        """
+        ids = list(dict.fromkeys(artist_ids))
+        result: Dict[str, ArtistRecord] = {}
+        # Stay well below SQLite's bound parameter limit
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                placeholders = ','.join('?' * len(chunk))
+                rows = self._conn.execute(
+                    f'SELECT artist_id, name, genres, country, extra FROM artists WHERE artist_id IN ({placeholders})',
+                    chunk
+                ).fetchall()
+                for row in rows:
+                    artist_id, entry = _row_to_entry(row)
+                    result[artist_id] = entry
+        return result
+
+    def load_all(self) -> Dict[str, ArtistRecord]:
+        """Load every cache entry.
+
+        Returns:
+            Dictionary mapping artist IDs to their cached data.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT artist_id, name, genres, country, extra FROM artists'
+            ).fetchall()
+        return dict(_row_to_entry(row) for row in rows)
+
+    def artist_ids(self) -> Set[str]:
+        """Get the IDs of all stored artists.
+
+        Returns:
+            Set of Spotify artist IDs.
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT artist_id FROM artists').fetchall()
+        return {row[0] for row in rows}
+
+    def upsert(self, artist_id: str, entry: Dict[str, Any]) -> None:
+        """Insert or replace a single cache entry.
+
+        Args:
+            artist_id: The Spotify artist ID to store.
+            entry: The cache entry for the artist.
+        """
+        self.upsert_many({artist_id: entry})
+
+    def upsert_many(self, entries: Dict[str, Dict[str, Any]]) -> None:
+        """Insert or replace several cache entries in one transaction.
+
+        Args:
+            entries: Dictionary mapping artist IDs to their cache entries.
+        """
+        if not entries:
+            return
+        rows = [_entry_to_row(artist_id, entry) for artist_id, entry in entries.items()]
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    'INSERT INTO artists (artist_id, name, genres, country, extra) VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT(artist_id) DO UPDATE SET '
+                    'name = excluded.name, genres = excluded.genres, '
+                    'country = excluded.country, extra = excluded.extra',
+                    rows
+                )
+
+    def delete_many(self, artist_ids: Iterable[str]) -> None:
+        """Delete cache entries.
+
+        Args:
+            artist_ids: Spotify artist IDs to remove.
+        """
+        with self._lock:
+            with self._conn:
+                self._conn.executemany(
+                    'DELETE FROM artists WHERE artist_id = ?',
+                    [(artist_id,) for artist_id in artist_ids]
+                )
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def _entry_to_row(artist_id: str, entry: Dict[str, Any]) -> tuple:
+    """Convert a cache entry into a database row."""
+    extra = {key: value for key, value in entry.items() if key not in _CORE_FIELDS}
+    return (
+        artist_id,
+        entry.get('name'),
+        json.dumps(entry.get('genres') or [], ensure_ascii=False),
+        entry.get('country'),
+        json.dumps(extra, ensure_ascii=False) if extra else None
+    )
+
+
+def _row_to_entry(row: tuple) -> tuple:
+    """Convert a database row into an (artist_id, entry) pair."""
+    artist_id, name, genres, country, extra = row
+    entry = ArtistRecord(name, json.loads(genres), country, **(json.loads(extra) if extra else {}))
+    return artist_id, entry
+
+
+def migrate_json_to_sqlite(json_file: str, db_file: str = ARTIST_CACHE_DB_FILE) -> int:
+    """Import an artist cache JSON file into the SQLite store.
+
+    The JSON file is left untouched so it can serve as a backup.
+
+    Args:
+        json_file: Path to the artist cache JSON file.
+        db_file: Path to the SQLite database file. Defaults to ARTIST_CACHE_DB_FILE.
+
+    Returns:
+        Number of artists migrated.
+    """
+    with open(json_file, 'r', encoding='utf-8') as f:
+        cache: Dict[str, Dict[str, Any]] = json.load(f)
+
+    store = ArtistCacheStore(db_file)
+    try:
+        store.upsert_many(cache)
+    finally:
+        store.close()
+    return len(cache)
+
+
+def export_sqlite_to_json(json_file: str, db_file: str = ARTIST_CACHE_DB_FILE) -> int:
+    """Export the SQLite store back to an artist cache JSON file.
+
+    Args:
+        json_file: Path of the JSON file to write.
+        db_file: Path to the SQLite database file. Defaults to ARTIST_CACHE_DB_FILE.
+
+    Returns:
+        Number of artists exported.
+    """
+    store = ArtistCacheStore(db_file)
+    try:
+        cache = store.load_all()
+    finally:
+        store.close()
+
+    atomic_write_text(json_file, dumps_artist_cache(cache))
+    return len(cache)
@@ -2,32 +2,157 @@
 
 This module provides functions for loading, saving, and managing custom artist 
 genres stored in a JSON file. Allows manual addition and retrieval of custom 
-genre assignments for artists.
+genre assignments for artists. The file is loaded once into an in-memory store 
+indexed by artist ID and re-read only when it changes on disk.
 """
 
 import json
 import os
 import re
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Iterable, Optional
 from model.spotify_client import sp
+from model.Cache_Flusher import atomic_write_json, write_behind_flusher
+from model.File_Changes import FileChangeChecker, file_signature
 
 # Custom genres file path
 CUSTOM_GENRES_FILE = "data/custom_artist_genres.json"
 
+
+class CustomGenreStore:
+    """Custom artist genres loaded once and indexed by artist ID.
+    
+    The JSON file is parsed on first use and kept in memory. It is checked 
+    at most once per check_interval seconds and re-read only if its 
+    modification time or size changed. Saves are written behind by the 
+    shared flusher; while a save is pending the in-memory copy is kept.
+    
+    Attributes:
+        path: Path of the custom genres JSON file.
+    """
+    
+    def __init__(self, path: str = CUSTOM_GENRES_FILE, check_interval: float = 1.0):
+        """Initialize an empty, not yet loaded store.
+        
+        Args:
+            path: Path of the custom genres JSON file. Defaults to CUSTOM_GENRES_FILE.
+            check_interval: Minimum seconds between checks of the file. Defaults to 1.0.
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._data: Optional[Dict[str, Dict[str, Any]]] = None
+        self._genres_by_id: Optional[Dict[str, List[str]]] = None
+        self._file = FileChangeChecker(lambda: file_signature(self.path), check_interval)
+        self._writing = False
+    
+    def data(self) -> Dict[str, Dict[str, Any]]:
+        """Get the custom genres dictionary, loading or reloading it if needed.
+        
+        Callers that modify the dictionary should persist it with save().
+        
+        Returns:
+            Dictionary mapping artist IDs to their custom genre data.
+        """
+        with self._lock:
+            changed, signature = self._file.check(force=self._data is None)
+            unsaved = self._writing or write_behind_flusher.is_dirty(self.path)
+            if changed and (self._data is None or not unsaved):
+                self._data = self._read()
+                self._genres_by_id = None
+                self._file.record(signature)
+            return self._data
+    
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except json.JSONDecodeError:
+                print("Custom genres file corrupted, starting with empty cache")
+                return {}
+        return {}
+    
+    def _index(self) -> Dict[str, List[str]]:
+        """Get the artist ID to genre list index, rebuilding it after a load or save."""
+        with self._lock:
+            custom_genres = self.data()
+            if self._genres_by_id is None:
+                index = {}
+                for artist_id, artist_data in custom_genres.items():
+                    if isinstance(artist_data, dict) and 'genres' in artist_data:
+                        index[artist_id] = artist_data['genres']
+                    elif isinstance(artist_data, list):
+                        index[artist_id] = artist_data
+                self._genres_by_id = index
+            return self._genres_by_id
+    
+    def get(self, artist_id: str) -> List[str]:
+        """Get custom genres for an artist.
+        
+        Args:
+            artist_id: The Spotify artist ID to get custom genres for.
+            
+        Returns:
+            List of custom genre names for the artist, empty if it has none.
+        """
+        return self._index().get(artist_id, [])
+    
+    def get_many(self, artist_ids: Iterable[str]) -> Dict[str, List[str]]:
+        """Get custom genres for several artists with a single file check.
+        
+        Args:
+            artist_ids: Spotify artist IDs to get custom genres for.
+            
+        Returns:
+            Dictionary mapping the artist IDs that have custom genres to their genre lists.
+        """
+        index = self._index()
+        return {artist_id: index[artist_id] for artist_id in artist_ids if artist_id in index}
+    
+    def save(self, custom_genres: Optional[Dict[str, Dict[str, Any]]] = None) -> None:
+        """Make the dictionary the in-memory copy and schedule it to be written.
+        
+        Args:
+            custom_genres: Custom genres to save. Defaults to the loaded dictionary.
+        """
+        with self._lock:
+            if custom_genres is None:
+                custom_genres = self.data()
+            self._data = custom_genres
+            self._genres_by_id = None
+            self._file.postpone()
+        write_behind_flusher.mark_dirty(self.path, self._write)
+    
+    def flush(self) -> None:
+        """Write a pending save now instead of waiting for the flusher."""
+        write_behind_flusher.flush(self.path)
+    
+    def _write(self) -> None:
+        """Atomically write the in-memory custom genres. Called by the flusher."""
+        with self._lock:
+            if self._data is None:
+                return
+            custom_genres = self._data.copy()
+            self._writing = True
+        try:
+            atomic_write_json(self.path, custom_genres)
+        finally:
+            with self._lock:
+                self._writing = False
+                self._file.refresh()
+
+
+# Process-wide custom genre store
+custom_genre_store = CustomGenreStore()
+
 def load_custom_genres() -> Dict[str, Dict[str, Any]]:
     """Load custom artist genres from JSON file.
     
     Returns:
-        Dictionary mapping artist IDs to their custom genre data.
+        Dictionary mapping artist IDs to their custom genre data, shared by 
+        every caller in the process.
     """
-    if os.path.exists(CUSTOM_GENRES_FILE):
-        try:
-            with open(CUSTOM_GENRES_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except json.JSONDecodeError:
-            print("Custom genres file corrupted, starting with empty cache")
-            return {}
-    return {}
+    return custom_genre_store.data()
 
 def get_custom_artist_genres(artist_id: str) -> List[str]:
     """Get custom genres for a specific artist from the JSON file.
@@ -38,25 +163,18 @@ def get_custom_artist_genres(artist_id: str) -> List[str]:
     Returns:
         List of custom genre names for the artist.
     """
-    custom_genres = load_custom_genres()
-    
-    if artist_id in custom_genres:
-        artist_data = custom_genres[artist_id]
-        if isinstance(artist_data, dict) and 'genres' in artist_data:
-            return artist_data['genres']
-        elif isinstance(artist_data, list):
-            return artist_data
-    
-    return []
+    return custom_genre_store.get(artist_id)
 
 def save_custom_genres(custom_genres: Dict[str, Dict[str, Any]]) -> None:
     """Save custom artist genres to JSON file.
     
+    The file is written in the background by the write-behind flusher; until 
+    then load_custom_genres() returns the saved dictionary.
+    
     Args:
         custom_genres: Dictionary mapping artist IDs to their custom genre data.
     """
-    with open(CUSTOM_GENRES_FILE, 'w', encoding='utf-8') as f:
-        json.dump(custom_genres, f, indent=2, ensure_ascii=False)
+    custom_genre_store.save(custom_genres)
 
 def add_custom_genres(artist_id: str, genres: List[str], artist_name: str = None) -> None:
     """Add or update custom genres for an artist.
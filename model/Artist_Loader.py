@@ -0,0 +1,138 @@
+"""Coalesces single-artist Spotify lookups into batch requests.
+
+This module provides a loader in the dataloader style: artist IDs
+requested from any thread are queued, and the queue is fetched with one
+Spotify artists request as soon as a caller needs its result (or a full
+batch of 50 is queued), so IDs queued by other threads by then share the
+request. Each caller gets its own artist back. A request for an ID that is
+already queued or being fetched waits for that fetch instead of making
+another. Requests are always sent from a caller's thread.
+"""
+
+import threading
+from concurrent.futures import Future
+from typing import Dict, List, Any, Iterable
+
+# Maximum number of artists per Spotify artists request
+MAX_BATCH_SIZE = 50
+
+
+class ArtistLoader:
+    """Thread-safe loader that batches and deduplicates artist lookups.
+
+    Attributes:
+        client: The spotipy client used for the requests.
+        batch_size: Maximum number of artists per request.
+    """
+
+    def __init__(self, client, batch_size: int = MAX_BATCH_SIZE):
+        """Initialize the loader.
+
+        Args:
+            client: The spotipy client used for the requests.
+            batch_size: Maximum number of artists per request. Defaults to MAX_BATCH_SIZE.
+        """
+        self.client = client
+        self.batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+        self._lock = threading.Lock()
+        self._queued: Dict[str, Future] = {}
+        self._in_flight: Dict[str, Future] = {}
+
+    def load(self, artist_id: str) -> Dict[str, Any]:
+        """Get an artist, batched with other artists requested at about the same time.
+
+        Args:
+            artist_id: The Spotify artist ID to retrieve.
+
+        Returns:
+            Dict containing artist data from Spotify API.
+
+        Raises:
+            LookupError: If Spotify has no artist with this ID.
+            Exception: If the request fails.
+        """
+        future = self._enqueue([artist_id])[0]
+        self.dispatch()
+        return future.result()
+
+    def load_many(self, artist_ids: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Get several artists, batched with other artists requested at about the same time.
+
+        Args:
+            artist_ids: Spotify artist IDs to retrieve.
+
+        Returns:
+            Dictionary mapping artist IDs to artist data. Artists that could not
+            be fetched are left out.
+        """
+        artist_ids = list(dict.fromkeys(artist_ids))
+        futures = self._enqueue(artist_ids)
+        self.dispatch()
+        artists = {}
+        for artist_id, future in zip(artist_ids, futures):
+            try:
+                artists[artist_id] = future.result()
+            except Exception as e:
+                print(f"Error getting artist {artist_id}: {str(e)}")
+        return artists
+
+    def _enqueue(self, artist_ids: List[str]) -> List[Future]:
+        """Queue artist IDs, sending every batch that fills up, and return their futures."""
+        futures = []
+        full_batches = []
+        with self._lock:
+            for artist_id in artist_ids:
+                future = self._queued.get(artist_id) or self._in_flight.get(artist_id)
+                if future is None:
+                    future = Future()
+                    self._queued[artist_id] = future
+                    if len(self._queued) >= self.batch_size:
+                        full_batches.append(self._take_queued())
+                futures.append(future)
+        for batch in full_batches:
+            self._fetch(batch)
+        return futures
+
+    def _take_queued(self) -> Dict[str, Future]:
+        """Move the queued IDs in flight and return them. Called with the lock held."""
+        batch = self._queued
+        self._queued = {}
+        self._in_flight.update(batch)
+        return batch
+
+    def dispatch(self) -> None:
+        """Send the queued partial batch now, from the calling thread.
+
+        load() and load_many() call this before waiting for their results.
+        """
+        with self._lock:
+            batch = self._take_queued()
+        if batch:
+            self._fetch(batch)
+
+    def _fetch(self, batch: Dict[str, Future]) -> None:
+        """Fetch a batch of artists and hand each one to its future."""
+        try:
+            try:
+                artists = self.client.artists(list(batch))['artists']
+            except Exception as e:
+                print(f"Error getting batch of artists: {str(e)}")
+                # Fallback to individual requests for failed batch
+                for artist_id, future in batch.items():
+                    try:
+                        future.set_result(self.client.artist(artist_id))
+                    except Exception as e2:
+                        future.set_exception(e2)
+                return
+            for (artist_id, future), artist in zip(batch.items(), artists):
+                if artist:
+                    future.set_result(artist)
+                else:
+                    future.set_exception(LookupError(f"Artist {artist_id} not found"))
+        finally:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(LookupError("Artist missing from batch response"))
+            with self._lock:
+                for artist_id in batch:
+                    self._in_flight.pop(artist_id, None)
@@ -0,0 +1,373 @@
+"""Compact record type for artist cache entries.
+
+This module provides ArtistRecord, a slotted replacement for the
+{'name', 'genres', 'country'} dictionaries stored in the artist cache, and the
+single encode/decode path used to read and write cache files. Records keep
+dictionary-style access (entry['genres'], entry.get('country')), so code that
+treats cache entries as dictionaries keeps working.
+"""
+
+import json
+import sys
+import threading
+import time
+import weakref
+from collections.abc import MutableMapping
+from typing import Dict, List, Any, Iterable, Iterator, Mapping, Optional, Set, Tuple
+
+_CORE_FIELDS = ('name', 'genres', 'country')
+
+# Data sources whose fetch times are recorded in the 'fetched_at' field
+SOURCE_SPOTIFY = 'spotify'
+SOURCE_WIKIPEDIA = 'wikipedia'
+SOURCE_WIKIDATA = 'wikidata'
+
+# Genres derived from the raw genres, and the genre rules version they were derived with
+NORMALIZED_GENRES_FIELD = 'normalized_genres'
+RULES_VERSION_FIELD = 'rules_version'
+
+_MISSING = object()
+
+
+class ArtistRecord(MutableMapping):
+    """Cached data for one artist.
+
+    The name, genres and country are stored in slots and are always present;
+    any other fields (e.g. timestamps) are kept in a small side dictionary
+    that is only allocated when used. Assigning new genres discards the
+    normalized genres derived from the old ones. A record stored in a
+    TrackedArtistCache reports its own changes to that cache.
+
+    Attributes:
+        name: Artist name, or None if unknown.
+        genres: List of genre names.
+        country: Country name, or None if unknown.
+    """
+
+    __slots__ = ('name', 'genres', 'country', '_extra', '_owner', '_owner_key')
+
+    def __init__(self, name: Optional[str] = None, genres: Optional[List[str]] = None,
+                 country: Optional[str] = None, **extra: Any):
+        """Create a record.
+
+        Args:
+            name: Artist name. Defaults to None.
+            genres: List of genre names. Defaults to an empty list.
+            country: Country name. Defaults to None.
+            **extra: Additional fields to store with the record.
+        """
+        self.name = name
+        self.genres = genres if genres is not None else []
+        self.country = country
+        self._extra: Optional[Dict[str, Any]] = extra or None
+        self._owner: Optional[weakref.ref] = None
+        self._owner_key: Optional[str] = None
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'ArtistRecord':
+        """Create a record from a cache entry dictionary, interning repeated strings.
+
+        Args:
+            data: Cache entry as read from a cache file.
+
+        Returns:
+            The equivalent ArtistRecord.
+        """
+        if isinstance(data, ArtistRecord):
+            return data
+        record = cls.__new__(cls)
+        record.name = data.get('name')
+        genres = data.get('genres')
+        record.genres = [sys.intern(genre) for genre in genres] if genres else []
+        country = data.get('country')
+        record.country = sys.intern(country) if country else country
+        extra = {key: value for key, value in data.items() if key not in _CORE_FIELDS}
+        normalized_genres = extra.get(NORMALIZED_GENRES_FIELD)
+        if normalized_genres:
+            extra[NORMALIZED_GENRES_FIELD] = [sys.intern(genre) for genre in normalized_genres]
+        record._extra = extra or None
+        record._owner = None
+        record._owner_key = None
+        return record
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the record into a plain cache entry dictionary.
+
+        Returns:
+            Dictionary with the name, genres, country and any extra fields.
+        """
+        data = {'name': self.name, 'genres': self.genres, 'country': self.country}
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+    def fetched_at(self, source: str) -> Optional[float]:
+        """Get when data from a source was last fetched for this artist.
+
+        Args:
+            source: One of SOURCE_SPOTIFY, SOURCE_WIKIPEDIA or SOURCE_WIKIDATA.
+
+        Returns:
+            Unix timestamp of the last fetch, or None if it was never recorded.
+        """
+        fetched_at = self._extra.get('fetched_at') if self._extra else None
+        return fetched_at.get(source) if fetched_at else None
+
+    def mark_fetched(self, *sources: str, when: Optional[float] = None) -> None:
+        """Record that data from one or more sources was just fetched.
+
+        Args:
+            *sources: Sources that were fetched.
+            when: Unix timestamp of the fetch. Defaults to now.
+        """
+        when = time.time() if when is None else when
+        fetched_at = dict(self.get('fetched_at') or {})
+        for source in sources:
+            fetched_at[source] = when
+        # Replace rather than update, so a concurrent write never sees the dict change size
+        self['fetched_at'] = fetched_at
+
+    def copy(self) -> 'ArtistRecord':
+        """Get a shallow copy of the record."""
+        return ArtistRecord(self.name, self.genres, self.country, **(self._extra or {}))
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _CORE_FIELDS:
+            return getattr(self, key)
+        if self._extra and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _CORE_FIELDS:
+            setattr(self, key, value)
+            if key == 'genres' and self._extra:
+                self._extra.pop(NORMALIZED_GENRES_FIELD, None)
+                self._extra.pop(RULES_VERSION_FIELD, None)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+        self._mark_changed()
+
+    def __delitem__(self, key: str) -> None:
+        if key in _CORE_FIELDS:
+            # Core fields are always present; deleting resets them
+            self[key] = [] if key == 'genres' else None
+        elif self._extra and key in self._extra:
+            del self._extra[key]
+            self._mark_changed()
+        else:
+            raise KeyError(key)
+
+    def _mark_changed(self) -> None:
+        """Tell the cache holding this record that it needs to be written."""
+        owner = self._owner() if self._owner is not None else None
+        if owner is not None:
+            owner.mark_dirty(self._owner_key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in _CORE_FIELDS or bool(self._extra and key in self._extra)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from _CORE_FIELDS
+        if self._extra:
+            yield from list(self._extra)
+
+    def __len__(self) -> int:
+        return len(_CORE_FIELDS) + (len(self._extra) if self._extra else 0)
+
+    def __repr__(self) -> str:
+        return f"ArtistRecord({self.to_dict()!r})"
+
+
+class TrackedArtistCache(dict):
+    """Artist cache dictionary that records which artists changed.
+
+    Adding, replacing or removing an artist, or changing a field of one of
+    its ArtistRecord entries, marks that artist ID as dirty or deleted, so a
+    save only has to write those artists instead of comparing every entry
+    with what is on disk. Entries passed to the constructor are taken as
+    already persisted.
+    """
+
+    def __init__(self, entries: Mapping[str, Any] = ()):
+        """Create a cache holding entries that are already persisted.
+
+        Args:
+            entries: Mapping of artist IDs to their cache entries.
+        """
+        super().__init__(entries)
+        self._changes_lock = threading.Lock()
+        self._dirty: Set[str] = set()
+        self._deleted: Set[str] = set()
+        self._ref = weakref.ref(self)
+        for artist_id, entry in dict.items(self):
+            self._attach(artist_id, entry)
+
+    def _attach(self, artist_id: str, entry: Any) -> None:
+        if isinstance(entry, ArtistRecord):
+            entry._owner = self._ref
+            entry._owner_key = artist_id
+
+    def _detach(self, artist_id: str, entry: Any) -> None:
+        if isinstance(entry, ArtistRecord) and entry._owner is self._ref and entry._owner_key == artist_id:
+            entry._owner = None
+            entry._owner_key = None
+
+    def mark_dirty(self, artist_id: str) -> None:
+        """Record that an artist was added or changed."""
+        with self._changes_lock:
+            self._deleted.discard(artist_id)
+            self._dirty.add(artist_id)
+
+    def mark_deleted(self, artist_id: str) -> None:
+        """Record that an artist was removed."""
+        with self._changes_lock:
+            self._dirty.discard(artist_id)
+            self._deleted.add(artist_id)
+
+    def take_changes(self) -> Tuple[Set[str], Set[str]]:
+        """Get the artists changed since the last call and start recording afresh.
+
+        Returns:
+            Tuple of (IDs of added or changed artists, IDs of removed artists).
+            Pass them to restore_changes() if writing them fails.
+        """
+        with self._changes_lock:
+            changes = (self._dirty, self._deleted)
+            self._dirty = set()
+            self._deleted = set()
+        return changes
+
+    def restore_changes(self, dirty: Iterable[str], deleted: Iterable[str]) -> None:
+        """Put back changes returned by take_changes() that could not be written.
+
+        Args:
+            dirty: IDs of added or changed artists.
+            deleted: IDs of removed artists.
+        """
+        with self._changes_lock:
+            # Anything recorded since take_changes() is newer and wins
+            self._dirty.update(artist_id for artist_id in dirty if artist_id not in self._deleted)
+            self._deleted.update(artist_id for artist_id in deleted if artist_id not in self._dirty)
+
+    def __setitem__(self, artist_id: str, entry: Any) -> None:
+        old_entry = dict.get(self, artist_id)
+        if old_entry is not entry:
+            self._detach(artist_id, old_entry)
+        super().__setitem__(artist_id, entry)
+        self._attach(artist_id, entry)
+        self.mark_dirty(artist_id)
+
+    def __delitem__(self, artist_id: str) -> None:
+        entry = dict.__getitem__(self, artist_id)
+        super().__delitem__(artist_id)
+        self._detach(artist_id, entry)
+        self.mark_deleted(artist_id)
+
+    def pop(self, artist_id: str, default: Any = _MISSING) -> Any:
+        if artist_id in self:
+            entry = dict.__getitem__(self, artist_id)
+            del self[artist_id]
+            return entry
+        if default is _MISSING:
+            raise KeyError(artist_id)
+        return default
+
+    def popitem(self) -> Tuple[str, Any]:
+        artist_id, entry = super().popitem()
+        self._detach(artist_id, entry)
+        self.mark_deleted(artist_id)
+        return artist_id, entry
+
+    def setdefault(self, artist_id: str, default: Any = None) -> Any:
+        if artist_id not in self:
+            self[artist_id] = default
+        return dict.__getitem__(self, artist_id)
+
+    def update(self, *args: Any, **kwargs: Any) -> None:
+        for artist_id, entry in dict(*args, **kwargs).items():
+            self[artist_id] = entry
+
+    def __ior__(self, other: Mapping[str, Any]) -> 'TrackedArtistCache':
+        self.update(other)
+        return self
+
+    def clear(self) -> None:
+        for artist_id in list(self):
+            del self[artist_id]
+
+
+def _encode_record(value: Any) -> Dict[str, Any]:
+    if isinstance(value, ArtistRecord):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def decode_artist_cache(data: Mapping[str, Mapping[str, Any]]) -> Dict[str, ArtistRecord]:
+    """Convert parsed cache file contents into ArtistRecord entries.
+
+    Args:
+        data: Dictionary mapping artist IDs to cache entry dictionaries.
+
+    Returns:
+        Dictionary mapping artist IDs to their records.
+    """
+    from_dict = ArtistRecord.from_dict
+    return {artist_id: from_dict(entry) for artist_id, entry in data.items()}
+
+_new_record = ArtistRecord.__new__
+_intern = sys.intern
+
+def _decode_entry(data: Dict[str, Any]) -> Any:
+    """json.loads object hook that turns cache entries into records as they are parsed."""
+    if 'genres' not in data:
+        return data
+    if len(data) == 3 and 'name' in data and 'country' in data:
+        # Fast path for the common entry shape
+        record = _new_record(ArtistRecord)
+        record.name = data['name']
+        genres = data['genres']
+        record.genres = [_intern(genre) for genre in genres] if genres else []
+        country = data['country']
+        record.country = _intern(country) if country else country
+        record._extra = None
+        record._owner = None
+        record._owner_key = None
+        return record
+    return ArtistRecord.from_dict(data)
+
+def loads_artist_cache(text: str) -> Dict[str, ArtistRecord]:
+    """Parse the text of a cache file.
+
+    Entries are converted to records by an object hook during parsing, which
+    costs about the same as parsing into plain dictionaries.
+
+    Args:
+        text: JSON text mapping artist IDs to cache entries.
+
+    Returns:
+        Dictionary mapping artist IDs to their records.
+    """
+    cache = json.loads(text, object_hook=_decode_entry)
+    for artist_id, entry in cache.items():
+        # Entries without a genres field are not picked up by the hook
+        if not isinstance(entry, ArtistRecord):
+            cache[artist_id] = ArtistRecord.from_dict(entry)
+    return cache
+
+def dumps_artist_cache(cache: Mapping[str, Mapping[str, Any]]) -> str:
+    """Serialize an artist cache to the text of a cache file.
+
+    The output is compact JSON, which lets the C encoder do all of the work
+    instead of the much slower pure-Python indenting encoder.
+
+    Args:
+        cache: Mapping of artist IDs to records or entry dictionaries.
+
+    Returns:
+        JSON text mapping artist IDs to cache entries.
+    """
+    if not isinstance(cache, dict):
+        cache = dict(cache.items())
+    return json.dumps(cache, ensure_ascii=False, separators=(',', ':'), default=_encode_record)
@@ -0,0 +1,138 @@
+"""Crash-safe, debounced write-behind flushing for cache files.
+
+This module provides atomic JSON writes (temp file + fsync + rename, so a crash
+or cancelled thread can never leave a truncated cache behind) and a background
+flusher that coalesces repeated saves of the same file into at most one write
+every few seconds, with a final flush when the process exits.
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from typing import Dict, Any, Callable, Optional
+from model.settings import get_setting
+
+def atomic_write_text(path: str, text: str) -> None:
+    """Write text to a file atomically.
+
+    The text is written to a temporary file in the same directory, flushed to
+    disk and then renamed over the target, so readers see either the old or
+    the new contents, never a partial file.
+
+    Args:
+        path: Path of the file to write.
+        text: Text to write, encoded as UTF-8.
+    """
+    directory = os.path.dirname(path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+def atomic_write_json(path: str, data: Any, indent: Optional[int] = 2) -> None:
+    """Write JSON to a file atomically.
+
+    Args:
+        path: Path of the JSON file to write.
+        data: JSON-serializable data to write.
+        indent: Indentation passed to json.dumps. Defaults to 2.
+    """
+    atomic_write_text(path, json.dumps(data, ensure_ascii=False, indent=indent))
+
+
+class WriteBehindFlusher:
+    """Background writer that coalesces repeated saves.
+
+    Callers register a write function under a key with mark_dirty(). A
+    background thread runs each pending write at most once per interval,
+    however many times the key was marked dirty in between. Pending writes
+    are also flushed when the process exits.
+
+    Attributes:
+        interval: Minimum seconds between writes. If 0 or less, writes run immediately.
+    """
+
+    def __init__(self, interval: float = 5.0):
+        """Initialize the flusher.
+
+        Args:
+            interval: Minimum seconds between writes. Defaults to 5.0.
+        """
+        self.interval = interval
+        self._pending: Dict[str, Callable[[], None]] = {}
+        self._condition = threading.Condition()
+        self._write_lock = threading.RLock()
+        self._thread: Optional[threading.Thread] = None
+        atexit.register(self.flush)
+
+    def mark_dirty(self, key: str, write: Callable[[], None]) -> None:
+        """Schedule a write, replacing any pending write for the same key.
+
+        Args:
+            key: Identifies the file being written.
+            write: Function that performs the write.
+        """
+        if self.interval <= 0:
+            with self._write_lock:
+                write()
+            return
+        with self._condition:
+            self._pending[key] = write
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def is_dirty(self, key: str) -> bool:
+        """Check whether a write is pending for a key."""
+        with self._condition:
+            return key in self._pending
+
+    def flush(self, key: Optional[str] = None) -> None:
+        """Run pending writes now.
+
+        Args:
+            key: Only flush this key. Defaults to flushing every pending write.
+        """
+        with self._write_lock:
+            with self._condition:
+                if key is None:
+                    writes = list(self._pending.items())
+                    self._pending.clear()
+                elif key in self._pending:
+                    writes = [(key, self._pending.pop(key))]
+                else:
+                    writes = []
+            self._run_writes(writes)
+
+    def _run(self) -> None:
+        """Background loop that writes pending keys at most once per interval."""
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+            # Let further saves accumulate before writing
+            time.sleep(self.interval)
+            self.flush()
+
+    def _run_writes(self, writes) -> None:
+        for key, write in writes:
+            try:
+                write()
+            except Exception as e:
+                print(f"Error writing {key}: {e}")
+
+
+# Process-wide write-behind flusher for cache files
+write_behind_flusher = WriteBehindFlusher(get_setting('CACHE_FLUSH_INTERVAL', 5.0))
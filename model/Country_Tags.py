@@ -0,0 +1,307 @@
+"""Table-driven national genre tags based on artist countries.
+
+This module turns artist countries into national genre tags such as
+"Brazilian Music", "Japanese Music" and "Scandinavian Metal". Countries are
+resolved to a canonical name through an alias table, and the tag rules are
+compiled once into a lookup from canonical country to the rules that apply,
+so tagging a batch of artists or tracks is a dictionary lookup per country.
+Artist tags are stored with an artist's cached genres; track tags are added
+to a track's genres when it is grouped by genre.
+"""
+
+import threading
+from typing import Dict, List, Set, Any, Iterable, Mapping, MutableMapping, NamedTuple, Optional, Sequence, Tuple
+from model.Genre_Rules import get_genre_rules
+
+
+class CountryTagRule(NamedTuple):
+    """A national genre tag and the countries it applies to.
+
+    Attributes:
+        tag: Genre to add.
+        countries: Canonical names of the countries the tag applies to.
+        artist_level: Whether the tag is stored with the genres of each artist
+            from the countries, rather than only added to their tracks.
+        requires_genre: If set, the tag is only added to tracks with a genre
+            that normalizes to a genre containing this text.
+    """
+    tag: str
+    countries: Tuple[str, ...]
+    artist_level: bool = True
+    requires_genre: Optional[str] = None
+
+
+# National genre tags, in the order they are added
+COUNTRY_TAG_RULES: List[CountryTagRule] = [
+    CountryTagRule('Brazilian Music', ('Brazil',)),
+    CountryTagRule('Japanese Music', ('Japan',)),
+    CountryTagRule('Scandinavian Metal', ('Sweden', 'Norway', 'Iceland', 'Finland', 'Denmark'),
+                   artist_level=False, requires_genre='metal'),
+]
+
+# Other names of countries, mapped to their canonical names
+COUNTRY_ALIASES: Dict[str, str] = {
+    'brasil': 'Brazil',
+    'federative republic of brazil': 'Brazil',
+    'empire of brazil': 'Brazil',
+    'nippon': 'Japan',
+    'nihon': 'Japan',
+    'state of japan': 'Japan',
+    'empire of japan': 'Japan',
+    'kingdom of sweden': 'Sweden',
+    'sverige': 'Sweden',
+    'kingdom of norway': 'Norway',
+    'norge': 'Norway',
+    'ísland': 'Iceland',
+    'republic of finland': 'Finland',
+    'suomi': 'Finland',
+    'kingdom of denmark': 'Denmark',
+    'danmark': 'Denmark',
+}
+
+
+class CountryTagger:
+    """Compiled country tag rules.
+
+    A country matches a canonical country if it equals one of its names or
+    aliases, ignoring case and extra spaces. Longer official names, such as
+    "Kingdom of Denmark", only match through the alias table.
+    """
+
+    def __init__(self, rules: Sequence[CountryTagRule] = COUNTRY_TAG_RULES,
+                 aliases: Mapping[str, str] = COUNTRY_ALIASES):
+        """Compile a set of rules.
+
+        Args:
+            rules: Country tag rules. Defaults to COUNTRY_TAG_RULES.
+            aliases: Lowercase country names mapped to canonical names. Defaults to COUNTRY_ALIASES.
+        """
+        self.rules = list(rules)
+        self._canonical: Dict[str, str] = {}
+        self._rules_by_country: Dict[str, Tuple[CountryTagRule, ...]] = {}
+        for rule in self.rules:
+            for country in rule.countries:
+                self._canonical[' '.join(country.lower().split())] = country
+                self._rules_by_country[country] = self._rules_by_country.get(country, ()) + (rule,)
+        for alias, country in aliases.items():
+            self._canonical[' '.join(alias.lower().split())] = country
+        self._country_cache: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def canonical_country(self, country: Optional[str]) -> Optional[str]:
+        """Resolve a country name to the canonical name used by the rules.
+
+        Args:
+            country: Country name as stored in the artist cache.
+
+        Returns:
+            The canonical country name, or None if no rule knows the country.
+        """
+        if not country:
+            return None
+        try:
+            return self._country_cache[country]
+        except KeyError:
+            pass
+        canonical = self._canonical.get(' '.join(country.lower().split()))
+        with self._lock:
+            self._country_cache[country] = canonical
+        return canonical
+
+    def rules_for(self, country: Optional[str]) -> Tuple[CountryTagRule, ...]:
+        """Get the rules that apply to a country.
+
+        Args:
+            country: Country name as stored in the artist cache.
+
+        Returns:
+            Tuple of matching rules, empty if none apply.
+        """
+        return self._rules_by_country.get(self.canonical_country(country), ())
+
+    def rule_mask(self, country: Optional[str]) -> int:
+        """Get the rules that apply to a country as a bitmask.
+
+        Args:
+            country: Country name as stored in the artist cache.
+
+        Returns:
+            Bitmask with bit i set if self.rules[i] applies to the country.
+        """
+        mask = 0
+        for rule in self.rules_for(country):
+            mask |= 1 << self.rules.index(rule)
+        return mask
+
+    def requirement_mask(self, genres: Iterable[str], normalized: bool = False) -> int:
+        """Get the rules whose genre requirement a list of genres meets, as a bitmask.
+
+        A track meets a rule's requirement if the genres of any of its
+        artists do, so the masks of a track's artists can be combined with |.
+
+        Args:
+            genres: Genres to check.
+            normalized: Whether the genres are already normalized. Defaults to False.
+
+        Returns:
+            Bitmask with bit i set if self.rules[i] has no requirement or the genres meet it.
+        """
+        normalized_lower: Optional[List[str]] = None
+        mask = 0
+        for index, rule in enumerate(self.rules):
+            if rule.requires_genre:
+                if normalized_lower is None:
+                    if normalized:
+                        normalized_lower = [genre.lower() for genre in genres]
+                    else:
+                        normalize = get_genre_rules().normalize
+                        normalized_lower = [name.lower() for genre in genres for name in normalize(genre)]
+                if not any(rule.requires_genre in genre for genre in normalized_lower):
+                    continue
+            mask |= 1 << index
+        return mask
+
+    def artist_tag_names(self) -> Set[str]:
+        """Get the lowercase names of every artist-level tag."""
+        return {rule.tag.lower() for rule in self.rules if rule.artist_level}
+
+    def artist_tags(self, country: Optional[str], genres: Iterable[str] = ()) -> List[str]:
+        """Get the artist-level tags for an artist's country.
+
+        Args:
+            country: The artist's country.
+            genres: The artist's genres; tags already among them, ignoring case, are left out.
+
+        Returns:
+            List of tags to add to the artist's genres.
+        """
+        rules = self.rules_for(country)
+        if not rules:
+            return []
+        present = {genre.lower() for genre in genres}
+        return [rule.tag for rule in rules if rule.artist_level and rule.tag.lower() not in present]
+
+    def add_artist_tags(self, genres: List[str], country: Optional[str]) -> List[str]:
+        """Add the artist-level tags for an artist's country to its genres.
+
+        Args:
+            genres: The artist's genres.
+            country: The artist's country.
+
+        Returns:
+            New list of the genres followed by any tags they did not already include.
+        """
+        return genres + self.artist_tags(country, genres)
+
+    def tag_artists(self, artists: Mapping[str, Mapping[str, Any]]) -> Dict[str, List[str]]:
+        """Get the missing artist-level tags of a batch of cache entries.
+
+        Args:
+            artists: Dictionary mapping artist IDs to cache entries.
+
+        Returns:
+            Dictionary mapping the IDs of artists with missing tags to those tags.
+        """
+        tags_by_id = {}
+        for artist_id, entry in artists.items():
+            tags = self.artist_tags(entry.get('country'), entry.get('genres') or [])
+            if tags:
+                tags_by_id[artist_id] = tags
+        return tags_by_id
+
+    def add_artist_tags_batch(self, artists: Mapping[str, MutableMapping[str, Any]]) -> int:
+        """Add the missing artist-level tags to a batch of cache entries in place.
+
+        Args:
+            artists: Dictionary mapping artist IDs to cache entries.
+
+        Returns:
+            Number of entries that were tagged.
+        """
+        tags_by_id = self.tag_artists(artists)
+        for artist_id, tags in tags_by_id.items():
+            entry = artists[artist_id]
+            entry['genres'] = (entry.get('genres') or []) + tags
+        return len(tags_by_id)
+
+    def track_tags(self, countries: Iterable[Optional[str]], genres: Iterable[str],
+                   normalized: bool = False) -> List[str]:
+        """Get the tags for a track from the countries of its artists.
+
+        Args:
+            countries: Countries of the track's artists.
+            genres: The track's genres; tags already among them, ignoring case, are left out.
+            normalized: Whether the genres are already normalized. Defaults to False.
+
+        Returns:
+            List of tags to add to the track's genres, in rule order.
+        """
+        matched: Dict[CountryTagRule, None] = {}
+        for country in countries:
+            for rule in self.rules_for(country):
+                matched[rule] = None
+        if not matched:
+            return []
+        genres = list(genres)
+        present = {genre.lower() for genre in genres}
+        normalized_lower: Optional[List[str]] = None
+        tags = []
+        for rule in self.rules:
+            if rule not in matched or rule.tag.lower() in present:
+                continue
+            if rule.requires_genre:
+                if normalized_lower is None:
+                    if normalized:
+                        normalized_lower = [genre.lower() for genre in genres]
+                    else:
+                        normalize = get_genre_rules().normalize
+                        normalized_lower = [name.lower() for genre in genres for name in normalize(genre)]
+                if not any(rule.requires_genre in genre for genre in normalized_lower):
+                    continue
+            tags.append(rule.tag)
+        return tags
+
+
+    def tag_tracks(self, tracks: Mapping[str, Sequence[str]],
+                   artist_cache: Mapping[str, Mapping[str, Any]],
+                   artist_genres: Optional[Mapping[str, Iterable[str]]] = None) -> Dict[str, List[str]]:
+        """Get the tags of a batch of tracks in one pass.
+
+        Args:
+            tracks: Dictionary mapping track IDs to the IDs of their artists.
+            artist_cache: Artist cache to read the artists' countries from.
+            artist_genres: Optional dictionary mapping artist IDs to the genres
+                the tracks get from them, e.g. from get_artist_genres_batch(),
+                which also covers artists that are not cached. Defaults to the
+                artists' cached genres.
+
+        Returns:
+            Dictionary mapping the IDs of tracks with tags to their tags.
+        """
+        # Resolve each artist's country once for the whole batch
+        rules_by_artist: Dict[str, Tuple[CountryTagRule, ...]] = {}
+        tags_by_id = {}
+        for track_id, artist_ids in tracks.items():
+            countries = []
+            for artist_id in artist_ids:
+                rules = rules_by_artist.get(artist_id)
+                if rules is None:
+                    entry = artist_cache[artist_id] if artist_id in artist_cache else None
+                    rules = rules_by_artist[artist_id] = self.rules_for(entry.get('country') if entry else None)
+                if rules:
+                    countries.append(artist_cache[artist_id].get('country'))
+            if not countries:
+                continue
+            if artist_genres is None:
+                genres = [genre for artist_id in artist_ids if artist_id in artist_cache
+                          for genre in artist_cache[artist_id].get('genres') or []]
+            else:
+                genres = [genre for artist_id in artist_ids for genre in artist_genres.get(artist_id, ())]
+            tags = self.track_tags(countries, genres)
+            if tags:
+                tags_by_id[track_id] = tags
+        return tags_by_id
+
+
+# Process-wide country tagger
+country_tagger = CountryTagger()
@@ -0,0 +1,91 @@
+"""Change detection for files that are kept in memory.
+
+This module provides the check shared by the in-memory stores (artist cache,
+custom genres, genre rules): the backing files are looked at no more than
+once per check interval, and their contents are only re-read when their
+modification time or size differs from what was last loaded or written.
+"""
+
+import os
+import time
+from typing import Any, Callable, Optional, Tuple
+
+
+def file_signature(path: str) -> Optional[Tuple[int, int]]:
+    """Get the (modification time, size) of a file.
+
+    Args:
+        path: Path of the file.
+
+    Returns:
+        The signature, or None if the file does not exist.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class FileChangeChecker:
+    """Rate-limited check of whether backing files changed since they were loaded.
+
+    Callers hold their own lock around check() and record().
+
+    Attributes:
+        check_interval: Minimum seconds between checks of the files.
+        signature: Signature of the files as last loaded or written, or None
+            if nothing was recorded yet.
+    """
+
+    def __init__(self, get_signature: Callable[[], Any], check_interval: float = 1.0):
+        """Initialize a checker with nothing recorded.
+
+        Args:
+            get_signature: Function returning the current signature of the
+                files, e.g. lambda: file_signature(path).
+            check_interval: Minimum seconds between checks. Defaults to 1.0.
+        """
+        self.check_interval = check_interval
+        self.signature: Any = None
+        self._get_signature = get_signature
+        self._last_check = 0.0
+
+    def due(self) -> bool:
+        """Check whether check_interval seconds have passed since the last check."""
+        return time.monotonic() - self._last_check >= self.check_interval
+
+    def check(self, force: bool = False) -> Tuple[bool, Any]:
+        """Look at the files if a check is due.
+
+        Args:
+            force: Look at the files now and report them as changed, e.g.
+                because nothing has been loaded yet. Defaults to False.
+
+        Returns:
+            Tuple of (whether the files need to be re-read, their current
+            signature). Pass the signature to record() once they have been.
+        """
+        if not force and not self.due():
+            return False, self.signature
+        self._last_check = time.monotonic()
+        signature = self._get_signature()
+        return force or signature != self.signature, signature
+
+    def record(self, signature: Any) -> None:
+        """Record the signature of the files that were just read."""
+        self.signature = signature
+        self._last_check = time.monotonic()
+
+    def refresh(self) -> None:
+        """Record the current signature after writing the files."""
+        self.record(self._get_signature())
+
+    def postpone(self) -> None:
+        """Start a new check interval without looking at the files."""
+        self._last_check = time.monotonic()
+
+    def reset(self) -> None:
+        """Forget the recorded signature and make the next check due."""
+        self.signature = None
+        self._last_check = 0.0
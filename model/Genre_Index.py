@@ -0,0 +1,421 @@
+"""Persistent inverted index from genres to artists and playlist tracks.
+
+This module keeps, for every indexed source playlist, the genres of each of
+its tracks, together with posting sets mapping each genre and each
+normalized genre to the tracks that have it, and maps normalized genres to
+the cached artists that have them. The index is kept up to date
+incrementally: writes of the shared artist cache update the artists they
+changed and recompute those artists' tracks, and syncing a playlist only
+recomputes the tracks that were added or whose artists' cache entries
+changed since the last sync, so finding the tracks of a genre is a direct
+lookup instead of a scan over the whole playlist. The indexed track and
+artist data is saved to data/genre_index.json and the postings are rebuilt
+from it on load.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Set, Any, Iterable, Mapping, Optional, Tuple
+from model.Genre_Tools import ArtistGenreResolver, normalized_genre_keys
+from model.Artist_Cache import shared_artist_cache
+from model.Genre_Rules import get_genre_rules
+from model.Cache_Flusher import atomic_write_text, write_behind_flusher
+
+# Index file path
+GENRE_INDEX_FILE = "data/genre_index.json"
+
+# Indexed state of an artist: (genres, country)
+ArtistState = Tuple[Tuple[str, ...], Optional[str]]
+
+
+def _artist_state(entry: Optional[Mapping[str, Any]]) -> Optional[ArtistState]:
+    """Get the part of a cache entry that track genres are computed from."""
+    if entry is None:
+        return None
+    return (tuple(entry.get('genres') or ()), entry.get('country'))
+
+def _add_postings(postings: Dict[str, Set[str]], keys: Iterable[str], value: str) -> None:
+    for key in keys:
+        postings.setdefault(key, set()).add(value)
+
+def _remove_postings(postings: Dict[str, Set[str]], keys: Iterable[str], value: str) -> None:
+    for key in keys:
+        values = postings.get(key)
+        if values is not None:
+            values.discard(value)
+            if not values:
+                del postings[key]
+
+
+class _PlaylistIndex:
+    """Track genres and genre postings of one source playlist."""
+
+    def __init__(self):
+        self.track_artists: Dict[str, Tuple[str, ...]] = {}
+        # None marks tracks with an artist missing from the cache; they are not posted
+        self.track_genres: Dict[str, Optional[Tuple[str, ...]]] = {}
+        self.artist_tracks: Dict[str, Set[str]] = {}
+        self.genre_tracks: Dict[str, Set[str]] = {}
+        # Lowercase normalized genre postings, built on first use
+        self._normalized_tracks: Optional[Dict[str, Set[str]]] = None
+        self._normalized_version: Optional[str] = None
+        # Genre rules version the track genres were computed with
+        self.tracks_rules_version: Optional[str] = None
+
+    def set_track(self, track_id: str, artist_ids: Tuple[str, ...], genres: Optional[Tuple[str, ...]]) -> None:
+        old_artists = self.track_artists.get(track_id)
+        if old_artists != artist_ids:
+            if old_artists is not None:
+                _remove_postings(self.artist_tracks, old_artists, track_id)
+            _add_postings(self.artist_tracks, artist_ids, track_id)
+            self.track_artists[track_id] = artist_ids
+        old_genres = self.track_genres.get(track_id)
+        self.track_genres[track_id] = genres
+        if old_genres == genres:
+            return
+        _remove_postings(self.genre_tracks, old_genres or (), track_id)
+        _add_postings(self.genre_tracks, genres or (), track_id)
+        if self._normalized_tracks is not None:
+            old_keys = normalized_genre_keys(old_genres or ())
+            new_keys = normalized_genre_keys(genres or ())
+            _remove_postings(self._normalized_tracks, old_keys - new_keys, track_id)
+            _add_postings(self._normalized_tracks, new_keys - old_keys, track_id)
+
+    def remove_track(self, track_id: str) -> None:
+        artist_ids = self.track_artists.pop(track_id, ())
+        _remove_postings(self.artist_tracks, artist_ids, track_id)
+        genres = self.track_genres.pop(track_id, None) or ()
+        _remove_postings(self.genre_tracks, genres, track_id)
+        if self._normalized_tracks is not None:
+            _remove_postings(self._normalized_tracks, normalized_genre_keys(genres), track_id)
+
+    def normalized_tracks(self) -> Dict[str, Set[str]]:
+        """Get the lowercase normalized genre postings, rebuilding them when the genre rules changed."""
+        version = get_genre_rules().version
+        if self._normalized_tracks is None or self._normalized_version != version:
+            postings: Dict[str, Set[str]] = {}
+            for track_id, genres in self.track_genres.items():
+                _add_postings(postings, normalized_genre_keys(genres or ()), track_id)
+            self._normalized_tracks = postings
+            self._normalized_version = version
+        return self._normalized_tracks
+
+
+class GenreIndex:
+    """Inverted index from genres to cached artists and to source playlist tracks.
+
+    Track genres are the genres get_track_genres() returns from the artist
+    cache, including country tags, computed with one ArtistGenreResolver
+    per sync or cache write. Tracks by an artist that is not cached
+    are kept out of the postings until the artist is cached,
+    like create_genre_playlists() always skipped them.
+
+    Attributes:
+        path: Path of the index file.
+    """
+
+    def __init__(self, path: str = GENRE_INDEX_FILE):
+        """Initialize an index that is loaded from its file on first use.
+
+        Args:
+            path: Path of the index file. Defaults to GENRE_INDEX_FILE.
+        """
+        self.path = path
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._artists: Dict[str, ArtistState] = {}
+        self._playlists: Dict[str, _PlaylistIndex] = {}
+        # Lowercase normalized genre to artist postings, built on first use
+        self._artist_postings: Optional[Dict[str, Set[str]]] = None
+        self._artist_postings_version: Optional[str] = None
+
+    def _load(self) -> None:
+        """Read the index file once and rebuild the postings from it."""
+        if self._loaded:
+            return
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except json.JSONDecodeError:
+            print("Genre index file corrupted, rebuilding it on the next sync")
+            return
+        self._artists = {
+            artist_id: (tuple(state['genres']), state['country'])
+            for artist_id, state in data.get('artists', {}).items()
+        }
+        for playlist_id, playlist_data in data.get('playlists', {}).items():
+            playlist = self._playlists[playlist_id] = _PlaylistIndex()
+            playlist.tracks_rules_version = playlist_data.get('rules_version')
+            for track_id, track in playlist_data.get('tracks', {}).items():
+                genres = track.get('genres')
+                playlist.set_track(track_id, tuple(track['artists']), None if genres is None else tuple(genres))
+
+    def _set_artist(self, artist_id: str, state: Optional[ArtistState]) -> None:
+        """Record an artist's new state, keeping the artist postings up to date."""
+        old = self._artists.pop(artist_id, None)
+        if state is not None:
+            self._artists[artist_id] = state
+        if self._artist_postings is not None:
+            old_keys = normalized_genre_keys(old[0] if old else ())
+            new_keys = normalized_genre_keys(state[0] if state else ())
+            _remove_postings(self._artist_postings, old_keys - new_keys, artist_id)
+            _add_postings(self._artist_postings, new_keys - old_keys, artist_id)
+
+    def _refresh_artists(self, artist_ids: Iterable[str],
+                         artist_cache: Mapping[str, Dict[str, Any]]) -> Dict[str, Optional[ArtistState]]:
+        """Update the state of artists from the cache.
+
+        Returns:
+            Dictionary mapping the artist IDs whose cache entries changed since
+            they were indexed to their previous states.
+        """
+        previous = {}
+        for artist_id in artist_ids:
+            state = _artist_state(artist_cache.get(artist_id))
+            old = self._artists.get(artist_id)
+            if old != state:
+                self._set_artist(artist_id, state)
+                previous[artist_id] = old
+        return previous
+
+    def _compute_tracks(self, playlist: _PlaylistIndex, tracks: Dict[str, Tuple[str, ...]],
+                        resolver: ArtistGenreResolver, progress_callback=None) -> None:
+        """Recompute the genres of tracks, given as a dictionary mapping track IDs to artist IDs.
+
+        The progress callback is called with the number of tracks done so far.
+        """
+        total = len(tracks)
+        for idx, (track_id, artist_ids) in enumerate(tracks.items(), 1):
+            if all(artist_id in self._artists for artist_id in artist_ids):
+                track = {'track': {'id': track_id, 'artists': [{'id': artist_id} for artist_id in artist_ids]}}
+                genres = tuple(resolver.track_genres(track))
+            else:
+                genres = None
+            playlist.set_track(track_id, artist_ids, genres)
+            if progress_callback and (idx % 100 == 0 or idx == total):
+                progress_callback(idx)
+
+    def sync_playlist(self, playlist_id: str, tracks: List[Dict[str, Any]],
+                      artist_cache: Mapping[str, Dict[str, Any]], progress_callback=None) -> int:
+        """Bring a playlist's index up to date with its current tracks and the artist cache.
+
+        Only tracks that were added, or whose artists were added to or
+        changed in the cache since the last sync, are recomputed. If the sync
+        is interrupted, e.g. by a progress callback that raises to cancel it,
+        the changed artists and genre rules are not recorded as indexed, so
+        the next sync recomputes their tracks.
+
+        Args:
+            playlist_id: The Spotify playlist ID.
+            tracks: Current playlist items, as returned by get_playlist_tracks().
+            artist_cache: Artist cache to read the artists' genres and countries from.
+            progress_callback: Optional callback function called with (current, total)
+                tracks of the playlist processed. Tracks that need no
+                recomputing count as processed from the start.
+
+        Returns:
+            Number of tracks recomputed.
+        """
+        current: Dict[str, Tuple[str, ...]] = {}
+        for item in tracks:
+            track = item.get('track') if item else None
+            if track and track.get('id'):
+                current[track['id']] = tuple(artist['id'] for artist in track['artists'])
+        with self._lock:
+            self._load()
+            playlist = self._playlists.setdefault(playlist_id, _PlaylistIndex())
+            for track_id in set(playlist.track_artists) - set(current):
+                playlist.remove_track(track_id)
+            artist_ids = {artist_id for artist_ids in current.values() for artist_id in artist_ids}
+            previous_states = self._refresh_artists(artist_ids, artist_cache)
+            changed_artists = set(previous_states)
+            version = get_genre_rules().version
+            if playlist.tracks_rules_version != version:
+                # Country tags depend on the genre rules, so every track is recomputed
+                stale = set(current)
+            else:
+                stale = {
+                    track_id for track_id, artist_ids in current.items()
+                    if playlist.track_artists.get(track_id) != artist_ids
+                }
+                # Includes tracks waiting for an artist that has now been cached
+                for artist_id in changed_artists:
+                    stale.update(playlist.artist_tracks.get(artist_id, ()))
+            total = len(current)
+            unchanged = total - len(stale)
+            report_progress = None
+            if progress_callback and total:
+                progress_callback(unchanged, total)
+                report_progress = lambda done: progress_callback(unchanged + done, total)
+            try:
+                resolver = ArtistGenreResolver(artist_cache)
+                self._compute_tracks(playlist, {track_id: current[track_id] for track_id in stale},
+                                     resolver, report_progress)
+                # Other playlists with the changed artists are out of date too
+                if changed_artists:
+                    self._recompute_artist_tracks(changed_artists, resolver, skip=playlist_id)
+            except BaseException:
+                # Forget the new artist states, so the next sync sees them as changed again
+                for artist_id, state in previous_states.items():
+                    self._set_artist(artist_id, state)
+                raise
+            playlist.tracks_rules_version = version
+        return len(stale)
+
+    def update_artists(self, artist_cache: Mapping[str, Dict[str, Any]],
+                       artist_ids: Optional[Iterable[str]] = None) -> int:
+        """Update the index after artist cache entries changed.
+
+        Called after every write of the shared artist cache, so the artist
+        postings and the tracks of changed artists in every indexed playlist
+        are current without waiting for the next sync.
+
+        Args:
+            artist_cache: Artist cache to read the artists' genres and countries from.
+            artist_ids: Artists to check. Defaults to every artist in the cache
+                or the index, which also indexes newly cached artists.
+
+        Returns:
+            Number of artists whose entries changed.
+        """
+        with self._lock:
+            self._load()
+            if artist_ids is None:
+                artist_ids = set(artist_cache) | set(self._artists)
+            changed_artists = set(self._refresh_artists(artist_ids, artist_cache))
+            if changed_artists:
+                self._recompute_artist_tracks(changed_artists, ArtistGenreResolver(artist_cache))
+        return len(changed_artists)
+
+    def _recompute_artist_tracks(self, artist_ids: Set[str], resolver: ArtistGenreResolver,
+                                 skip: Optional[str] = None) -> None:
+        for playlist_id, playlist in self._playlists.items():
+            if playlist_id == skip:
+                continue
+            stale = set()
+            for artist_id in artist_ids:
+                stale.update(playlist.artist_tracks.get(artist_id, ()))
+            self._compute_tracks(playlist, {track_id: playlist.track_artists[track_id] for track_id in stale},
+                                 resolver)
+
+    def genre_tracks(self, playlist_id: str) -> Dict[str, Set[str]]:
+        """Get the tracks of an indexed playlist grouped by genre.
+
+        Args:
+            playlist_id: The Spotify playlist ID.
+
+        Returns:
+            Dictionary mapping each genre to the set of its track IDs.
+        """
+        with self._lock:
+            self._load()
+            playlist = self._playlists.get(playlist_id)
+            if playlist is None:
+                return {}
+            return {genre: set(track_ids) for genre, track_ids in playlist.genre_tracks.items()}
+
+    def tracks_for_genre(self, playlist_id: str, genre: str) -> Set[str]:
+        """Get the tracks of an indexed playlist that belong in a genre playlist.
+
+        A track belongs in a genre if one of its genres normalizes to it,
+        compared case-insensitively, as in should_track_be_in_playlist().
+
+        Args:
+            playlist_id: The Spotify playlist ID.
+            genre: Genre name of the genre playlist.
+
+        Returns:
+            Set of track IDs.
+        """
+        with self._lock:
+            self._load()
+            playlist = self._playlists.get(playlist_id)
+            if playlist is None:
+                return set()
+            return set(playlist.normalized_tracks().get(genre.lower(), ()))
+
+    def track_in_genre(self, playlist_id: str, track_id: str, genre: str) -> bool:
+        """Check whether a track of an indexed playlist belongs in a genre playlist.
+
+        Args:
+            playlist_id: The Spotify playlist ID.
+            track_id: The Spotify track ID.
+            genre: Genre name of the genre playlist.
+
+        Returns:
+            True if one of the track's genres normalizes to the genre, as in
+            should_track_be_in_playlist().
+        """
+        with self._lock:
+            self._load()
+            playlist = self._playlists.get(playlist_id)
+            if playlist is None:
+                return False
+            return track_id in playlist.normalized_tracks().get(genre.lower(), ())
+
+    def artists_for_genre(self, genre: str) -> Set[str]:
+        """Get the indexed artists with a normalized genre.
+
+        Args:
+            genre: Normalized genre name, compared case-insensitively.
+
+        Returns:
+            Set of artist IDs.
+        """
+        with self._lock:
+            self._load()
+            version = get_genre_rules().version
+            if self._artist_postings is None or self._artist_postings_version != version:
+                postings: Dict[str, Set[str]] = {}
+                for artist_id, (genres, _) in self._artists.items():
+                    _add_postings(postings, normalized_genre_keys(genres), artist_id)
+                self._artist_postings = postings
+                self._artist_postings_version = version
+            return set(self._artist_postings.get(genre.lower(), ()))
+
+    def save(self) -> None:
+        """Schedule the index to be written by the write-behind flusher."""
+        write_behind_flusher.mark_dirty(self.path, self._write)
+
+    def flush(self) -> None:
+        """Write a pending save now instead of waiting for the flusher."""
+        write_behind_flusher.flush(self.path)
+
+    def _write(self) -> None:
+        """Atomically write the indexed artists and tracks. Called by the flusher."""
+        with self._lock:
+            data = {
+                'artists': {
+                    artist_id: {'genres': list(genres), 'country': country}
+                    for artist_id, (genres, country) in self._artists.items()
+                },
+                'playlists': {
+                    playlist_id: {'rules_version': playlist.tracks_rules_version, 'tracks': {
+                        track_id: {
+                            'artists': list(artist_ids),
+                            'genres': None if playlist.track_genres.get(track_id) is None
+                            else list(playlist.track_genres[track_id])
+                        }
+                        for track_id, artist_ids in playlist.track_artists.items()
+                    }}
+                    for playlist_id, playlist in self._playlists.items()
+                }
+            }
+            text = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        atomic_write_text(self.path, text)
+
+
+# Process-wide genre index
+genre_index = GenreIndex()
+
+def _update_after_cache_write(artist_cache: Mapping[str, Dict[str, Any]],
+                              artist_ids: Optional[Set[str]]) -> None:
+    """Update and save the genre index after the shared artist cache was written."""
+    if genre_index.update_artists(artist_cache, artist_ids):
+        genre_index.save()
+
+shared_artist_cache.add_write_listener(_update_after_cache_write)
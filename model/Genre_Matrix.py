@@ -0,0 +1,191 @@
+"""Sparse track by genre incidence matrix for playlist genre analysis.
+
+This module builds a SciPy CSR matrix with one row per playlist track and
+one column per genre found in the playlist, with a 1 wherever a track has a
+genre, plus a matching track by country matrix from the artists' cached
+countries. Track genres are resolved once with an ArtistGenreResolver, so
+genre statistics such as rankings become column sums, and statistics for a
+subset of tracks (e.g. only tracks by artists from Japan) become masked
+column sums, instead of loops over per-track genre lists.
+"""
+
+from typing import Dict, List, Any, Iterable, Mapping, Optional, Tuple
+import numpy as np
+from scipy import sparse
+from model.Genre_Tools import ArtistGenreResolver, iter_genre_ids, genre_vocabulary
+from model.Country_Tags import country_tagger
+
+
+def _canonical_country(country: str) -> str:
+    """Get the lowercase name countries are compared by, resolving known aliases."""
+    return (country_tagger.canonical_country(country) or country).lower()
+
+
+class TrackGenreMatrix:
+    """Track by genre incidence matrix of a playlist.
+
+    Attributes:
+        track_ids: Track IDs, indexed by row.
+        genres: Genre names, indexed by column, in genre vocabulary order.
+        matrix: CSR matrix of shape (tracks, genres), 1 where a track has a genre.
+        countries: Lowercase canonical country names, indexed by column of country_matrix.
+        country_matrix: CSR matrix of shape (tracks, countries), 1 where one of
+            a track's artists is from a country.
+    """
+
+    def __init__(self, track_ids: List[str], genres: List[str], matrix: sparse.csr_matrix,
+                 countries: List[str], country_matrix: sparse.csr_matrix):
+        """Wrap prebuilt matrices. Use from_tracks() to build them from a playlist.
+
+        Args:
+            track_ids: Track IDs, indexed by row.
+            genres: Genre names, indexed by column of matrix.
+            matrix: Track by genre incidence matrix.
+            countries: Lowercase canonical country names, indexed by column of country_matrix.
+            country_matrix: Track by country incidence matrix.
+        """
+        self.track_ids = track_ids
+        self.genres = genres
+        self.matrix = matrix
+        self.countries = countries
+        self.country_matrix = country_matrix
+        self._genre_columns = {genre: column for column, genre in enumerate(genres)}
+
+    @classmethod
+    def from_tracks(cls, tracks: Iterable[Dict[str, Any]],
+                    artist_cache: Optional[Mapping[str, Dict[str, Any]]] = None,
+                    normalized: bool = True,
+                    resolver: Optional[ArtistGenreResolver] = None) -> 'TrackGenreMatrix':
+        """Build the matrices for a playlist's tracks.
+
+        Args:
+            tracks: Playlist items, as returned by get_playlist_tracks(). Items
+                without a track are skipped, and a track that appears more
+                than once gets a single row.
+            artist_cache: Optional pre-loaded artist cache. If None, uses the shared cache view.
+            normalized: Whether to use the normalized genres instead of the raw ones.
+                Defaults to True.
+            resolver: Optional resolver to reuse; replaces artist_cache and normalized.
+
+        Returns:
+            The track by genre matrix.
+        """
+        unique_tracks: Dict[str, Dict[str, Any]] = {}
+        for track in tracks:
+            if track and track['track']:
+                unique_tracks.setdefault(track['track']['id'], track)
+        tracks = list(unique_tracks.values())
+        if resolver is None:
+            resolver = ArtistGenreResolver(artist_cache, normalized=normalized)
+        resolver.prefetch(tracks)
+        artist_cache = resolver.artist_cache
+
+        track_ids: List[str] = []
+        genre_ids: List[int] = []
+        genre_indptr = [0]
+        country_columns: Dict[str, int] = {}
+        country_ids: List[int] = []
+        country_indptr = [0]
+        for track in tracks:
+            track_ids.append(track['track']['id'])
+            genre_ids.extend(iter_genre_ids(resolver.track_bits(track)))
+            genre_indptr.append(len(genre_ids))
+            track_countries = set()
+            for artist in track['track']['artists']:
+                entry = artist_cache[artist['id']] if artist['id'] in artist_cache else None
+                country = entry.get('country') if entry else None
+                if country:
+                    track_countries.add(country_columns.setdefault(_canonical_country(country), len(country_columns)))
+            country_ids.extend(sorted(track_countries))
+            country_indptr.append(len(country_ids))
+
+        # Keep only the genre vocabulary IDs that occur, as consecutive columns
+        vocabulary_ids, columns = np.unique(np.asarray(genre_ids, dtype=np.int64), return_inverse=True)
+        matrix = sparse.csr_matrix(
+            (np.ones(len(genre_ids), dtype=np.int32), columns.ravel(), np.asarray(genre_indptr)),
+            shape=(len(track_ids), len(vocabulary_ids))
+        )
+        country_matrix = sparse.csr_matrix(
+            (np.ones(len(country_ids), dtype=np.int32), np.asarray(country_ids, dtype=np.int64),
+             np.asarray(country_indptr)),
+            shape=(len(track_ids), len(country_columns))
+        )
+        genres = [genre_vocabulary.names[genre_id] for genre_id in vocabulary_ids]
+        return cls(track_ids, genres, matrix, list(country_columns), country_matrix)
+
+    def __len__(self) -> int:
+        return len(self.track_ids)
+
+    def country_mask(self, country: str) -> np.ndarray:
+        """Get the tracks with an artist from a country.
+
+        Args:
+            country: Country name, compared case-insensitively after resolving aliases.
+
+        Returns:
+            Boolean array with one entry per track.
+        """
+        try:
+            column = self.countries.index(_canonical_country(country))
+        except ValueError:
+            return np.zeros(len(self.track_ids), dtype=bool)
+        return self.country_matrix[:, column].toarray().ravel() > 0
+
+    def genre_mask(self, genre: str) -> np.ndarray:
+        """Get the tracks with a genre.
+
+        Args:
+            genre: Genre name, compared exactly.
+
+        Returns:
+            Boolean array with one entry per track.
+        """
+        column = self._genre_columns.get(genre)
+        if column is None:
+            return np.zeros(len(self.track_ids), dtype=bool)
+        return self.matrix[:, column].toarray().ravel() > 0
+
+    def genre_counts(self, track_mask: Optional[np.ndarray] = None) -> np.ndarray:
+        """Count the tracks of each genre.
+
+        Args:
+            track_mask: Optional boolean array selecting the tracks to count.
+
+        Returns:
+            Array of track counts, indexed by genre column.
+        """
+        if track_mask is None:
+            return np.asarray(self.matrix.sum(axis=0)).ravel()
+        return np.asarray(self.matrix.T @ track_mask.astype(np.int32)).ravel()
+
+    def unique_genres(self, track_mask: Optional[np.ndarray] = None) -> List[str]:
+        """Get the genres of at least one track.
+
+        Args:
+            track_mask: Optional boolean array selecting the tracks to include.
+
+        Returns:
+            Sorted list of genre names.
+        """
+        counts = self.genre_counts(track_mask)
+        return sorted(self.genres[column] for column in np.flatnonzero(counts))
+
+    def ranking(self, track_mask: Optional[np.ndarray] = None,
+                total: Optional[int] = None) -> List[Tuple[str, int, float]]:
+        """Rank genres by the number of tracks that have them.
+
+        Args:
+            track_mask: Optional boolean array selecting the tracks to count.
+            total: Number of tracks percentages are relative to. Defaults to
+                the number of selected tracks.
+
+        Returns:
+            List of (genre, track count, percentage) tuples for genres with at
+            least one track, by count (descending) then alphabetically.
+        """
+        counts = self.genre_counts(track_mask)
+        if total is None:
+            total = len(self.track_ids) if track_mask is None else int(np.count_nonzero(track_mask))
+        percentages = counts * (100.0 / total) if total else np.zeros(len(counts))
+        columns = sorted(np.flatnonzero(counts), key=lambda column: (-counts[column], self.genres[column]))
+        return [(self.genres[column], int(counts[column]), float(percentages[column])) for column in columns]
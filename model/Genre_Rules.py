@@ -0,0 +1,213 @@
+"""Declarative genre normalization rules.
+
+This module loads the genre normalization rules (dropped tags, suffix
+stripping, special-case replacements and genre mappings) from
+model/genre_rules.json and compiles them once into fast substring matchers.
+Each set of rules carries a version hash of its contents, so derived data
+can record which rules produced it. The file is checked for changes at most
+once per second and recompiled when it changes, so long-running processes
+such as the Streamlit app pick up edits without restarting.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from functools import lru_cache
+from typing import Dict, List, Set, Any, Optional, Tuple
+from model.File_Changes import FileChangeChecker, file_signature
+
+# Genre rules file path
+GENRE_RULES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "genre_rules.json")
+
+# Maximum number of distinct raw genre strings remembered per set of rules
+NORMALIZE_GENRE_CACHE_SIZE = 65536
+
+
+class SubstringRuleMatcher:
+    """Finds the rules with a value occurring in a text, in a single regex pass.
+
+    All rule values are combined into one lookahead alternation, longest
+    first, so the match at each position is the longest value starting
+    there. Any other value that matches at the same position is a prefix
+    of that one, so each value is precomputed to stand for the keys of all
+    its prefix values as well.
+
+    Attributes:
+        keys: Rule keys in rule order.
+    """
+
+    def __init__(self, rules: Dict[str, List[str]]):
+        """Compile a matcher for a set of rules.
+
+        Args:
+            rules: Dictionary mapping rule keys to the substrings that trigger them.
+                Values are matched case-insensitively against lowercase text.
+        """
+        self.keys = list(rules)
+        keys_by_value: Dict[str, Set[int]] = {}
+        for index, (key, values) in enumerate(rules.items()):
+            for value in values:
+                keys_by_value.setdefault(value.lower(), set()).add(index)
+        values = sorted(keys_by_value, key=len, reverse=True)
+        # An empty alternation would match everywhere
+        pattern = '|'.join(re.escape(value) for value in values) or '(?!)'
+        self._pattern = re.compile('(?=(' + pattern + '))')
+        self._key_indexes = {
+            value: frozenset().union(*(keys_by_value[prefix] for prefix in values if value.startswith(prefix)))
+            for value in values
+        }
+
+    def match(self, text: str) -> List[int]:
+        """Find the rules triggered by a text.
+
+        Args:
+            text: Lowercase text to search.
+
+        Returns:
+            Sorted indexes into keys of the rules with a value occurring in the text.
+        """
+        indexes: Set[int] = set()
+        for match in self._pattern.finditer(text):
+            indexes |= self._key_indexes[match.group(1)]
+        return sorted(indexes)
+
+
+class GenreRules:
+    """A compiled set of genre normalization rules.
+
+    Attributes:
+        version: Short hash of the rules, changing whenever a rule changes.
+        drop_genres: Lowercase genres that are dropped entirely.
+        strip_suffixes: Suffixes stripped from the end of genres, ignoring case.
+        keep_suffix_genres: Lowercase genres whose suffix is not stripped.
+        special_cases: Genres that replace the original, first matching key wins.
+        genre_mappings: Mapped genres added while keeping the original.
+    """
+
+    def __init__(self, rules: Dict[str, Any]):
+        """Compile a set of rules.
+
+        Args:
+            rules: Parsed contents of a genre rules file.
+
+        Raises:
+            ValueError: If a rule is missing or has the wrong type.
+        """
+        try:
+            self.drop_genres = frozenset(genre.lower() for genre in rules['drop_genres'])
+            self.keep_suffix_genres = frozenset(genre.lower() for genre in rules['keep_suffix_genres'])
+            self.strip_suffixes: List[str] = list(rules['strip_suffixes'])
+            self.special_cases: Dict[str, List[str]] = dict(rules['special_cases'])
+            self.genre_mappings: Dict[str, List[str]] = dict(rules['genre_mappings'])
+            self._special_case_matcher = SubstringRuleMatcher(self.special_cases)
+            self._genre_mapping_matcher = SubstringRuleMatcher(self.genre_mappings)
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"Invalid genre rules: {e!r}") from e
+        self._suffix_pattern = re.compile(
+            '(?:' + '|'.join(re.escape(suffix) for suffix in self.strip_suffixes) + ')$', re.IGNORECASE
+        ) if self.strip_suffixes else None
+        canonical = json.dumps(rules, ensure_ascii=False, sort_keys=False, separators=(',', ':'))
+        self.version = hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:12]
+        self.normalize = lru_cache(maxsize=NORMALIZE_GENRE_CACHE_SIZE)(self._normalize)
+
+    def _normalize(self, genre: str) -> Tuple[str, ...]:
+        """Normalize a genre. Memoized per raw genre string as normalize()."""
+        # Drop unwanted tags
+        if genre.strip().lower() in self.drop_genres:
+            return ()
+        # First, clean the genre by stripping suffixes (except for the genres that keep them)
+        if self._suffix_pattern is not None and genre.lower() not in self.keep_suffix_genres:
+            genre = self._suffix_pattern.sub('', genre).strip()
+
+        genre_lower = genre.lower()
+
+        # Check if this genre matches any special cases first (replace original)
+        special_matches = self._special_case_matcher.match(genre_lower)
+        if special_matches:
+            return (self._special_case_matcher.keys[special_matches[0]].title(),)
+
+        # Add every matching mapping key while keeping the original (cleaned) genre
+        result = dict.fromkeys(
+            self._genre_mapping_matcher.keys[index].title()
+            for index in self._genre_mapping_matcher.match(genre_lower)
+        )
+        if genre:
+            result[genre.title()] = None
+        return tuple(result)
+
+
+class GenreRuleStore:
+    """Genre rules compiled once and recompiled when the rules file changes.
+
+    The file is checked at most once per check_interval seconds. If an
+    edited file cannot be parsed, the previous rules stay in use.
+
+    Attributes:
+        path: Path of the genre rules JSON file.
+    """
+
+    def __init__(self, path: str = GENRE_RULES_FILE, check_interval: float = 1.0):
+        """Initialize a store that loads the rules on first use.
+
+        Args:
+            path: Path of the genre rules JSON file. Defaults to GENRE_RULES_FILE.
+            check_interval: Minimum seconds between checks of the file. Defaults to 1.0.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._rules: Optional[GenreRules] = None
+        self._file = FileChangeChecker(lambda: file_signature(self.path), check_interval)
+
+    def rules(self) -> GenreRules:
+        """Get the current rules, recompiling them if the file changed.
+
+        Returns:
+            The compiled rules.
+
+        Raises:
+            OSError: If the rules file cannot be read on first use.
+            ValueError: If the rules file is invalid on first use.
+        """
+        rules = self._rules
+        if rules is not None and not self._file.due():
+            return rules
+        with self._lock:
+            changed, signature = self._file.check(force=self._rules is None)
+            if changed:
+                try:
+                    self._rules = self._read()
+                except (OSError, ValueError) as e:
+                    if self._rules is None:
+                        raise
+                    print(f"Error reloading genre rules, keeping version {self._rules.version}: {e}")
+                self._file.record(signature)
+            return self._rules
+
+    def _read(self) -> GenreRules:
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return GenreRules(json.load(f))
+
+
+# Process-wide genre rules
+genre_rule_store = GenreRuleStore()
+
+def get_genre_rules() -> GenreRules:
+    """Get the current compiled genre rules.
+
+    Returns:
+        The compiled rules, reloaded if the rules file changed.
+    """
+    return genre_rule_store.rules()
+
+def get_genre_rules_version() -> str:
+    """Get the version hash of the current genre rules.
+
+    Data derived from normalized genres can store this version and be
+    recomputed when it no longer matches.
+
+    Returns:
+        Short hash identifying the rules.
+    """
+    return genre_rule_store.rules().version
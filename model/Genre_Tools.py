@@ -3,36 +3,34 @@
 This module provides core functions for loading, saving, and managing the artist 
 genre cache. Includes batch Spotify API requests, genre normalization, 
 deduplication, and Wikipedia lookups for country and genres. Used by most 
-scripts for efficient genre and artist data handling.
+scripts for efficient genre and artist data handling. Storage and the 
+shared in-memory copy of the cache live in model/Artist_Cache.
 """
 
-import json
-import os
-import re
-from typing import Dict, List, Set, Optional, Any
+import sys
+import threading
+from collections.abc import MutableMapping
+from typing import Dict, List, Set, Optional, Any, Iterable, Iterator, Mapping, Tuple
 from model.spotify_client import sp, get_artist_with_retry, get_artists_batch
 from model.Artist_Genres import get_custom_artist_genres
 from model.WikipediaAPI import get_artist_country_wikidata
-
-# Cache file paths
-ARTIST_CACHE_FILE = "data/artist_genre_cache.json"
+from model.Artist_Cache import shared_artist_cache
+from model.Artist_Record import ArtistRecord, SOURCE_SPOTIFY, SOURCE_WIKIDATA, NORMALIZED_GENRES_FIELD, RULES_VERSION_FIELD
+from model.Genre_Rules import get_genre_rules
+from model.Country_Tags import country_tagger
 
 def load_artist_cache() -> Dict[str, Dict[str, Any]]:
-    """Load the artist cache from file if it exists.
+    """Load the artist cache from the shared in-memory copy.
     
     Cache stores genres, country, and artist name for each artist ID.
+    The cache files are only re-read when they changed on disk, so this 
+    is cheap to call repeatedly. Callers share the returned dictionary 
+    and should call save_artist_cache after modifying it.
     
     Returns:
         Dictionary mapping artist IDs to their cached data.
     """
-    if os.path.exists(ARTIST_CACHE_FILE):
-        try:
-            with open(ARTIST_CACHE_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except (json.JSONDecodeError, FileNotFoundError) as e:
-            print(f"Error loading cache: {e}")
-            return {}
-    return {}
+    return shared_artist_cache.data()
 
 def save_artist_cache(cache: Dict[str, Dict[str, Any]]) -> None:
     """Save the artist cache to file.
@@ -40,8 +38,18 @@ def save_artist_cache(cache: Dict[str, Dict[str, Any]]) -> None:
     Args:
         cache: Dictionary mapping artist IDs to their cached data.
     """
-    with open(ARTIST_CACHE_FILE, 'w', encoding='utf-8') as f:
-        json.dump(cache, f, ensure_ascii=False, indent=2)
+    shared_artist_cache.save(cache)
+
+def get_artist_cache_view() -> Mapping[str, Dict[str, Any]]:
+    """Get a read-only view of the artist cache for lookups.
+    
+    Served from the binary snapshot when it is enabled and up to date, 
+    so read-only callers do not have to parse the whole cache.
+    
+    Returns:
+        Mapping of artist IDs to their cached data.
+    """
+    return shared_artist_cache.view()
 
 def get_artist_name_from_cache(artist_id: str, artist_cache: Optional[Dict[str, Dict[str, Any]]] = None) -> str:
     """Get artist name from cache, falling back to Spotify API if not cached.
@@ -53,14 +61,16 @@ def get_artist_name_from_cache(artist_id: str, artist_cache: Optional[Dict[str,
     Returns:
         The artist name as a string.
     """
-    if artist_cache is None:
-        artist_cache = load_artist_cache()
+    lookup_cache = get_artist_cache_view() if artist_cache is None else artist_cache
     
-    if artist_id in artist_cache:
-        cached_name = artist_cache[artist_id].get('name')
+    if artist_id in lookup_cache:
+        cached_name = lookup_cache[artist_id].get('name')
         if cached_name:
             return cached_name
     
+    if artist_cache is None:
+        artist_cache = load_artist_cache()
+    
     # Fallback to Spotify API if not in cache or name is None
     try:
         artist_data = get_artist_with_retry(artist_id)
@@ -72,11 +82,12 @@ def get_artist_name_from_cache(artist_id: str, artist_cache: Optional[Dict[str,
             save_artist_cache(artist_cache)
         else:
             # Create new cache entry
-            artist_cache[artist_id] = {
-                'name': artist_name,
-                'genres': artist_data.get('genres', []),
-                'country': None
-            }
+            artist_cache[artist_id] = ArtistRecord(
+                name=artist_name,
+                genres=artist_data.get('genres', []),
+                country=None
+            )
+            artist_cache[artist_id].mark_fetched(SOURCE_SPOTIFY)
             save_artist_cache(artist_cache)
         
         return artist_name
@@ -98,11 +109,12 @@ def get_artist_genres(artist_id: str, artist_cache: Optional[Dict[str, Dict[str,
     if artist_cache is not None and artist_id in artist_cache:
         return artist_cache[artist_id]['genres']
     
-    # Load cache if not provided
+    # Look up the shared cache if not provided
     if artist_cache is None:
+        cached_entry = shared_artist_cache.get(artist_id)
+        if cached_entry is not None:
+            return cached_entry['genres']
         artist_cache = load_artist_cache()
-        if artist_id in artist_cache:
-            return artist_cache[artist_id]['genres']
     
     # Get artist data with retry logic
     artist_data: Dict[str, Any] = get_artist_with_retry(artist_id)
@@ -117,38 +129,37 @@ def get_artist_genres(artist_id: str, artist_cache: Optional[Dict[str, Dict[str,
     country = get_artist_country_wikidata(artist_name)
     
     # Add national level genres based on Wikipedia country
-    if country:
-        genres_lower = [g.lower() for g in genres]
-        if 'brazil' in country and 'brazilian music' not in genres_lower:
-            genres.append('Brazilian Music')
-        elif 'japan' in country and 'japanese music' not in genres_lower:
-            genres.append('Japanese Music')
+    genres = country_tagger.add_artist_tags(genres, country)
     
     # Deduplicate hyphen genres before saving
     genres = deduplicate_hyphen_genres(genres)
     
     # Update cache with name, genres and Wikipedia country
-    artist_cache[artist_id] = {
-        'name': artist_name,
-        'genres': genres,
-        'country': country
-    }
+    artist_cache[artist_id] = ArtistRecord(
+        name=artist_name,
+        genres=genres,
+        country=country
+    )
+    artist_cache[artist_id].mark_fetched(SOURCE_SPOTIFY, SOURCE_WIKIDATA)
     save_artist_cache(artist_cache)
     
     return genres
 
-def get_artist_genres_batch(artist_ids: List[str], artist_cache: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, List[str]]:
+def get_artist_genres_batch(artist_ids: List[str], artist_cache: Optional[Dict[str, Dict[str, Any]]] = None,
+                            normalized: bool = False) -> Dict[str, List[str]]:
     """Get genres for multiple artists in batch, using cache if provided.
     
     Args:
         artist_ids: List of Spotify artist IDs to get genres for.
-        artist_cache: Optional pre-loaded artist cache. If None, loads from file.
+        artist_cache: Optional pre-loaded artist cache. If None, uses the shared cache view.
+        normalized: Whether to get the normalized genres instead of the raw ones, 
+            read from the cache entries where they are up to date. Defaults to False.
         
     Returns:
         Dictionary mapping artist IDs to their genre lists.
     """
     if artist_cache is None:
-        artist_cache = load_artist_cache()
+        artist_cache = get_artist_cache_view()
     
     # Separate cached and uncached artists
     cached_artists = {}
@@ -156,7 +167,8 @@ def get_artist_genres_batch(artist_ids: List[str], artist_cache: Optional[Dict[s
     
     for artist_id in artist_ids:
         if artist_id in artist_cache:
-            cached_artists[artist_id] = artist_cache[artist_id]['genres']
+            entry = artist_cache[artist_id]
+            cached_artists[artist_id] = get_artist_normalized_genres(entry) if normalized else entry['genres']
         else:
             uncached_artist_ids.append(artist_id)
     
@@ -168,140 +180,391 @@ def get_artist_genres_batch(artist_ids: List[str], artist_cache: Optional[Dict[s
             if artist:
                 artist_id = artist['id']
                 genres = artist.get('genres', [])
-                cached_artists[artist_id] = genres
+                cached_artists[artist_id] = normalize_genre_list(genres) if normalized else genres
     
     return cached_artists
 
-def get_track_genres(track: Dict[str, Any], artist_cache: Optional[Dict[str, Dict[str, Any]]] = None) -> List[str]:
-    """Get genres for a track by looking up all artists, using cache if provided.
+class GenreVocabulary:
+    """Interned genre vocabulary mapping genre strings to small integer IDs.
+    
+    Genre sets are represented as bitsets (Python ints with bit i set for 
+    genre ID i), so unions and membership tests work on ints instead of 
+    strings.
+    
+    Attributes:
+        names: Genre names indexed by genre ID.
+    """
+    
+    def __init__(self):
+        """Initialize an empty vocabulary."""
+        self.names: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._bits: List[int] = []
+        self._case_insensitive_bits: Dict[str, int] = {}
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self.names)
+    
+    def id_for(self, genre: str) -> int:
+        """Get the ID of a genre, adding it to the vocabulary if needed.
+        
+        Args:
+            genre: Genre name.
+            
+        Returns:
+            The integer genre ID.
+        """
+        genre_id = self._ids.get(genre)
+        if genre_id is None:
+            with self._lock:
+                genre_id = self._ids.get(genre)
+                if genre_id is None:
+                    genre_id = len(self.names)
+                    genre = sys.intern(genre)
+                    self.names.append(genre)
+                    self._bits.append(1 << genre_id)
+                    lower = genre.lower()
+                    self._case_insensitive_bits[lower] = self._case_insensitive_bits.get(lower, 0) | self._bits[genre_id]
+                    self._ids[genre] = genre_id
+        return genre_id
+    
+    def encode(self, genres: Iterable[str]) -> int:
+        """Encode genre names as a bitset.
+        
+        Args:
+            genres: Genre names to encode.
+            
+        Returns:
+            Bitset with the bit of every genre ID set.
+        """
+        bits = 0
+        for genre in genres:
+            bits |= self._bits[self.id_for(genre)]
+        return bits
+    
+    def decode(self, bits: int) -> List[str]:
+        """Decode a bitset into genre names, ordered by genre ID.
+        
+        Args:
+            bits: Bitset of genre IDs.
+            
+        Returns:
+            List of genre names.
+        """
+        return [self.names[genre_id] for genre_id in iter_genre_ids(bits)]
+    
+    def case_insensitive_bits(self, genre: str) -> int:
+        """Get the bitset of all genres equal to a name when compared case-insensitively.
+        
+        Args:
+            genre: Genre name to match.
+            
+        Returns:
+            Bitset of matching genre IDs, 0 if none are known.
+        """
+        return self._case_insensitive_bits.get(genre.lower(), 0)
+
+def iter_genre_ids(bits: int) -> Iterator[int]:
+    """Iterate over the genre IDs set in a bitset, in ascending order.
+    
+    Args:
+        bits: Bitset of genre IDs.
+        
+    Yields:
+        Genre IDs.
+    """
+    while bits:
+        lowest = bits & -bits
+        yield lowest.bit_length() - 1
+        bits ^= lowest
+
+# Process-wide genre vocabulary
+genre_vocabulary = GenreVocabulary()
+
+def get_track_genre_bits(track: Dict[str, Any], artist_cache: Optional[Mapping[str, Dict[str, Any]]] = None,
+                         normalized: bool = False) -> int:
+    """Get the genres of a track as a bitset of genre vocabulary IDs.
     
     Args:
         track: Track data dictionary from Spotify API.
-        artist_cache: Optional pre-loaded artist cache. If None, loads from file.
+        artist_cache: Optional pre-loaded artist cache. If None, uses the shared cache view.
+        normalized: Whether to get the normalized genres, read from each artist's 
+            precomputed normalized genres, instead of the raw ones. Defaults to False.
         
     Returns:
-        List of all genre names associated with the track's artists.
+        Bitset of the genre IDs associated with the track's artists.
     """
     if not track['track']:
-        return []
+        return 0
     
     # Get all artist IDs from the track
     artist_ids = [artist['id'] for artist in track['track']['artists']]
     
     # Get genres for all artists in batch
-    artist_genres = get_artist_genres_batch(artist_ids, artist_cache)
+    artist_genres = get_artist_genres_batch(artist_ids, artist_cache, normalized=normalized)
     
     # Combine all genres
-    all_genres: Set[str] = set()
-    is_brazilian = False
-    is_japanese = False
-    is_scandinavian = False
+    all_genres = 0
+    countries = []
     
     for artist in track['track']['artists']:
         artist_id = artist['id']
         if artist_id in artist_genres:
-            all_genres.update(artist_genres[artist_id])
+            all_genres |= genre_vocabulary.encode(artist_genres[artist_id])
         
-        # Check cached country info for tagging
+        # Collect cached country info for tagging
         if artist_cache and artist_id in artist_cache:
-            country = artist_cache[artist_id].get('country')
-            if country:
-                if 'Brazil' in country:
-                    is_brazilian = True
-                elif 'Japan' in country:
-                    is_japanese = True
-                elif country in ['Sweden', 'Norway', 'Iceland', 'Finland', 'Denmark']:
-                    is_scandinavian = True
-    
-    if is_brazilian:
-        # Only add if not already present (case-insensitive)
-        if not any(g.lower() == 'brazilian music' for g in all_genres):
-            all_genres.add('Brazilian Music')
-    if is_japanese:
-        if not any(g.lower() == 'japanese music' for g in all_genres):
-            all_genres.add('Japanese Music')
-    if is_scandinavian:
-        # Check if any of the track's genres normalize to 'Metal'
-        is_metal = any(
-            any('metal' in norm_g.lower() for norm_g in normalize_genre(g))
-            for g in all_genres
-        )
-        if is_metal:
-            all_genres.add('Scandinavian Metal')
-    
-    return list(all_genres)
+            countries.append(artist_cache[artist_id].get('country'))
+    
+    # Add national level genres not already present (case-insensitive)
+    if any(countries):
+        tags = country_tagger.track_tags(countries, genre_vocabulary.decode(all_genres), normalized=normalized)
+        for tag in tags:
+            # Country tags are normalized like any other genre in normalized mode
+            all_genres |= genre_vocabulary.encode(normalize_genre(tag) if normalized else [tag])
+    
+    return all_genres
+
+def get_track_genres(track: Dict[str, Any], artist_cache: Optional[Mapping[str, Dict[str, Any]]] = None) -> List[str]:
+    """Get genres for a track by looking up all artists, using cache if provided.
+    
+    Args:
+        track: Track data dictionary from Spotify API.
+        artist_cache: Optional pre-loaded artist cache. If None, uses the shared cache view.
+        
+    Returns:
+        List of all genre names associated with the track's artists.
+    """
+    return genre_vocabulary.decode(get_track_genre_bits(track, artist_cache))
+
+class ArtistGenreResolver:
+    """Resolves each artist's contribution to track genres once per run.
+    
+    get_track_genre_bits() looks up, encodes and country-checks the genres 
+    of every artist again for each of its tracks. A resolver does that the 
+    first time it sees an artist and keeps the result as bitsets: the 
+    artist's genre IDs, the country tag rules its country triggers, and 
+    the tag requirements (such as being metal) its genres meet. Getting a 
+    track's genres is then a union of its artists' bitsets. Artists missing 
+    from the cache are fetched from Spotify once and remembered, even if 
+    they cannot be found. Use one resolver per run; later cache changes 
+    are not seen.
+    
+    Attributes:
+        artist_cache: The artist cache the artists are read from.
+        normalized: Whether track genres are normalized.
+    """
+    
+    def __init__(self, artist_cache: Optional[Mapping[str, Dict[str, Any]]] = None, normalized: bool = False):
+        """Initialize a resolver with no artists resolved yet.
+        
+        Args:
+            artist_cache: Optional pre-loaded artist cache. If None, uses the shared cache view.
+            normalized: Whether to resolve the normalized genres, read from each artist's 
+                precomputed normalized genres, instead of the raw ones. Defaults to False.
+        """
+        self.artist_cache = get_artist_cache_view() if artist_cache is None else artist_cache
+        self.normalized = normalized
+        # Artist ID -> (genre bits, country tag rule mask, met requirement mask)
+        self._artists: Dict[str, Tuple[int, int, int]] = {}
+        # Country tags are normalized like any other genre in normalized mode
+        self._tag_bits = [
+            genre_vocabulary.encode(normalize_genre(rule.tag) if normalized else [rule.tag])
+            for rule in country_tagger.rules
+        ]
+    
+    def prefetch(self, tracks: Iterable[Dict[str, Any]]) -> None:
+        """Resolve the artists of many tracks at once, fetching uncached ones in batches.
+        
+        Args:
+            tracks: Track data dictionaries from Spotify API.
+        """
+        artist_ids = [
+            artist['id'] for track in tracks if track and track['track']
+            for artist in track['track']['artists']
+        ]
+        self._resolve(artist_ids)
+    
+    def _resolve(self, artist_ids: Iterable[str]) -> None:
+        """Resolve the artists that have not been resolved yet."""
+        missing = [artist_id for artist_id in dict.fromkeys(artist_ids) if artist_id not in self._artists]
+        if not missing:
+            return
+        fetched_genres: Dict[str, List[str]] = {}
+        uncached_artist_ids = [artist_id for artist_id in missing if artist_id not in self.artist_cache]
+        if uncached_artist_ids:
+            for artist in get_artists_batch(uncached_artist_ids):
+                if artist:
+                    fetched_genres[artist['id']] = artist.get('genres', [])
+        for artist_id in missing:
+            if artist_id in self.artist_cache:
+                entry = self.artist_cache[artist_id]
+                genres = get_artist_normalized_genres(entry) if self.normalized else entry['genres']
+                country = entry.get('country')
+            elif artist_id in fetched_genres:
+                genres = fetched_genres[artist_id]
+                if self.normalized:
+                    genres = normalize_genre_list(genres)
+                # Countries are only known for cached artists
+                country = None
+            else:
+                self._artists[artist_id] = (0, 0, 0)
+                continue
+            self._artists[artist_id] = (
+                genre_vocabulary.encode(genres),
+                country_tagger.rule_mask(country),
+                country_tagger.requirement_mask(genres, normalized=self.normalized)
+            )
+    
+    def track_bits(self, track: Dict[str, Any]) -> int:
+        """Get the genres of a track as a bitset, like get_track_genre_bits().
+        
+        Args:
+            track: Track data dictionary from Spotify API.
+            
+        Returns:
+            Bitset of the genre IDs associated with the track's artists.
+        """
+        if not track['track']:
+            return 0
+        artist_ids = [artist['id'] for artist in track['track']['artists']]
+        self._resolve(artist_ids)
+        
+        all_genres = rules = met = 0
+        for artist_id in artist_ids:
+            genre_bits, rule_mask, requirement_mask = self._artists[artist_id]
+            all_genres |= genre_bits
+            rules |= rule_mask
+            met |= requirement_mask
+        
+        # Add national level genres not already present (case-insensitive)
+        tagged = all_genres
+        for index in iter_genre_ids(rules & met):
+            if not all_genres & genre_vocabulary.case_insensitive_bits(country_tagger.rules[index].tag):
+                tagged |= self._tag_bits[index]
+        return tagged
+    
+    def track_genres(self, track: Dict[str, Any]) -> List[str]:
+        """Get the genres of a track, like get_track_genres().
+        
+        Args:
+            track: Track data dictionary from Spotify API.
+            
+        Returns:
+            List of all genre names associated with the track's artists.
+        """
+        return genre_vocabulary.decode(self.track_bits(track))
+
+def normalize_genre_bits(bits: int, normalization_map: Optional[Dict[int, int]] = None) -> int:
+    """Normalize a bitset of genres into a bitset of normalized genres.
+    
+    Args:
+        bits: Bitset of raw genre IDs.
+        normalization_map: Optional memo mapping raw genre IDs to normalized 
+            bitsets, shared across calls to normalize each raw genre once.
+        
+    Returns:
+        Bitset of the normalized genre IDs.
+    """
+    if normalization_map is None:
+        normalization_map = {}
+    normalized = 0
+    for genre_id in iter_genre_ids(bits):
+        normalized_bits = normalization_map.get(genre_id)
+        if normalized_bits is None:
+            normalized_bits = genre_vocabulary.encode(normalize_genre(genre_vocabulary.names[genre_id]))
+            normalization_map[genre_id] = normalized_bits
+        normalized |= normalized_bits
+    return normalized
 
 def normalize_genre(genre: str) -> List[str]:
     """Normalize genre names to combine similar genres.
     
+    Applies the rules from model/genre_rules.json, compiled once into fast 
+    matchers, and remembers the result for each raw genre string.
+    
     Args:
         genre: Raw genre name to normalize.
         
+    Returns:
+        List of normalized genre names: the mapped genres in rule order 
+        followed by the cleaned original.
+    """
+    return list(get_genre_rules().normalize(genre))
+
+def normalize_genre_list(genres: Iterable[str]) -> List[str]:
+    """Normalize a list of genres into one list without duplicates.
+    
+    Args:
+        genres: Raw genre names to normalize.
+        
+    Returns:
+        List of normalized genre names in first-seen order.
+    """
+    normalize = get_genre_rules().normalize
+    normalized: Dict[str, None] = {}
+    for genre in genres:
+        normalized.update(dict.fromkeys(normalize(genre)))
+    return list(normalized)
+
+def normalized_genre_keys(genres: Iterable[str]) -> Set[str]:
+    """Get the lowercase normalized names of a list of genres.
+    
+    Genre playlists are matched by these keys, as in 
+    should_track_be_in_playlist() and the genre index postings.
+    
+    Args:
+        genres: Raw genre names to normalize.
+        
+    Returns:
+        Set of lowercase normalized genre names.
+    """
+    normalize = get_genre_rules().normalize
+    return {name.lower() for genre in genres for name in normalize(genre)}
+
+def get_artist_normalized_genres(entry: Mapping[str, Any]) -> List[str]:
+    """Get the normalized genres of an artist cache entry.
+    
+    The normalized genres are stored on the entry together with the genre 
+    rules version that produced them, and only recomputed when the rules 
+    changed or the entry has no normalized genres yet (assigning new raw 
+    genres to an ArtistRecord discards them). Recomputed genres are stored 
+    on the entry, so they are persisted with the next cache save.
+    
+    Args:
+        entry: Artist cache entry.
+        
     Returns:
         List of normalized genre names.
     """
-    # Drop unwanted tags
-    if genre.strip().lower() in ["name", "genres"]:
-        return []
-    # First, clean the genre by removing " music" from the end (except Brazilian and Japanese Music)
-    original_genre = genre
-    if genre.lower() not in ['brazilian music', 'japanese music']:
-        genre = re.sub(r' music$', '', genre, flags=re.IGNORECASE).strip()
-    
-    genre_lower = genre.lower()
-    result = set()  # Using set to automatically handle duplicates
-    
-    # Define genre mappings - add mapped genres while keeping originals
-    genre_mappings = {
-        'brazilian music': ['brazilian'],
-        'metal': ['metal', 'djent'],
-        'emo': ['emo'],
-        'rap and hip hop': ['rap', 'hip hop', 'hip-hop'],
-        'folk': ['folk'],
-        'industrial': ['industrial'],
-        'indie and alternative': ['alternative', 'indie', 'alt'],
-        'rock': ['rock', 'hardcore', 'grunge', 'metal'],
-        'punk': ['punk'],
-        'glam': ['glam'],
-        'country': ['country'],
-        'sertanejo': ['sertanejo'],
-        'mpb': ['mpb'],
-        '(Rhythm and )Blues': ['blues', 'r&b', 'rhythm and blues'],
-        'Japanese Music': ['kei', 'japanese music', 'kayokyoku', 'j-pop', 'shibuya-kei', 'j-rock', 'anime', 'japanese indie', 'j-rap', 'vocaloid'],
-        'comedy': ['comedy', 'meme'],
-    }
-    
-    # Special cases (these should remove the original genre)
-    special_cases = {
-        'hip hop': ['Hip-Hop'],
-        'electropop': ['electro-pop', 'electro pop'],
-        'anime': ['anime rap'],
-        'electro and edm': ['electronica', 'edm'],
-        'hardcore': ['hardcore punk'],
-        'drum and bass': ['bass music'],
-        'mpb': ['música popular brasileira'],
-        'comedy': ['parody', 'satire']
-    }
-    
-    # Check if this genre matches any special cases first (replace original)
-    for special_key, special_values in special_cases.items():
-        if any(special_value.lower() in genre_lower for special_value in special_values):
-            result.add(special_key.title())
-            return list(result)
-    
-    # Check if this genre matches any of our normal genre mappings (add mapped genre while keeping original)
-    is_mapped = False
-    for mapping_key, mapping_values in genre_mappings.items():
-        if any(mapping_value.lower() in genre_lower for mapping_value in mapping_values):
-            is_mapped = True
-            # Add the mapping key to results (while keeping original)
-            result.add(mapping_key.title())
-    
-    # Always add the original genre (cleaned)
-    if genre:
-        result.add(genre.title())
-    
-    return list(result)
+    version = get_genre_rules().version
+    if entry.get(RULES_VERSION_FIELD) == version:
+        normalized = entry.get(NORMALIZED_GENRES_FIELD)
+        if normalized is not None:
+            return normalized
+    normalized = normalize_genre_list(entry.get('genres') or [])
+    if isinstance(entry, MutableMapping):
+        entry[NORMALIZED_GENRES_FIELD] = normalized
+        entry[RULES_VERSION_FIELD] = version
+    return normalized
+
+def refresh_normalized_genres(artist_cache: Mapping[str, Dict[str, Any]]) -> int:
+    """Recompute the normalized genres of every cache entry that is out of date.
+    
+    Args:
+        artist_cache: Dictionary mapping artist IDs to their cached data.
+        
+    Returns:
+        Number of entries whose normalized genres were recomputed.
+    """
+    version = get_genre_rules().version
+    refreshed = 0
+    for entry in artist_cache.values():
+        if entry.get(RULES_VERSION_FIELD) != version or entry.get(NORMALIZED_GENRES_FIELD) is None:
+            get_artist_normalized_genres(entry)
+            refreshed += 1
+    return refreshed
 
 def deduplicate_hyphen_genres(genres: List[str]) -> List[str]:
     """Remove duplicate genres that differ only by hyphens.
@@ -316,9 +579,7 @@ def deduplicate_hyphen_genres(genres: List[str]) -> List[str]:
     normalized_map = {}
     
     for genre in genres:
-        # Normalize by removing hyphens and converting to lowercase
-        normalized = genre.lower().replace('-', ' ')
-        normalized = ' '.join(normalized.split())  # Remove extra spaces
+        normalized = _hyphen_key(genre)
         
         # Keep the first occurrence of each normalized genre
         if normalized not in normalized_map:
@@ -327,9 +588,68 @@ def deduplicate_hyphen_genres(genres: List[str]) -> List[str]:
     # Return the deduplicated list
     return list(normalized_map.values())
 
+def tag_artist_entries(entries: Mapping[str, MutableMapping[str, Any]]) -> None:
+    """Add national level genres to a batch of new cache entries and deduplicate their genres.
+    
+    The tags of the whole batch come from one country_tagger.tag_artists() 
+    pass. Hyphen duplicates are removed after tagging, as for a single artist.
+    
+    Args:
+        entries: Dictionary mapping artist IDs to new cache entries, updated in place.
+    """
+    country_tagger.add_artist_tags_batch(entries)
+    for entry in entries.values():
+        entry['genres'] = deduplicate_hyphen_genres(entry['genres'])
+
+def _hyphen_key(genre: str) -> str:
+    """Get the key genres that differ only by hyphens have in common."""
+    # Normalize by removing hyphens and converting to lowercase
+    normalized = genre.lower().replace('-', ' ')
+    return ' '.join(normalized.split())  # Remove extra spaces
+
+def normalize_genres_batch(genre_lists: Iterable[Iterable[str]]) -> List[List[str]]:
+    """Normalize several genre lists at once.
+    
+    Each distinct raw genre in the batch is normalized only once. The 
+    normalized genres of each list are deduplicated, including genres that 
+    differ only by hyphens, in the same pass, with the same result as 
+    normalizing every genre, removing duplicates and then calling 
+    deduplicate_hyphen_genres.
+    
+    Args:
+        genre_lists: Lists of raw genre names, e.g. one per artist.
+        
+    Returns:
+        List of normalized genre lists, one per input list and in first-seen order.
+    """
+    normalize = get_genre_rules().normalize
+    normalized_by_genre: Dict[str, tuple] = {}
+    hyphen_keys: Dict[str, str] = {}
+    results = []
+    for genres in genre_lists:
+        kept: Dict[str, str] = {}
+        for genre in genres:
+            normalized = normalized_by_genre.get(genre)
+            if normalized is None:
+                normalized = normalized_by_genre[genre] = normalize(genre)
+            for name in normalized:
+                key = hyphen_keys.get(name)
+                if key is None:
+                    key = hyphen_keys[name] = _hyphen_key(name)
+                # Keep the first occurrence of each genre
+                if key not in kept:
+                    kept[key] = name
+        results.append(list(kept.values()))
+    return results
+
 def should_track_be_in_playlist(track_genres: List[str], playlist_genre: str) -> bool:
     """Check if a track should be in a specific genre playlist.
     
+    A track belongs in a genre playlist if one of its genres normalizes to 
+    the playlist's genre, ignoring case. For the tracks of an indexed source 
+    playlist, GenreIndex.track_in_genre() answers this from the index 
+    without normalizing anything.
+    
     Args:
         track_genres: List of genre names associated with the track.
         playlist_genre: The genre name of the playlist to check against.
@@ -337,16 +657,4 @@ def should_track_be_in_playlist(track_genres: List[str], playlist_genre: str) ->
     Returns:
         True if the track should be included in the playlist, False otherwise.
     """
-    # Normalize the playlist genre
-    playlist_genre_lower = playlist_genre.lower()
-    
-    # Check each track genre
-    for track_genre in track_genres:
-        normalized_track_genres = normalize_genre(track_genre)
-        
-        # Check for exact match
-        for norm_genre in normalized_track_genres:
-            if norm_genre.lower() == playlist_genre_lower:
-                return True
-    
-    return False 
\ No newline at end of file
+    return playlist_genre.lower() in normalized_genre_keys(track_genres)
@@ -7,13 +7,14 @@ Used by most scripts for efficient playlist and track management.
 
 import time
 import re
-from typing import Dict, List, Set, Any
-from model.config import REQUESTS_PER_SECOND
-from model.spotify_client import sp, get_artists_batch, get_tracks_batch
-from model.Genre_Tools import get_track_genres, load_artist_cache, save_artist_cache, normalize_genre, get_artist_genres
+from typing import Dict, List, Set, Any, Mapping
+from model.spotify_client import sp
+from model.Genre_Tools import save_artist_cache, normalize_genre, get_artist_genres, get_artist_genres_batch, get_artist_cache_view
+from model.Country_Tags import country_tagger
 from collections import defaultdict
 from model.WikipediaAPI import get_artist_country_wikidata
 from model.Artist_Genres import get_custom_artist_genres
+from model.Genre_Index import genre_index
 
 def extract_playlist_id_from_url(url: str) -> str:
     """Extract playlist ID from a Spotify playlist URL.
@@ -36,31 +37,6 @@ def extract_playlist_id_from_url(url: str) -> str:
     else:
         raise ValueError("Invalid Spotify playlist URL format. Expected format: https://open.spotify.com/playlist/PLAYLIST_ID")
 
-class RateLimiter:
-    """Rate limiter for API requests to respect rate limits.
-    
-    Attributes:
-        requests_per_second: Maximum requests allowed per second.
-        last_request_time: Timestamp of the last request made.
-    """
-    
-    def __init__(self, requests_per_second: float = REQUESTS_PER_SECOND):
-        """Initialize the rate limiter.
-        
-        Args:
-            requests_per_second: Maximum requests allowed per second. Defaults to REQUESTS_PER_SECOND.
-        """
-        self.requests_per_second = requests_per_second
-        self.last_request_time = 0.0
-        
-    def wait(self):
-        """Wait if necessary to respect the rate limit."""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
-        if time_since_last_request < (1.0 / self.requests_per_second):
-            time.sleep((1.0 / self.requests_per_second) - time_since_last_request)
-        self.last_request_time = time.time()
-
 # Cache file path
 ARTIST_CACHE_FILE = "data/artist_genre_cache.json"
 
@@ -69,19 +45,14 @@ def get_playlist_tracks(playlist_id: str) -> List[Dict[str, Any]]:
     tracks: List[Dict[str, Any]] = []
     max_retries: int = 5
     base_delay: int = 1
-    rate_limiter = RateLimiter(requests_per_second=REQUESTS_PER_SECOND)
     
     for attempt in range(max_retries):
         try:
-            # Apply rate limiting before the initial request
-            rate_limiter.wait()
-            
             # Use maximum limit to reduce pagination requests
             results: Dict[str, Any] = sp.playlist_tracks(playlist_id, limit=100)
             tracks.extend(results['items'])
             
             while results['next']:
-                rate_limiter.wait()
                 results = sp.next(results)
                 tracks.extend(results['items'])
             
@@ -99,7 +70,6 @@ def get_existing_playlists() -> Dict[str, str]:
     user_id: str = sp.current_user()['id']
     existing_playlists: Dict[str, str] = {}
     offset: int = 0
-    rate_limiter = RateLimiter(requests_per_second=REQUESTS_PER_SECOND)
     
     while True:
         # Use maximum limit to reduce pagination requests
@@ -109,7 +79,6 @@ def get_existing_playlists() -> Dict[str, str]:
         if not playlists['next']:
             break
         offset += 50
-        rate_limiter.wait()
     
     return existing_playlists
 
@@ -117,7 +86,6 @@ def get_playlist_track_ids(playlist_id: str) -> Set[str]:
     """Get all track IDs from a playlist with optimized batch size"""
     existing_tracks: Set[str] = set()
     offset: int = 0
-    rate_limiter = RateLimiter(requests_per_second=REQUESTS_PER_SECOND)
     
     while True:
         # Use maximum limit to reduce pagination requests
@@ -128,100 +96,73 @@ def get_playlist_track_ids(playlist_id: str) -> Set[str]:
         if not results['next']:
             break
         offset += 100
-        rate_limiter.wait()
     
     return existing_tracks
 
-def get_tracks_batch(track_ids: List[str], batch_size: int = 50) -> List[Dict]:
-    """Get multiple tracks in a single API call to reduce requests."""
-    all_tracks = []
-    rate_limiter = RateLimiter(requests_per_second=REQUESTS_PER_SECOND)
+def create_genre_playlists(playlist_id: str, progress_callback=None) -> Dict[str, Set[str]]:
+    """Create genre playlists using only the current cache (read-only mode).
     
-    for i in range(0, len(track_ids), batch_size):
-        batch = track_ids[i:i + batch_size]
-        try:
-            tracks = sp.tracks(batch)
-            all_tracks.extend(tracks['tracks'])
-            rate_limiter.wait()
-        except Exception as e:
-            print(f"\nError getting batch of tracks: {str(e)}")
-            # Fallback to individual requests for failed batch
-            for track_id in batch:
-                try:
-                    track = sp.track(track_id)
-                    all_tracks.append(track)
-                    rate_limiter.wait()
-                except Exception as e2:
-                    print(f"Error getting track {track_id}: {str(e2)}")
-                    continue
+    Tracks are grouped by genre through the persistent genre index, which 
+    only recomputes the tracks that were added or whose artists changed 
+    since the last run. Tracks with an artist missing from the cache are 
+    skipped.
     
-    return all_tracks
+    Args:
+        playlist_id: The Spotify playlist ID to group by genre.
+        progress_callback: Optional callback function called with (current, total) 
+            tracks processed.
+        
+    Returns:
+        Dictionary mapping genres to the set of their track IDs.
+    """
+    tracks: List[Dict[str, Any]] = get_playlist_tracks(playlist_id)
+    artist_cache: Mapping[str, Dict[str, Any]] = get_artist_cache_view()
+    genre_index.sync_playlist(playlist_id, tracks, artist_cache, progress_callback=progress_callback)
+    genre_index.save()
+    return genre_index.genre_tracks(playlist_id)
 
-def get_artists_batch(artist_ids: List[str], batch_size: int = 50) -> List[Dict]:
-    """Get multiple artists in a single API call to reduce requests."""
-    all_artists = []
-    rate_limiter = RateLimiter(requests_per_second=REQUESTS_PER_SECOND)
+def get_genre_playlist_tracks(playlist_id: str, genre: str) -> Set[str]:
+    """Get the tracks of a source playlist that belong in a genre playlist.
     
-    for i in range(0, len(artist_ids), batch_size):
-        batch = artist_ids[i:i + batch_size]
-        try:
-            artists = sp.artists(batch)
-            all_artists.extend(artists['artists'])
-            rate_limiter.wait()
-        except Exception as e:
-            print(f"\nError getting batch of artists: {str(e)}")
-            # Fallback to individual requests for failed batch
-            for artist_id in batch:
-                try:
-                    artist = sp.artist(artist_id)
-                    all_artists.append(artist)
-                    rate_limiter.wait()
-                except Exception as e2:
-                    print(f"Error getting artist {artist_id}: {str(e2)}")
-                    continue
+    A track belongs if one of its genres normalizes to the genre, as in 
+    should_track_be_in_playlist(). Answered from the genre index, so the 
+    source playlist must have been indexed by create_genre_playlists().
     
-    return all_artists
-
-def create_genre_playlists(playlist_id: str, progress_callback=None) -> Dict[str, Set[str]]:
-    """Create genre playlists using only the current cache (read-only mode)."""
-    rate_limiter = RateLimiter(requests_per_second=REQUESTS_PER_SECOND)
-    tracks: List[Dict[str, Any]] = get_playlist_tracks(playlist_id)
-    genre_tracks: Dict[str, Set[str]] = defaultdict(set)
-    artist_cache: Dict[str, Dict[str, Any]] = load_artist_cache()
-    total_tracks = len(tracks)
-    batch_size = 100
-    for i in range(0, total_tracks, batch_size):
-        batch = tracks[i:i + batch_size]
-        for track in batch:
-            if track['track']:
-                track_id = track['track']['id']
-                # Only use cache, skip if any artist is not cached
-                artist_ids = [artist['id'] for artist in track['track']['artists']]
-                if any(aid not in artist_cache for aid in artist_ids):
-                    continue
-                track_genres = get_track_genres(track, artist_cache)
-                for genre in track_genres:
-                    genre_tracks[genre].add(track_id)
-        if progress_callback:
-            progress_callback(min(i + batch_size, total_tracks), total_tracks)
-    return genre_tracks
+    Args:
+        playlist_id: The Spotify ID of the source playlist.
+        genre: Genre name of the genre playlist.
+        
+    Returns:
+        Set of track IDs.
+    """
+    return genre_index.tracks_for_genre(playlist_id, genre)
 
 def process_tracks_batch_optimized(tracks: List[Dict[str, Any]], artist_cache: Dict[str, Dict[str, Any]], batch_size: int = 100) -> Dict[str, Set[str]]:
-    """Process tracks in optimized batches to group by genre"""
+    """Process tracks in optimized batches to group by genre.
+    
+    Each batch looks up the genres of its artists at once and gets the 
+    country tags of all its tracks in one country_tagger.tag_tracks() pass, 
+    giving the same genres as get_track_genres().
+    """
     genre_tracks: Dict[str, Set[str]] = defaultdict(set)
     
     # Process tracks in batches
     for i in range(0, len(tracks), batch_size):
-        batch = tracks[i:i + batch_size]
+        track_artists: Dict[str, List[str]] = {
+            track['track']['id']: [artist['id'] for artist in track['track']['artists']]
+            for track in tracks[i:i + batch_size] if track['track']
+        }
+        artist_ids = list(dict.fromkeys(artist_id for artist_ids in track_artists.values() for artist_id in artist_ids))
+        artist_genres = get_artist_genres_batch(artist_ids, artist_cache)
+        tags_by_id = country_tagger.tag_tracks(track_artists, artist_cache, artist_genres)
         
-        for track in batch:
-            if track['track']:
-                track_id = track['track']['id']
-                track_genres = get_track_genres(track, artist_cache)
-                
-                # Add track to each of its genres
-                for genre in track_genres:
+        # Add each track to each of its genres
+        for track_id, artist_ids in track_artists.items():
+            for artist_id in artist_ids:
+                for genre in artist_genres.get(artist_id, ()):
                     genre_tracks[genre].add(track_id)
+            for tag in tags_by_id.get(track_id, ()):
+                genre_tracks[tag].add(track_id)
     
     return genre_tracks
 
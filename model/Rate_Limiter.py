@@ -0,0 +1,138 @@
+"""Process-wide token-bucket rate limiting for Spotify API calls.
+
+This module provides a thread-safe token bucket: requests take a token and
+tokens refill at a steady rate up to a burst capacity, so short bursts go
+out immediately while the long-run rate never exceeds the limit, however
+many functions and threads share the bucket. When Spotify answers with 429
+Too Many Requests, the bucket is paused for the Retry-After period so every
+caller backs off together instead of each retrying on its own clock.
+"""
+
+import email.utils
+import threading
+import time
+from typing import Callable, Mapping, Optional
+from model.settings import get_setting
+
+# Seconds to back off after a 429 response without a usable Retry-After header
+DEFAULT_RETRY_AFTER = 1.0
+
+
+class TokenBucket:
+    """Thread-safe token-bucket rate limiter.
+
+    Attributes:
+        rate: Tokens added per second, i.e. the sustained requests per second.
+        capacity: Maximum number of tokens, i.e. the largest burst of requests.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """Initialize a full bucket.
+
+        Args:
+            rate: Tokens added per second. Must be positive.
+            capacity: Maximum number of tokens. Defaults to 1.0 (no bursts).
+            clock: Function returning the current time in seconds. Defaults to time.monotonic.
+            sleep: Function waiting for a number of seconds. Defaults to time.sleep.
+
+        Raises:
+            ValueError: If rate is not positive or capacity is less than 1.
+        """
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        if capacity < 1:
+            raise ValueError(f"Capacity must be at least 1, got {capacity}")
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last update. Called with the lock held."""
+        if now > self._updated:
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens, waiting until they are available and any pause is over.
+
+        Args:
+            tokens: Number of tokens to take. Defaults to 1.0.
+
+        Returns:
+            Seconds spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                if now < self._paused_until:
+                    delay = self._paused_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= tokens:
+                        self._tokens -= tokens
+                        return waited
+                    delay = (tokens - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+    def pause(self, seconds: float) -> None:
+        """Stop handing out tokens for a while, e.g. for a Retry-After period.
+
+        Waiting callers resume once the pause is over, with an empty bucket
+        so requests restart at the sustained rate rather than as a burst.
+
+        Args:
+            seconds: Seconds from now to pause for. Pauses never shorten an earlier, longer pause.
+        """
+        with self._lock:
+            now = self._clock()
+            until = now + max(0.0, seconds)
+            if until > self._paused_until:
+                self._paused_until = until
+                self._tokens = 0.0
+                self._updated = until
+
+
+def parse_retry_after(headers: Optional[Mapping[str, str]], default: float = DEFAULT_RETRY_AFTER,
+                      now: Optional[float] = None) -> float:
+    """Get the back-off period from a response's Retry-After header.
+
+    Args:
+        headers: Response headers, or None.
+        default: Seconds to use if the header is missing or invalid.
+            Defaults to DEFAULT_RETRY_AFTER.
+        now: Current Unix time, for HTTP-date values. Defaults to time.time().
+
+    Returns:
+        Seconds to wait before retrying.
+    """
+    value = None
+    if headers:
+        value = headers.get('Retry-After') or headers.get('retry-after')
+    if not value:
+        return default
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    # Retry-After may also be an HTTP date
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return default
+    return max(0.0, retry_at - (time.time() if now is None else now))
+
+
+# Process-wide limiter shared by every Spotify API call
+spotify_rate_limiter = TokenBucket(
+    rate=get_setting('REQUESTS_PER_SECOND', 2),
+    capacity=get_setting('SPOTIFY_BURST', 5)
+)
@@ -2,12 +2,19 @@
 
 This module provides functions to fetch genres and country information for artists 
 from Wikipedia and Wikidata. Used to supplement Spotify data with additional 
-genre and country info for improved accuracy.
+genre and country info for improved accuracy. All requests share the pooled
+keep-alive session from model/http_session and time out instead of hanging.
 """
 
 import requests
 import mwparserfromhell
 import re
+from model.http_session import get_session, max_request_attempts
+
+# Most HTTP requests made by one get_artist_genres and one get_artist_country_wikidata
+# call, counting the retries the shared session may send for each request
+WIKIPEDIA_GENRES_REQUESTS = 1 * max_request_attempts()
+WIKIDATA_COUNTRY_REQUESTS = 3 * max_request_attempts()
 
 def get_artist_genres(artist_name):
     """Get genres for an artist from Wikipedia.
@@ -32,8 +39,12 @@ def get_artist_genres(artist_name):
         "rvprop": "content"
     }
 
-    response = requests.get(url, params=params)
-    data = response.json()
+    try:
+        response = get_session().get(url, params=params)
+        data = response.json()
+    except (requests.RequestException, ValueError) as e:
+        print(f"Error fetching Wikipedia page for {artist_name}: {e}")
+        return None
 
     # Step 3: Extract wikitext from response
     pages = data["query"]["pages"]
@@ -157,7 +168,7 @@ def get_artist_country_wikidata(artist_name):
             "srsearch": artist_name,
             "format": "json"
         }
-        search_response = requests.get(search_url, params=search_params)
+        search_response = get_session().get(search_url, params=search_params)
         search_data = search_response.json()
         if not search_data['query']['search']:
             return None
@@ -171,7 +182,7 @@ def get_artist_country_wikidata(artist_name):
             "prop": "pageprops",
             "titles": page_title
         }
-        page_response = requests.get(page_url, params=page_params)
+        page_response = get_session().get(page_url, params=page_params)
         page_data = page_response.json()
         pages = page_data["query"]["pages"]
         page = next(iter(pages.values()))
@@ -191,7 +202,7 @@ def get_artist_country_wikidata(artist_name):
         LIMIT 1
         """
         headers = {"Accept": "application/sparql-results+json"}
-        r = requests.get(sparql_url, params={'query': query}, headers=headers)
+        r = get_session().get(sparql_url, params={'query': query}, headers=headers)
         results = r.json()
         bindings = results['results']['bindings']
         if bindings:
@@ -9,7 +9,8 @@ import json
 import re
 import time
 from model.WikipediaAPI import get_artist_genres
-from model.Genre_Tools import normalize_genre
+from model.Genre_Tools import normalize_genres_batch
+from model.Cache_Flusher import atomic_write_json
 
 def extract_artist_names_from_json(filename):
     """Extract artist names from the artists_without_genres.json file.
@@ -85,16 +86,9 @@ def get_genres_for_artists(artists, delay=1):
         try:
             genres = get_artist_genres(artist_name)
             
-            # Normalize genres using the core normalize_genre function
+            # Normalize and deduplicate genres using the core normalization
             if genres:
-                normalized_genres = []
-                for genre in genres:
-                    normalized = normalize_genre(genre)
-                    if normalized:  # Only add if normalization returned results
-                        normalized_genres.extend(normalized)
-                
-                # Remove duplicates while preserving order
-                normalized_genres = list(dict.fromkeys(normalized_genres))
+                normalized_genres = normalize_genres_batch([genres])[0]
                 print(f"   Raw genres: {genres}")
                 print(f"   Normalized genres: {normalized_genres}")
             else:
@@ -125,8 +119,7 @@ def save_results_to_json(results, filename):
         results: Dictionary of results to save.
         filename: Path to the output JSON file.
     """
-    with open(filename, 'w', encoding='utf-8') as file:
-        json.dump(results, file, indent=2, ensure_ascii=False)
+    atomic_write_json(filename, results)
     
     print(f"Results saved to {filename}")
 
@@ -13,4 +13,50 @@ REDIRECT_URI = 'your-redirect-uri-here'
 PLAYLIST_ID = 'your-playlist-id-here' 
 
 # Rate limiting configuration
-REQUESTS_PER_SECOND = 2  # Adjust this value to control API call frequency 
\ No newline at end of file
+REQUESTS_PER_SECOND = 2  # Adjust this value to control API call frequency 
+
+# Every Spotify API call in the process shares one token-bucket rate limiter:
+# requests are sent at REQUESTS_PER_SECOND on average, with bursts of up to
+# SPOTIFY_BURST requests at once; 429 responses pause all requests for the
+# Retry-After period
+SPOTIFY_BURST = 5
+
+# Async Spotify client for batch-heavy jobs (Artist_Cacher, Update_Cache):
+# when enabled, artist and track batches are fetched with up to
+# SPOTIFY_MAX_CONCURRENCY requests in flight, still within the shared rate limit
+SPOTIFY_ASYNC = False
+SPOTIFY_MAX_CONCURRENCY = 4
+
+# HTTP connection pooling for Spotify, Wikipedia and Wikidata: connections are
+# kept alive and reused, with one pool per host for up to HTTP_POOL_CONNECTIONS
+# hosts and up to HTTP_POOL_MAXSIZE connections per host (keep this at least
+# SPOTIFY_MAX_CONCURRENCY). Requests without their own timeout give up after
+# HTTP_CONNECT_TIMEOUT seconds connecting or HTTP_READ_TIMEOUT seconds waiting
+# for a response
+HTTP_POOL_CONNECTIONS = 10
+HTTP_POOL_MAXSIZE = 10
+HTTP_CONNECT_TIMEOUT = 5
+HTTP_READ_TIMEOUT = 30
+
+# Artist cache journal: append single-artist edits to a log next to the cache
+# file instead of rewriting the whole cache, and compact the log in the
+# background once it grows past the size threshold (in bytes)
+ARTIST_CACHE_JOURNAL = False
+ARTIST_CACHE_JOURNAL_MAX_BYTES = 1024 * 1024
+
+# Serve artist cache lookups from a memory-mapped binary snapshot at startup
+# instead of parsing the whole JSON cache (rebuilt whenever the cache is read)
+ARTIST_CACHE_SNAPSHOT = False
+
+# Cache files are written in the background at most once per this many seconds,
+# with a final write at exit (0 writes on every save)
+CACHE_FLUSH_INTERVAL = 5.0
+
+# Stale-only cache refresh: an artist's data from each source is re-fetched once
+# it is older than the TTL in days, stalest first, using at most
+# UPDATE_CACHE_MAX_CALLS API requests per run (a Wikidata country lookup
+# takes up to 12, counting retries)
+SPOTIFY_TTL_DAYS = 30
+WIKIPEDIA_TTL_DAYS = 90
+WIKIDATA_TTL_DAYS = 180
+UPDATE_CACHE_MAX_CALLS = 1000
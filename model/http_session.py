@@ -0,0 +1,143 @@
+"""Shared HTTP sessions with pooled keep-alive connections.
+
+This module builds requests sessions whose adapters keep one connection
+pool per host, so repeated Wikipedia, Wikidata and Spotify requests reuse
+open TCP/TLS connections instead of handshaking every time. Every request
+gets a default timeout, so a stalled server can no longer hang a job, and
+asks for gzip-compressed responses. Pool sizes and timeouts come from the
+HTTP_* settings in model/config.py.
+"""
+
+import threading
+from typing import Optional, Tuple, Union
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from model.settings import get_setting
+
+# Seconds to wait for a connection and for each response, unless configured
+DEFAULT_CONNECT_TIMEOUT = 5
+DEFAULT_READ_TIMEOUT = 30
+
+# Number of hosts with a kept pool, and connections kept per host
+DEFAULT_POOL_CONNECTIONS = 10
+DEFAULT_POOL_MAXSIZE = 10
+
+# Retries of idempotent requests for connection errors and throttled or overloaded servers
+DEFAULT_RETRIES = Retry(
+    total=3,
+    read=False,
+    backoff_factor=0.5,
+    status_forcelist=(429, 502, 503, 504),
+    allowed_methods=frozenset(['GET', 'HEAD'])
+)
+
+Timeout = Union[float, Tuple[float, float]]
+
+
+def max_request_attempts(retries: Union[Retry, int] = DEFAULT_RETRIES) -> int:
+    """Get the most HTTP requests one call can send under a retry policy.
+
+    Args:
+        retries: Retry policy, or a number of retries. Defaults to DEFAULT_RETRIES.
+
+    Returns:
+        The first attempt plus the most retries the policy allows.
+    """
+    if isinstance(retries, Retry):
+        retries = retries.total or 0
+    return 1 + max(retries, 0)
+
+def get_default_timeout() -> Tuple[float, float]:
+    """Get the configured (connect, read) timeout in seconds.
+
+    Returns:
+        The HTTP_CONNECT_TIMEOUT and HTTP_READ_TIMEOUT settings.
+    """
+    return (
+        get_setting('HTTP_CONNECT_TIMEOUT', DEFAULT_CONNECT_TIMEOUT),
+        get_setting('HTTP_READ_TIMEOUT', DEFAULT_READ_TIMEOUT)
+    )
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """HTTP adapter with configurable pool sizes and a default timeout.
+
+    Attributes:
+        timeout: Timeout used for requests sent without one.
+    """
+
+    def __init__(self, timeout: Optional[Timeout] = None, pool_connections: Optional[int] = None,
+                 pool_maxsize: Optional[int] = None, **kwargs):
+        """Initialize the adapter.
+
+        Args:
+            timeout: Default timeout in seconds, or a (connect, read) tuple.
+                Defaults to get_default_timeout().
+            pool_connections: Number of hosts to keep a connection pool for.
+                Defaults to the HTTP_POOL_CONNECTIONS setting.
+            pool_maxsize: Connections kept per host. Defaults to the
+                HTTP_POOL_MAXSIZE setting.
+            **kwargs: Keyword arguments for HTTPAdapter, e.g. max_retries.
+        """
+        self.timeout = timeout if timeout is not None else get_default_timeout()
+        if pool_connections is None:
+            pool_connections = get_setting('HTTP_POOL_CONNECTIONS', DEFAULT_POOL_CONNECTIONS)
+        if pool_maxsize is None:
+            pool_maxsize = get_setting('HTTP_POOL_MAXSIZE', DEFAULT_POOL_MAXSIZE)
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize, **kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        """Send a request, with the default timeout if it has none."""
+        if timeout is None:
+            timeout = self.timeout
+        return super().send(request, timeout=timeout, **kwargs)
+
+
+def mount_pooled_adapter(session: requests.Session, max_retries: Union[Retry, int] = DEFAULT_RETRIES,
+                         timeout: Optional[Timeout] = None) -> requests.Session:
+    """Replace a session's HTTP and HTTPS adapters with pooled ones.
+
+    Args:
+        session: The session to update.
+        max_retries: Retry policy of the adapters. Defaults to DEFAULT_RETRIES.
+        timeout: Default timeout. Defaults to get_default_timeout().
+
+    Returns:
+        The same session.
+    """
+    adapter = PooledHTTPAdapter(timeout=timeout, max_retries=max_retries)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    session.headers['Accept-Encoding'] = 'gzip, deflate'
+    return session
+
+def create_session(max_retries: Union[Retry, int] = DEFAULT_RETRIES,
+                   timeout: Optional[Timeout] = None) -> requests.Session:
+    """Create a session with pooled keep-alive connections.
+
+    Args:
+        max_retries: Retry policy. Defaults to DEFAULT_RETRIES.
+        timeout: Default timeout. Defaults to get_default_timeout().
+
+    Returns:
+        A new session.
+    """
+    return mount_pooled_adapter(requests.Session(), max_retries=max_retries, timeout=timeout)
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Get the process-wide session for Wikipedia, Wikidata and other plain HTTP requests.
+
+    Returns:
+        The shared session, created on first use.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
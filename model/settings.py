@@ -0,0 +1,50 @@
+"""Optional and required configuration settings.
+
+This module reads settings from model/config.py. Optional settings fall back 
+to a default for settings that an existing config.py does not define yet. 
+Required settings such as the Spotify credentials are read with 
+require_setting() when they are first needed rather than at import time, so 
+offline code can be imported and run without a config.py.
+"""
+
+import importlib
+from typing import Any
+
+def get_setting(name: str, default: Any) -> Any:
+    """Get an optional setting from model/config.py.
+    
+    Args:
+        name: Name of the setting in config.py.
+        default: Value to use if config.py or the setting is missing.
+        
+    Returns:
+        The configured value, or the default.
+    """
+    try:
+        config = importlib.import_module('model.config')
+    except ImportError:
+        return default
+    return getattr(config, name, default)
+
+def require_setting(name: str) -> Any:
+    """Get a required setting from model/config.py.
+    
+    Args:
+        name: Name of the setting in config.py.
+        
+    Returns:
+        The configured value.
+        
+    Raises:
+        RuntimeError: If config.py or the setting is missing.
+    """
+    try:
+        config = importlib.import_module('model.config')
+    except ImportError as e:
+        raise RuntimeError(
+            f"{name} is required but model/config.py was not found; "
+            "copy model/config_template.py to model/config.py and fill it in"
+        ) from e
+    if not hasattr(config, name):
+        raise RuntimeError(f"{name} is required but not set in model/config.py")
+    return getattr(config, name)
@@ -0,0 +1,279 @@
+"""Asyncio helpers for batch-heavy Spotify jobs.
+
+This module provides async versions of the batch helpers in
+model/spotify_client (artists and tracks in batches of 50, all items of a
+playlist, adding items to playlists) that keep several requests in flight
+at once instead of issuing them strictly one at a time. Requests run the
+shared synchronous client in worker threads, so they reuse its spotipy
+token cache for auth and still go through the process-wide rate limiter;
+a semaphore caps how many are in flight. Synchronous code can call
+run_async() to run one of the coroutines to completion. The fetch_*_by_id
+helpers fall back to the synchronous batch helpers when they are called
+from a thread that is already running an event loop (e.g. in Streamlit or
+Jupyter), where run_async() cannot start another.
+"""
+
+import asyncio
+from typing import Dict, List, Any, Awaitable, Callable, Optional, Sequence, TypeVar
+from model.spotify_client import sp, get_artists_batch, get_tracks_batch
+from model.settings import get_setting
+
+T = TypeVar('T')
+
+# Maximum number of Spotify requests in flight at once
+DEFAULT_MAX_CONCURRENCY = 4
+
+# Items per page of playlist items
+PLAYLIST_PAGE_SIZE = 100
+
+
+def use_async_client() -> bool:
+    """Check whether batch jobs are configured to use the async client.
+
+    Returns:
+        The SPOTIFY_ASYNC setting, False by default.
+    """
+    return bool(get_setting('SPOTIFY_ASYNC', False))
+
+def run_async(coroutine: Awaitable[T]) -> T:
+    """Run a coroutine from synchronous code and return its result.
+
+    Args:
+        coroutine: Coroutine to run, e.g. get_artists_batch_async(artist_ids).
+
+    Returns:
+        The coroutine's result.
+    """
+    return asyncio.run(coroutine)
+
+def in_running_loop() -> bool:
+    """Check whether the calling thread is running an event loop.
+
+    Returns:
+        True if it is, in which case run_async() cannot be used.
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class AsyncSpotify:
+    """Runs Spotify client calls concurrently, with a cap on requests in flight.
+
+    Attributes:
+        client: The synchronous spotipy client the calls are made with.
+        max_concurrency: Maximum number of requests in flight.
+    """
+
+    def __init__(self, client=sp, max_concurrency: Optional[int] = None):
+        """Initialize a runner for one event loop.
+
+        Args:
+            client: The synchronous spotipy client. Defaults to the shared client.
+            max_concurrency: Maximum number of requests in flight. Defaults to the
+                SPOTIFY_MAX_CONCURRENCY setting, or DEFAULT_MAX_CONCURRENCY.
+        """
+        self.client = client
+        if max_concurrency is None:
+            max_concurrency = get_setting('SPOTIFY_MAX_CONCURRENCY', DEFAULT_MAX_CONCURRENCY)
+        self.max_concurrency = max(1, int(max_concurrency))
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def call(self, method: Callable[..., T], *args, **kwargs) -> T:
+        """Call a client method in a worker thread once a request slot is free.
+
+        Args:
+            method: Bound method of the client, e.g. client.artists.
+            *args: Positional arguments for the method.
+            **kwargs: Keyword arguments for the method.
+
+        Returns:
+            The method's result.
+        """
+        async with self._semaphore:
+            return await asyncio.to_thread(method, *args, **kwargs)
+
+    async def get_artists_batch(self, artist_ids: List[str], batch_size: int = 50) -> List[Dict[str, Any]]:
+        """Get multiple artists, fetching the batches concurrently.
+
+        Args:
+            artist_ids: List of Spotify artist IDs to retrieve.
+            batch_size: Number of artists to request per API call. Defaults to 50.
+
+        Returns:
+            List of artist data dictionaries from Spotify API, in batch order.
+        """
+        batches = [artist_ids[i:i + batch_size] for i in range(0, len(artist_ids), batch_size)]
+        results = await asyncio.gather(*(self._get_batch(batch, 'artists') for batch in batches))
+        return [artist for batch in results for artist in batch]
+
+    async def get_tracks_batch(self, track_ids: List[str], batch_size: int = 50) -> List[Dict[str, Any]]:
+        """Get multiple tracks, fetching the batches concurrently.
+
+        Args:
+            track_ids: List of Spotify track IDs to retrieve.
+            batch_size: Number of tracks to request per API call. Defaults to 50.
+
+        Returns:
+            List of track data dictionaries from Spotify API, in batch order.
+        """
+        batches = [track_ids[i:i + batch_size] for i in range(0, len(track_ids), batch_size)]
+        results = await asyncio.gather(*(self._get_batch(batch, 'tracks') for batch in batches))
+        return [track for batch in results for track in batch]
+
+    async def _get_batch(self, ids: List[str], kind: str) -> List[Dict[str, Any]]:
+        """Get one batch of artists or tracks, falling back to single requests if it fails."""
+        batch_method = getattr(self.client, kind)
+        single_method = getattr(self.client, kind[:-1])
+        try:
+            return (await self.call(batch_method, ids))[kind]
+        except Exception as e:
+            print(f"Error getting batch of {kind}: {str(e)}")
+        # Fallback to individual requests for failed batch
+        items = []
+        for item_id in ids:
+            try:
+                items.append(await self.call(single_method, item_id))
+            except Exception as e2:
+                print(f"Error getting {kind[:-1]} {item_id}: {str(e2)}")
+        return items
+
+    async def get_playlist_items(self, playlist_id: str) -> List[Dict[str, Any]]:
+        """Get all items of a playlist, fetching the pages after the first concurrently.
+
+        Args:
+            playlist_id: The Spotify playlist ID.
+
+        Returns:
+            List of playlist items in playlist order, like get_playlist_tracks().
+        """
+        first_page = await self.call(self.client.playlist_items, playlist_id, limit=PLAYLIST_PAGE_SIZE)
+        offsets = range(len(first_page['items']), first_page.get('total') or 0, PLAYLIST_PAGE_SIZE)
+        pages = await asyncio.gather(*(
+            self.call(self.client.playlist_items, playlist_id, limit=PLAYLIST_PAGE_SIZE, offset=offset)
+            for offset in offsets
+        ))
+        items = list(first_page['items'])
+        for page in pages:
+            items.extend(page['items'])
+        return items
+
+    async def add_playlist_items(self, playlist_id: str, track_ids: Sequence[str], batch_size: int = 100) -> int:
+        """Add tracks to a playlist in batches.
+
+        The batches for one playlist are sent one after another so the
+        tracks keep their order; adding to several playlists with gather()
+        runs the playlists concurrently.
+
+        Args:
+            playlist_id: The Spotify playlist ID.
+            track_ids: Track IDs to add.
+            batch_size: Number of tracks per request, at most 100. Defaults to 100.
+
+        Returns:
+            Number of tracks added.
+        """
+        track_ids = list(track_ids)
+        for i in range(0, len(track_ids), batch_size):
+            await self.call(self.client.playlist_add_items, playlist_id, track_ids[i:i + batch_size])
+        return len(track_ids)
+
+
+async def get_artists_batch_async(artist_ids: List[str], batch_size: int = 50,
+                                  max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Get multiple artists with several batch requests in flight.
+
+    Args:
+        artist_ids: List of Spotify artist IDs to retrieve.
+        batch_size: Number of artists to request per API call. Defaults to 50.
+        max_concurrency: Maximum number of requests in flight. Defaults to the configured value.
+
+    Returns:
+        List of artist data dictionaries from Spotify API.
+    """
+    return await AsyncSpotify(max_concurrency=max_concurrency).get_artists_batch(artist_ids, batch_size)
+
+async def get_tracks_batch_async(track_ids: List[str], batch_size: int = 50,
+                                 max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Get multiple tracks with several batch requests in flight.
+
+    Args:
+        track_ids: List of Spotify track IDs to retrieve.
+        batch_size: Number of tracks to request per API call. Defaults to 50.
+        max_concurrency: Maximum number of requests in flight. Defaults to the configured value.
+
+    Returns:
+        List of track data dictionaries from Spotify API.
+    """
+    return await AsyncSpotify(max_concurrency=max_concurrency).get_tracks_batch(track_ids, batch_size)
+
+async def get_playlist_tracks_async(playlist_id: str, max_concurrency: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Get all items of a playlist with several page requests in flight.
+
+    Args:
+        playlist_id: The Spotify playlist ID.
+        max_concurrency: Maximum number of requests in flight. Defaults to the configured value.
+
+    Returns:
+        List of playlist items in playlist order.
+    """
+    return await AsyncSpotify(max_concurrency=max_concurrency).get_playlist_items(playlist_id)
+
+async def add_playlist_items_async(playlist_tracks: Dict[str, Sequence[str]],
+                                   max_concurrency: Optional[int] = None) -> int:
+    """Add tracks to several playlists, with the playlists updated concurrently.
+
+    Args:
+        playlist_tracks: Dictionary mapping playlist IDs to the track IDs to add to them.
+        max_concurrency: Maximum number of requests in flight. Defaults to the configured value.
+
+    Returns:
+        Total number of tracks added.
+    """
+    client = AsyncSpotify(max_concurrency=max_concurrency)
+    added = await asyncio.gather(*(
+        client.add_playlist_items(playlist_id, track_ids) for playlist_id, track_ids in playlist_tracks.items()
+    ))
+    return sum(added)
+
+def fetch_artists_by_id(artist_ids: List[str], max_concurrency: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Get multiple artists with the async client, from synchronous code.
+
+    Inside a running event loop the artists are fetched one batch at a time
+    with get_artists_batch() instead.
+
+    Args:
+        artist_ids: List of Spotify artist IDs to retrieve.
+        max_concurrency: Maximum number of requests in flight. Defaults to the configured value.
+
+    Returns:
+        Dictionary mapping artist IDs to artist data. Artists that could not
+        be fetched are left out.
+    """
+    if in_running_loop():
+        artists = get_artists_batch(artist_ids)
+    else:
+        artists = run_async(get_artists_batch_async(artist_ids, max_concurrency=max_concurrency))
+    return {artist['id']: artist for artist in artists if artist}
+
+def fetch_tracks_by_id(track_ids: List[str], max_concurrency: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Get multiple tracks with the async client, from synchronous code.
+
+    Inside a running event loop the tracks are fetched one batch at a time
+    with get_tracks_batch() instead.
+
+    Args:
+        track_ids: List of Spotify track IDs to retrieve.
+        max_concurrency: Maximum number of requests in flight. Defaults to the configured value.
+
+    Returns:
+        Dictionary mapping track IDs to track data. Tracks that could not be
+        fetched are left out.
+    """
+    if in_running_loop():
+        tracks = get_tracks_batch(track_ids)
+    else:
+        tracks = run_async(get_tracks_batch_async(track_ids, max_concurrency=max_concurrency))
+    return {track['id']: track for track in tracks if track}
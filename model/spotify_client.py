@@ -2,26 +2,140 @@
 
 This module initializes the Spotify API client and provides utility functions 
 for robust API access. Includes retry logic for artist lookups and is used 
-by most scripts for Spotify API operations.
+by most scripts for Spotify API operations. Every request made through the 
+client waits for the process-wide rate limiter in model/Rate_Limiter, and 
+429 responses pause that limiter for their Retry-After period before the 
+request is retried. Connections are kept alive in pools sized by the HTTP_* 
+settings (see model/http_session). The shared client is created on first 
+use, so importing this module needs no credentials and never starts the 
+OAuth flow.
 """
 
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
+import threading
 import time
-from typing import Dict, Any, List
-from model.config import CLIENT_ID, CLIENT_SECRET, REDIRECT_URI
+from typing import Dict, Any, Callable, List, Optional
+from model.Rate_Limiter import TokenBucket, spotify_rate_limiter, parse_retry_after
+from model.http_session import create_session, mount_pooled_adapter
+from model.Artist_Loader import ArtistLoader
+from model.settings import require_setting
 
-# Initialize Spotify client
-sp: spotipy.Spotify = spotipy.Spotify(auth_manager=SpotifyOAuth(
-    client_id=CLIENT_ID,
-    client_secret=CLIENT_SECRET,
-    redirect_uri=REDIRECT_URI,
-    scope='playlist-modify-public playlist-modify-private user-library-read'
-))
+# Server errors retried by spotipy itself; 429 is handled by RateLimitedSpotify
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+class RateLimitedSpotify(spotipy.Spotify):
+    """Spotify client that sends every request through a shared rate limiter.
+    
+    Attributes:
+        rate_limiter: Token bucket every request takes a token from.
+        max_rate_limit_retries: Number of times a request is retried after 429 responses.
+    """
+    
+    def __init__(self, *args, rate_limiter: TokenBucket = spotify_rate_limiter,
+                 max_rate_limit_retries: int = 5, **kwargs):
+        """Initialize the client.
+        
+        Args:
+            *args: Positional arguments for spotipy.Spotify.
+            rate_limiter: Token bucket to take tokens from. Defaults to spotify_rate_limiter.
+            max_rate_limit_retries: Number of retries after 429 responses. Defaults to 5.
+            **kwargs: Keyword arguments for spotipy.Spotify.
+        """
+        # Let 429 responses reach _internal_call instead of urllib3 sleeping on them per thread
+        kwargs.setdefault('status_forcelist', RETRY_STATUS_CODES)
+        super().__init__(*args, **kwargs)
+        self.rate_limiter = rate_limiter
+        self.max_rate_limit_retries = max_rate_limit_retries
+    
+    def _build_session(self):
+        """Build spotipy's session with its retry policy on pooled keep-alive connections."""
+        super()._build_session()
+        # urllib3 retries any 429 that carries a Retry-After header, even with 429
+        # left out of status_forcelist, so stop it from reading the header at all
+        retry = self._session.get_adapter('https://').max_retries.new(respect_retry_after_header=False)
+        mount_pooled_adapter(self._session, max_retries=retry)
+    
+    def _internal_call(self, method, url, payload, params):
+        """Make a request once the rate limiter allows it, retrying after 429 responses."""
+        for attempt in range(self.max_rate_limit_retries + 1):
+            self.rate_limiter.acquire()
+            try:
+                return super()._internal_call(method, url, payload, params)
+            except spotipy.SpotifyException as e:
+                if e.http_status != 429 or attempt == self.max_rate_limit_retries:
+                    raise
+                retry_after = parse_retry_after(getattr(e, 'headers', None))
+                print(f"Rate limited by Spotify, pausing all requests for {retry_after:.1f} seconds...")
+                self.rate_limiter.pause(retry_after)
+
+class LazySpotify:
+    """Stand-in for a Spotify client that creates it on first use.
+    
+    Attribute lookups are forwarded to the client, which is created the 
+    first time one is made, so code that never calls the API never needs 
+    credentials or authenticates.
+    """
+    
+    def __init__(self, factory: Callable[[], spotipy.Spotify]):
+        """Initialize the stand-in.
+        
+        Args:
+            factory: Function that creates the client.
+        """
+        self._factory = factory
+        self._client: Optional[spotipy.Spotify] = None
+        self._lock = threading.Lock()
+    
+    @property
+    def initialized(self) -> bool:
+        """Whether the client has been created."""
+        return self._client is not None
+    
+    def get_client(self) -> spotipy.Spotify:
+        """Get the client, creating it if needed.
+        
+        Returns:
+            The Spotify client.
+        """
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.get_client(), name)
+
+def create_spotify_client() -> spotipy.Spotify:
+    """Create the rate-limited Spotify client from the credentials in model/config.py.
+    
+    Returns:
+        The new client.
+        
+    Raises:
+        RuntimeError: If config.py or one of the credentials is missing.
+    """
+    return RateLimitedSpotify(auth_manager=SpotifyOAuth(
+        client_id=require_setting('CLIENT_ID'),
+        client_secret=require_setting('CLIENT_SECRET'),
+        redirect_uri=require_setting('REDIRECT_URI'),
+        scope='playlist-modify-public playlist-modify-private user-library-read',
+        requests_session=create_session()
+    ))
+
+# Process-wide Spotify client, created on first API use
+sp: spotipy.Spotify = LazySpotify(create_spotify_client)
+
+# Process-wide loader that batches single-artist lookups from all threads
+artist_loader = ArtistLoader(sp)
 
 def get_artist_with_retry(artist_id: str, max_retries: int = 3, base_delay: int = 1) -> Dict[str, Any]:
     """Get artist data with exponential backoff retry logic.
     
+    The lookup goes through artist_loader, so lookups made at about the same 
+    time share one batch request.
+    
     Args:
         artist_id: The Spotify artist ID to retrieve.
         max_retries: Maximum number of retry attempts. Defaults to 3.
@@ -35,7 +149,7 @@ def get_artist_with_retry(artist_id: str, max_retries: int = 3, base_delay: int
     """
     for attempt in range(max_retries):
         try:
-            return sp.artist(artist_id)
+            return artist_loader.load(artist_id)
         except Exception as e:
             if ('rate' in str(e).lower() or 'timeout' in str(e).lower()) and attempt < max_retries - 1:
                 delay: int = base_delay * (2 ** attempt)  # Exponential backoff
@@ -0,0 +1,10 @@
+"""Shared pytest setup.
+
+Puts the repository root on the import path so the tests can import the
+model package the same way the controller scripts do.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
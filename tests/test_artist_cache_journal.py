@@ -0,0 +1,111 @@
+"""Tests for the append-only artist cache journal in model/Artist_Cache_Journal."""
+
+import json
+import os
+import threading
+
+import pytest
+
+import model.Artist_Cache_Journal as Artist_Cache_Journal
+from model.Artist_Cache_Journal import ArtistCacheJournal
+
+
+def _entry(name):
+    return {'name': name, 'genres': ['rock'], 'country': None}
+
+
+@pytest.fixture
+def journal(tmp_path):
+    snapshot_file = tmp_path / 'cache.json'
+    snapshot_file.write_text(json.dumps({'old': _entry('Old')}), encoding='utf-8')
+    return ArtistCacheJournal(str(snapshot_file), max_bytes=1024 * 1024)
+
+
+def _read_snapshot(journal):
+    with open(journal.snapshot_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_replay_skips_a_truncated_last_line(journal):
+    journal.append({'artist1': _entry('One')}, removed=['old'])
+    with open(journal.journal_file, 'a', encoding='utf-8') as f:
+        f.write('{"id": "artist2", "entry": {"name": "Tw')
+
+    assert journal.load() == {'artist1': _entry('One')}
+
+    # Appends after the crash still replay
+    journal.append({'artist3': _entry('Three')})
+    assert journal.load() == {'artist1': _entry('One'), 'artist3': _entry('Three')}
+
+
+def test_compaction_keeps_writes_made_while_it_runs(journal, monkeypatch):
+    started = threading.Event()
+    release = threading.Event()
+    dumps = Artist_Cache_Journal.dumps_artist_cache
+
+    def slow_dumps(cache):
+        started.set()
+        release.wait(5)
+        return dumps(cache)
+
+    monkeypatch.setattr(Artist_Cache_Journal, 'dumps_artist_cache', slow_dumps)
+    journal.append({'artist1': _entry('One')})
+    journal.compact_in_background()
+    assert started.wait(5)
+
+    # Writers are not blocked by the compaction and readers see every change
+    journal.append({'artist2': _entry('Two')}, removed=['artist1'])
+    expected = {'old': _entry('Old'), 'artist2': _entry('Two')}
+    assert journal.load() == expected
+
+    release.set()
+    journal.wait_for_compaction()
+    assert not os.path.exists(journal.compacting_file)
+    assert _read_snapshot(journal) == {'old': _entry('Old'), 'artist1': _entry('One')}
+    assert journal.load() == expected
+
+
+def test_concurrent_appends_across_compactions(journal):
+    journal.max_bytes = 2048
+    threads = [
+        threading.Thread(target=lambda writer=writer: [
+            journal.append({f'artist{writer}_{i}': _entry(f'Artist {writer} {i}')}) for i in range(100)
+        ])
+        for writer in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    journal.wait_for_compaction()
+
+    expected = {'old': _entry('Old')}
+    expected.update({f'artist{writer}_{i}': _entry(f'Artist {writer} {i}') for writer in range(4) for i in range(100)})
+    assert journal.load() == expected
+    # Rotated journals were folded into the snapshot
+    assert len(_read_snapshot(journal)) > 1
+
+
+def test_compaction_swaps_the_snapshot_atomically(journal, monkeypatch):
+    journal.append({'artist1': _entry('One')})
+
+    def failing_dumps(cache):
+        raise OSError("disk full")
+
+    # A compaction that fails before the swap leaves the old snapshot and the rotated journal in place
+    monkeypatch.setattr(Artist_Cache_Journal, 'dumps_artist_cache', failing_dumps)
+    journal.compact_in_background()
+    journal.wait_for_compaction()
+    assert _read_snapshot(journal) == {'old': _entry('Old')}
+    assert os.path.exists(journal.compacting_file)
+    assert journal.load() == {'old': _entry('Old'), 'artist1': _entry('One')}
+
+    # The next compaction finishes the interrupted one
+    monkeypatch.undo()
+    journal.append({'artist2': _entry('Two')})
+    journal.compact_in_background()
+    journal.wait_for_compaction()
+    assert _read_snapshot(journal) == {'old': _entry('Old'), 'artist1': _entry('One')}
+    assert not os.path.exists(journal.compacting_file)
+    assert not os.path.exists(journal.snapshot_file + '.tmp')
+    assert journal.load() == {'old': _entry('Old'), 'artist1': _entry('One'), 'artist2': _entry('Two')}
@@ -0,0 +1,52 @@
+"""Tests for the memory-mapped artist cache snapshot used by model/Artist_Cache."""
+
+import json
+import sys
+import types
+
+import pytest
+
+import model.Artist_Cache as Artist_Cache
+from model.Artist_Cache import ArtistCache
+from model.Artist_Cache_Snapshot import ArtistSnapshot
+from model.Artist_Record import ArtistRecord
+
+# Spotify artist IDs, which the snapshot stores as fixed-length records
+ARTIST1 = '0OdUWJ0sBjDrqHygGUXeCF'
+ARTIST2 = '3WrFJ7ztbogyGnTHbHJFl2'
+
+
+@pytest.fixture
+def snapshot_enabled(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+    config = types.ModuleType('model.config')
+    config.ARTIST_CACHE_SNAPSHOT = True
+    monkeypatch.setitem(sys.modules, 'model.config', config)
+    monkeypatch.setattr(Artist_Cache, '_artist_cache_journal', None)
+    with open(Artist_Cache.ARTIST_CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({ARTIST1: {'name': 'One', 'genres': ['rock'], 'country': None}}, f)
+
+
+def test_snapshot_is_rebuilt_after_a_save(snapshot_enabled):
+    cache = ArtistCache(check_interval=0)
+    data = cache.data()
+    data[ARTIST2] = ArtistRecord('Two', ['jazz'], 'Brazil')
+    data[ARTIST1]['genres'] = ['punk']
+    cache.save()
+    cache.flush()
+
+    # Another process starting now can answer lookups from the snapshot
+    reader = ArtistCache(check_interval=0)
+    view = reader.view()
+    assert isinstance(view, ArtistSnapshot)
+    assert view[ARTIST2] == ArtistRecord('Two', ['jazz'], 'Brazil')
+    assert view[ARTIST1]['genres'] == ['punk']
+    reader.invalidate()
+
+    # So can this one once it drops its in-memory copy
+    cache.invalidate()
+    view = cache.view()
+    assert isinstance(view, ArtistSnapshot)
+    assert set(view) == {ARTIST1, ARTIST2}
+    cache.invalidate()
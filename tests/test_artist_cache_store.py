@@ -0,0 +1,167 @@
+"""Tests for the SQLite artist cache store and the choice of storage backend."""
+
+import json
+import os
+import threading
+
+import pytest
+
+import model.Artist_Cache as Artist_Cache
+from model.Artist_Cache import read_artist_cache_files, write_artist_cache_files
+from model.Artist_Cache_Shards import ARTIST_CACHE_SHARDS_DIR, write_artist_shards
+from model.Artist_Cache_Store import ArtistCacheStore, ARTIST_CACHE_DB_FILE, export_sqlite_to_json, migrate_json_to_sqlite
+from model.Artist_Record import ArtistRecord
+
+
+def _entry(name, genres=('rock',), country=None, **extra):
+    return ArtistRecord(name, list(genres), country, **extra)
+
+
+@pytest.fixture
+def backends(tmp_path, monkeypatch):
+    """Run in an empty data directory with no shared store or journal opened yet."""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs('data')
+    monkeypatch.setattr(Artist_Cache, '_artist_cache_store', None)
+    monkeypatch.setattr(Artist_Cache, '_artist_cache_journal', None)
+    yield
+    if Artist_Cache._artist_cache_store is not None:
+        Artist_Cache._artist_cache_store.close()
+
+
+def test_store_round_trip(tmp_path):
+    store = ArtistCacheStore(str(tmp_path / 'cache.db'))
+    entries = {
+        'artist1': _entry('Sigur Rós', ['post-rock', 'Icelandic'], 'Iceland',
+                          fetched_at={'spotify': 1.5}, normalized_genres=['Post-Rock']),
+        'artist2': _entry(None, [], None),
+    }
+    store.upsert_many(entries)
+    store.upsert('artist3', _entry('Three'))
+    store.close()
+
+    reopened = ArtistCacheStore(str(tmp_path / 'cache.db'))
+    loaded = reopened.load_all()
+    assert loaded == {**entries, 'artist3': _entry('Three')}
+    assert loaded['artist1'].fetched_at('spotify') == 1.5
+    assert reopened.get('artist1') == entries['artist1']
+    assert reopened.get('missing') is None
+    assert reopened.get_many(['artist2', 'missing', 'artist2']) == {'artist2': entries['artist2']}
+    assert 'artist3' in reopened and len(reopened) == 3
+
+    reopened.upsert('artist3', _entry('Three', ['jazz']))
+    reopened.delete_many(['artist2'])
+    assert reopened.artist_ids() == {'artist1', 'artist3'}
+    assert reopened.get('artist3')['genres'] == ['jazz']
+    reopened.close()
+
+
+def test_json_migration_and_export_round_trip(tmp_path):
+    cache = {
+        'artist1': {'name': 'One', 'genres': ['rock'], 'country': 'Brazil', 'fetched_at': {'wikidata': 2.0}},
+        'artist2': {'name': 'Two', 'genres': [], 'country': None},
+    }
+    json_file = tmp_path / 'cache.json'
+    json_file.write_text(json.dumps(cache), encoding='utf-8')
+    db_file = str(tmp_path / 'cache.db')
+
+    assert migrate_json_to_sqlite(str(json_file), db_file) == 2
+    assert export_sqlite_to_json(str(tmp_path / 'exported.json'), db_file) == 2
+    exported = json.loads((tmp_path / 'exported.json').read_text(encoding='utf-8'))
+    assert exported == cache
+
+
+def test_concurrent_writers_keep_every_row(tmp_path):
+    db_file = str(tmp_path / 'cache.db')
+    # Two connections, as from two processes, each shared by two threads
+    stores = [ArtistCacheStore(db_file), ArtistCacheStore(db_file)]
+    errors = []
+
+    def write(store, writer):
+        try:
+            for batch in range(20):
+                store.upsert_many({
+                    f'artist{writer}_{batch}_{i}': _entry(f'Artist {writer}', [f'genre{batch}'])
+                    for i in range(10)
+                })
+                store.delete_many([f'artist{writer}_{batch}_0'])
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(stores[writer % 2], writer)) for writer in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    expected = {f'artist{writer}_{batch}_{i}' for writer in range(4) for batch in range(20) for i in range(1, 10)}
+    for store in stores:
+        assert store.artist_ids() == expected
+    assert stores[0].get('artist3_19_9') == _entry('Artist 3', ['genre19'])
+    for store in stores:
+        store.close()
+
+
+def _write_every_backend():
+    """Write a different artist to the JSON file, the journal, the shards and the SQLite store."""
+    with open(Artist_Cache.ARTIST_CACHE_FILE, 'w', encoding='utf-8') as f:
+        json.dump({'json': {'name': 'JSON', 'genres': [], 'country': None}}, f)
+    with open(Artist_Cache.ARTIST_CACHE_FILE + '.journal', 'w', encoding='utf-8') as f:
+        f.write(json.dumps({'id': 'journal', 'entry': {'name': 'Journal', 'genres': [], 'country': None}}) + '\n')
+    write_artist_shards(ARTIST_CACHE_SHARDS_DIR, {'shards': _entry('Shards')})
+    store = ArtistCacheStore(ARTIST_CACHE_DB_FILE)
+    store.upsert('sqlite', _entry('SQLite'))
+    store.close()
+
+
+def _remove_sqlite_store():
+    Artist_Cache.get_artist_cache_store().close()
+    Artist_Cache._artist_cache_store = None
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(ARTIST_CACHE_DB_FILE + suffix):
+            os.remove(ARTIST_CACHE_DB_FILE + suffix)
+
+
+def _remove_shards():
+    for name in os.listdir(ARTIST_CACHE_SHARDS_DIR):
+        os.remove(os.path.join(ARTIST_CACHE_SHARDS_DIR, name))
+    os.rmdir(ARTIST_CACHE_SHARDS_DIR)
+
+
+def _read_json_file():
+    with open(Artist_Cache.ARTIST_CACHE_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_backend_precedence_for_reads(backends):
+    _write_every_backend()
+
+    assert set(read_artist_cache_files()) == {'sqlite'}
+    _remove_sqlite_store()
+    assert set(read_artist_cache_files()) == {'shards'}
+    _remove_shards()
+    # The journal is replayed on top of the JSON snapshot
+    assert set(read_artist_cache_files()) == {'json', 'journal'}
+    os.remove(Artist_Cache.ARTIST_CACHE_FILE + '.journal')
+    assert set(read_artist_cache_files()) == {'json'}
+
+
+def test_backend_precedence_for_writes(backends):
+    _write_every_backend()
+
+    write_artist_cache_files({'written': _entry('Written')})
+    assert Artist_Cache.get_artist_cache_store().artist_ids() == {'written'}
+    assert set(_read_json_file()) == {'json'}
+
+    _remove_sqlite_store()
+    write_artist_cache_files({'written': _entry('Written')})
+    assert set(read_artist_cache_files()) == {'written'}
+    assert set(_read_json_file()) == {'json'}
+
+    _remove_shards()
+    # A full write replaces the JSON file and drops the journal it supersedes
+    write_artist_cache_files({'written': _entry('Written')})
+    assert set(_read_json_file()) == {'written'}
+    assert not os.path.exists(Artist_Cache.ARTIST_CACHE_FILE + '.journal')
+    assert set(read_artist_cache_files()) == {'written'}
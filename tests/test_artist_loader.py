@@ -0,0 +1,78 @@
+"""Tests for the batching artist loader in model/Artist_Loader."""
+
+import threading
+import time
+
+import pytest
+
+from model.Artist_Loader import ArtistLoader
+
+
+class FakeClient:
+    """Spotify client stand-in that records its requests and the threads sending them."""
+
+    def __init__(self, missing=()):
+        self.missing = set(missing)
+        self.batches = []
+        self.threads = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def artists(self, artist_ids):
+        self.batches.append(list(artist_ids))
+        self.threads.append(threading.current_thread())
+        self.release.wait(5)
+        return {'artists': [None if artist_id in self.missing else {'id': artist_id, 'name': artist_id.upper()}
+                            for artist_id in artist_ids]}
+
+    def artist(self, artist_id):
+        return {'id': artist_id, 'name': artist_id.upper()}
+
+
+def test_load_many_sends_full_batches_and_skips_duplicates():
+    client = FakeClient()
+    loader = ArtistLoader(client)
+    artist_ids = [f'artist{i}' for i in range(120)]
+
+    artists = loader.load_many(artist_ids + artist_ids[:10])
+
+    assert [len(batch) for batch in client.batches] == [50, 50, 20]
+    assert sorted(sum(client.batches, [])) == sorted(artist_ids)
+    assert artists == {artist_id: {'id': artist_id, 'name': artist_id.upper()} for artist_id in artist_ids}
+
+
+def test_load_is_sent_at_once_from_the_calling_thread():
+    client = FakeClient()
+    loader = ArtistLoader(client)
+
+    assert loader.load('artist1')['name'] == 'ARTIST1'
+    assert client.batches == [['artist1']]
+    assert client.threads == [threading.current_thread()]
+
+
+def test_concurrent_loads_of_an_artist_share_one_request():
+    client = FakeClient()
+    client.release.clear()
+    loader = ArtistLoader(client)
+    results = []
+    first = threading.Thread(target=lambda: results.append(loader.load('artist1')))
+    first.start()
+    while not client.batches:
+        time.sleep(0.001)
+
+    # The artist is in flight, so a second caller waits for the same request
+    second = loader._enqueue(['artist1'])[0]
+    loader.dispatch()
+    client.release.set()
+    first.join(5)
+
+    assert client.batches == [['artist1']]
+    assert second.result(5) == results[0] == {'id': 'artist1', 'name': 'ARTIST1'}
+
+
+def test_missing_artists_raise_lookup_error():
+    loader = ArtistLoader(FakeClient(missing={'gone'}))
+
+    with pytest.raises(LookupError):
+        loader.load('gone')
+    assert loader.load_many(['artist1', 'gone']) == {'artist1': {'id': 'artist1', 'name': 'ARTIST1'}}
@@ -0,0 +1,50 @@
+"""Tests for the country tagging engine in model/Country_Tags."""
+
+from model.Artist_Record import ArtistRecord
+from model.Country_Tags import CountryTagger
+
+
+def test_countries_match_names_and_aliases_only():
+    tagger = CountryTagger()
+    assert tagger.canonical_country('  denmark ') == 'Denmark'
+    assert tagger.canonical_country('Kingdom of Denmark') == 'Denmark'
+    assert tagger.canonical_country('Empire of Japan') == 'Japan'
+    assert tagger.canonical_country('Danish West Indies (Denmark)') is None
+    assert tagger.canonical_country('Japantown') is None
+
+
+def test_batch_tagging_matches_single_tagging():
+    tagger = CountryTagger()
+    artist_cache = {
+        'brazilian': ArtistRecord('Brazilian', ['samba'], 'Brazil'),
+        'tagged': ArtistRecord('Tagged', ['j-pop', 'japanese music'], 'Japan'),
+        'swedish': ArtistRecord('Swedish', ['death metal'], 'Sweden'),
+        'norwegian': ArtistRecord('Norwegian', ['folk'], 'Norway'),
+        'unknown': ArtistRecord('Unknown', ['rock'], None),
+    }
+
+    tags_by_artist = tagger.tag_artists(artist_cache)
+    assert tags_by_artist == {
+        artist_id: tagger.artist_tags(entry['country'], entry['genres'])
+        for artist_id, entry in artist_cache.items()
+        if tagger.artist_tags(entry['country'], entry['genres'])
+    }
+    assert tags_by_artist == {'brazilian': ['Brazilian Music']}
+
+    tracks = {
+        'metal': ['swedish', 'unknown'],
+        'folk': ['norwegian'],
+        'mixed': ['norwegian', 'swedish', 'brazilian'],
+        'uncached': ['missing'],
+    }
+    assert tagger.tag_tracks(tracks, artist_cache) == {
+        'metal': ['Scandinavian Metal'],
+        'mixed': ['Brazilian Music', 'Scandinavian Metal'],
+    }
+    # Genres of uncached artists can meet a tag's genre requirement
+    assert tagger.tag_tracks({'folk': ['norwegian', 'missing']}, artist_cache,
+                             {'norwegian': ['folk'], 'missing': ['black metal']}) == {'folk': ['Scandinavian Metal']}
+
+    tagger.add_artist_tags_batch(artist_cache)
+    assert artist_cache['brazilian']['genres'] == ['samba', 'Brazilian Music']
+    assert artist_cache['tagged']['genres'] == ['j-pop', 'japanese music']
@@ -0,0 +1,103 @@
+"""Tests for the persistent genre index in model/Genre_Index."""
+
+import pytest
+
+from model.Artist_Cache import ArtistCache
+from model.Artist_Record import ArtistRecord
+from model.Genre_Index import GenreIndex
+from model.Genre_Tools import ArtistGenreResolver, normalized_genre_keys, should_track_be_in_playlist
+
+
+def _playlist(track_count, artist_ids):
+    return [
+        {'track': {'id': f'track{i}', 'artists': [{'id': artist_ids[i % len(artist_ids)]}]}}
+        for i in range(track_count)
+    ]
+
+
+@pytest.fixture
+def artist_cache():
+    return {
+        'artist1': ArtistRecord('Artist One', ['rock'], None),
+        'artist2': ArtistRecord('Artist Two', ['jazz'], None),
+    }
+
+
+def test_cancelled_sync_is_finished_by_the_next_sync(tmp_path, artist_cache):
+    tracks = _playlist(500, ['artist1', 'artist2'])
+    index = GenreIndex(str(tmp_path / 'genre_index.json'))
+    index.sync_playlist('source', tracks, artist_cache)
+
+    artist_cache['artist1']['genres'] = ['metal']
+    calls = []
+    def cancel(current, total):
+        calls.append(current)
+        if len(calls) > 1:
+            raise RuntimeError('cancelled')
+    with pytest.raises(RuntimeError):
+        index.sync_playlist('source', tracks, artist_cache, progress_callback=cancel)
+
+    index.sync_playlist('source', tracks, artist_cache)
+    rebuilt = GenreIndex(str(tmp_path / 'rebuilt.json'))
+    rebuilt.sync_playlist('source', tracks, artist_cache)
+    assert index.genre_tracks('source') == rebuilt.genre_tracks('source')
+    assert not any('rock' in genre.lower() for genre in index.genre_tracks('source'))
+
+
+def test_progress_covers_whole_playlist_on_warm_index(tmp_path, artist_cache):
+    tracks = _playlist(150, ['artist1', 'artist2'])
+    index = GenreIndex(str(tmp_path / 'genre_index.json'))
+    index.sync_playlist('source', tracks, artist_cache)
+
+    calls = []
+    recomputed = index.sync_playlist('source', tracks, artist_cache,
+                                     progress_callback=lambda current, total: calls.append((current, total)))
+    assert recomputed == 0
+    assert calls == [(150, 150)]
+
+
+def test_genre_lookups_follow_cache_changes_without_a_sync(tmp_path, artist_cache):
+    tracks = _playlist(10, ['artist1', 'artist2'])
+    index = GenreIndex(str(tmp_path / 'genre_index.json'))
+    index.sync_playlist('source', tracks, artist_cache)
+    rock_tracks = index.tracks_for_genre('source', 'Rock')
+    assert rock_tracks == {f'track{i}' for i in range(0, 10, 2)}
+    assert index.artists_for_genre('rock') == {'artist1'}
+    assert index.track_in_genre('source', 'track0', 'rock')
+
+    artist_cache['artist2']['genres'] = ['rock']
+    assert index.update_artists(artist_cache, {'artist2'}) == 1
+
+    assert index.tracks_for_genre('source', 'rock') == {f'track{i}' for i in range(10)}
+    assert index.tracks_for_genre('source', 'jazz') == set()
+    assert index.artists_for_genre('rock') == {'artist1', 'artist2'}
+    assert index.sync_playlist('source', tracks, artist_cache) == 0
+
+
+def test_membership_matches_should_track_be_in_playlist(tmp_path, artist_cache):
+    artist_cache['artist2']['genres'] = ['Hard-Rock', 'jazz fusion']
+    tracks = _playlist(2, ['artist1', 'artist2'])
+    index = GenreIndex(str(tmp_path / 'genre_index.json'))
+    index.sync_playlist('source', tracks, artist_cache)
+
+    resolver = ArtistGenreResolver(artist_cache)
+    for item in tracks:
+        track_genres = resolver.track_genres(item)
+        for genre in normalized_genre_keys(track_genres) | {'pop'}:
+            assert index.track_in_genre('source', item['track']['id'], genre) == \
+                should_track_be_in_playlist(track_genres, genre)
+
+
+def test_cache_writes_update_the_index(tmp_path, monkeypatch, artist_cache):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'data').mkdir()
+    index = GenreIndex(str(tmp_path / 'genre_index.json'))
+    index.sync_playlist('source', _playlist(4, ['artist1', 'artist2']), artist_cache)
+    cache = ArtistCache()
+    cache.add_write_listener(lambda written, artist_ids: index.update_artists(written, artist_ids))
+
+    artist_cache['artist2']['genres'] = ['rock']
+    cache.save(artist_cache)
+    cache.flush()
+
+    assert index.tracks_for_genre('source', 'rock') == {'track0', 'track1', 'track2', 'track3'}
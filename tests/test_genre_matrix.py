@@ -0,0 +1,23 @@
+"""Tests for the track by genre matrix in model/Genre_Matrix."""
+
+from model.Artist_Record import ArtistRecord
+from model.Genre_Matrix import TrackGenreMatrix
+
+
+def _item(track_id, artist_ids):
+    return {'track': {'id': track_id, 'artists': [{'id': artist_id} for artist_id in artist_ids]}}
+
+
+def test_duplicate_playlist_items_count_once():
+    artist_cache = {
+        'artist1': ArtistRecord('Artist One', ['rock'], None),
+        'artist2': ArtistRecord('Artist Two', ['jazz'], None),
+    }
+    tracks = [_item('track1', ['artist1']), _item('track2', ['artist2']),
+              _item('track1', ['artist1']), None, {'track': None}]
+
+    matrix = TrackGenreMatrix.from_tracks(tracks, artist_cache, normalized=False)
+
+    assert matrix.track_ids == ['track1', 'track2']
+    assert matrix.matrix.shape[0] == 2
+    assert [(genre, count) for genre, count, _ in matrix.ranking()] == [('jazz', 1), ('rock', 1)]
@@ -0,0 +1,127 @@
+"""Tests for the compiled genre normalizer in model/Genre_Rules.
+
+The rules in model/genre_rules.json and the compiled normalizer replaced a
+normalize_genre with hardcoded tables. A frozen copy of that original is
+kept here, and the compiled normalizer must give the same genres for the
+cached genres, the custom genres and genres built from the rules.
+"""
+
+import itertools
+import re
+from typing import List, Set
+
+from model.Artist_Genres import load_custom_genres
+from model.Genre_Rules import get_genre_rules
+from model.Genre_Tools import load_artist_cache
+
+# Extra words combined with the rule values to build synthetic genres
+SYNTHETIC_WORDS = ['pop', 'jazz', 'music', ' music', 'Music', 'brazilian music', 'japanese music',
+                   'name', 'Genres', '', ' ', '-', 'j', 'hip', 'bass']
+
+
+# Rule tables of the original normalize_genre: mapped genres added while keeping
+# the original, and special cases that replace the original genre
+BASELINE_GENRE_MAPPINGS = {
+    'brazilian music': ['brazilian'],
+    'metal': ['metal', 'djent'],
+    'emo': ['emo'],
+    'rap and hip hop': ['rap', 'hip hop', 'hip-hop'],
+    'folk': ['folk'],
+    'industrial': ['industrial'],
+    'indie and alternative': ['alternative', 'indie', 'alt'],
+    'rock': ['rock', 'hardcore', 'grunge', 'metal'],
+    'punk': ['punk'],
+    'glam': ['glam'],
+    'country': ['country'],
+    'sertanejo': ['sertanejo'],
+    'mpb': ['mpb'],
+    '(Rhythm and )Blues': ['blues', 'r&b', 'rhythm and blues'],
+    'Japanese Music': ['kei', 'japanese music', 'kayokyoku', 'j-pop', 'shibuya-kei', 'j-rock', 'anime', 'japanese indie', 'j-rap', 'vocaloid'],
+    'comedy': ['comedy', 'meme'],
+}
+BASELINE_SPECIAL_CASES = {
+    'hip hop': ['Hip-Hop'],
+    'electropop': ['electro-pop', 'electro pop'],
+    'anime': ['anime rap'],
+    'electro and edm': ['electronica', 'edm'],
+    'hardcore': ['hardcore punk'],
+    'drum and bass': ['bass music'],
+    'mpb': ['música popular brasileira'],
+    'comedy': ['parody', 'satire']
+}
+
+
+def baseline_normalize_genre(genre: str) -> List[str]:
+    """Normalize genre names the way the original, hardcoded normalize_genre did.
+    
+    Args:
+        genre: Raw genre name to normalize.
+        
+    Returns:
+        List of normalized genre names.
+    """
+    # Drop unwanted tags
+    if genre.strip().lower() in ["name", "genres"]:
+        return []
+    # First, clean the genre by removing " music" from the end (except Brazilian and Japanese Music)
+    if genre.lower() not in ['brazilian music', 'japanese music']:
+        genre = re.sub(r' music$', '', genre, flags=re.IGNORECASE).strip()
+    
+    genre_lower = genre.lower()
+    result = set()  # Using set to automatically handle duplicates
+    
+    # Check if this genre matches any special cases first (replace original)
+    for special_key, special_values in BASELINE_SPECIAL_CASES.items():
+        if any(special_value.lower() in genre_lower for special_value in special_values):
+            result.add(special_key.title())
+            return list(result)
+    
+    # Check if this genre matches any of our normal genre mappings (add mapped genre while keeping original)
+    for mapping_key, mapping_values in BASELINE_GENRE_MAPPINGS.items():
+        if any(mapping_value.lower() in genre_lower for mapping_value in mapping_values):
+            # Add the mapping key to results (while keeping original)
+            result.add(mapping_key.title())
+    
+    # Always add the original genre (cleaned)
+    if genre:
+        result.add(genre.title())
+    
+    return list(result)
+
+
+def _genre_corpus() -> Set[str]:
+    """Collect the cached and custom genres, and genres built from the rules."""
+    genres: Set[str] = set()
+    for entry in load_artist_cache().values():
+        genres.update(entry.get('genres') or [])
+    for entry in load_custom_genres().values():
+        if isinstance(entry, dict):
+            genres.update(entry.get('genres') or [])
+        elif isinstance(entry, list):
+            genres.update(entry)
+
+    words = list(SYNTHETIC_WORDS)
+    rules = get_genre_rules()
+    for table in (rules.genre_mappings, rules.special_cases,
+                  BASELINE_GENRE_MAPPINGS, BASELINE_SPECIAL_CASES):
+        words.extend(table)
+        for values in table.values():
+            words.extend(values)
+    genres.update(words)
+    for first, second in itertools.product(words, repeat=2):
+        genres.add(f"{first} {second}")
+        genres.add(first + second)
+    genres.update([genre.upper() for genre in list(genres)])
+    return genres
+
+
+def test_compiled_normalizer_matches_baseline():
+    normalize = get_genre_rules().normalize
+    mismatches = {}
+    for genre in _genre_corpus():
+        compiled = normalize(genre)
+        baseline = baseline_normalize_genre(genre)
+        if len(compiled) != len(set(compiled)) or set(compiled) != set(baseline):
+            mismatches[genre] = (compiled, sorted(baseline))
+
+    assert not mismatches, f"{len(mismatches)} genres differ, e.g. {sorted(mismatches.items())[:10]}"
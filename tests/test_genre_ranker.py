@@ -0,0 +1,48 @@
+"""Tests for the playlist genre ranking in controller/Genre_Ranker."""
+
+from unittest import mock
+
+import pytest
+
+import controller.Genre_Ranker as Genre_Ranker
+from model.Artist_Record import ArtistRecord
+
+
+def _item(track_id, artist_id):
+    return {'track': {'id': track_id, 'artists': [{'id': artist_id}]}}
+
+
+@pytest.fixture
+def playlist_with_uncached_artist(monkeypatch):
+    """A playlist by a cached Japanese artist and an uncached Brazilian one."""
+    tracks = [_item('track1', 'cached'), _item('track2', 'uncached')]
+    monkeypatch.setattr(Genre_Ranker, 'get_playlist_tracks', lambda playlist_id: tracks)
+    monkeypatch.setattr(Genre_Ranker, 'load_artist_cache',
+                        lambda: {'cached': ArtistRecord('Cached', ['rock'], 'Japan')})
+    monkeypatch.setattr(Genre_Ranker, 'custom_genre_store', mock.Mock(get_many=lambda artist_ids: {}))
+    spotify = mock.Mock()
+    spotify.artists.return_value = {'artists': [{'id': 'uncached', 'name': 'Uncached', 'genres': ['samba']}]}
+    monkeypatch.setattr(Genre_Ranker, 'sp', spotify)
+    monkeypatch.setattr(Genre_Ranker, 'get_artist_country_wikidata', lambda name: 'Brazil')
+
+
+def _ranked_genres(output):
+    return {line[2:].split(':')[0] for line in output.splitlines() if line.startswith('- ')}
+
+
+def test_unfiltered_ranking_counts_every_track(playlist_with_uncached_artist, capsys):
+    Genre_Ranker.rank_playlist_genres('playlist')
+
+    output = capsys.readouterr().out
+    assert 'Counting' not in output
+    assert {'Rock', 'Samba', 'Japanese Music', 'Brazilian Music'} <= _ranked_genres(output)
+
+
+def test_country_filter_survives_fetching_uncached_artists(playlist_with_uncached_artist, capsys):
+    Genre_Ranker.rank_playlist_genres('playlist', country='Japan')
+
+    output = capsys.readouterr().out
+    assert 'Counting 1 tracks with artists from Japan' in output
+    genres = _ranked_genres(output)
+    assert 'Rock' in genres
+    assert 'Samba' not in genres and 'Brazilian Music' not in genres
@@ -0,0 +1,39 @@
+"""Tests that the shared Spotify client in model/spotify_client is created lazily."""
+
+import importlib
+import sys
+import types
+from unittest import mock
+
+import spotipy
+import spotipy.oauth2
+
+
+@mock.patch.object(spotipy.oauth2, 'SpotifyOAuth')
+def test_client_is_created_on_first_attribute_access(oauth, monkeypatch):
+    config = types.ModuleType('model.config')
+    config.CLIENT_ID = config.CLIENT_SECRET = config.REDIRECT_URI = 'x'
+    monkeypatch.setitem(sys.modules, 'model.config', config)
+    created = []
+    monkeypatch.setattr(spotipy.Spotify, '__init__', lambda self, *args, **kwargs: created.append(self))
+    # Import fresh copies, so the module-level code runs under the patches
+    for name in ('model.spotify_client', 'model.Playlist_Tools'):
+        monkeypatch.delitem(sys.modules, name, raising=False)
+
+    spotify_client = importlib.import_module('model.spotify_client')
+    Playlist_Tools = importlib.import_module('model.Playlist_Tools')
+
+    assert created == []
+    assert not oauth.called
+    assert Playlist_Tools.sp is spotify_client.sp
+    assert not spotify_client.sp.initialized
+
+    assert spotify_client.sp.max_rate_limit_retries == 5
+    assert len(created) == 1
+    assert isinstance(created[0], spotify_client.RateLimitedSpotify)
+    assert oauth.call_count == 1
+    assert spotify_client.sp.initialized
+
+    # Later lookups reuse the client
+    assert spotify_client.sp.get_client() is created[0]
+    assert len(created) == 1
@@ -0,0 +1,89 @@
+"""Tests for the token bucket and Retry-After parsing in model/Rate_Limiter."""
+
+import email.utils
+
+import pytest
+
+from model.Rate_Limiter import DEFAULT_RETRY_AFTER, TokenBucket, parse_retry_after
+
+
+class FakeClock:
+    """Clock that only moves when something sleeps on it."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_full_bucket_allows_a_burst_then_the_sustained_rate(clock):
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock, sleep=clock.sleep)
+
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert bucket.acquire() == pytest.approx(0.5)
+    assert clock.sleeps == pytest.approx([0.5, 0.5])
+
+
+def test_tokens_refill_over_time_up_to_the_capacity(clock):
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock, sleep=clock.sleep)
+    for _ in range(3):
+        bucket.acquire()
+
+    clock.now += 1.0
+    assert [bucket.acquire() for _ in range(2)] == [0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.5)
+
+    # A long idle period never saves up more than a full burst
+    clock.now += 60.0
+    assert [bucket.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.acquire() == pytest.approx(0.5)
+
+
+def test_pause_holds_every_caller_and_restarts_with_an_empty_bucket(clock):
+    bucket = TokenBucket(rate=2, capacity=3, clock=clock, sleep=clock.sleep)
+    bucket.pause(5.0)
+    # A shorter pause never shortens the running one
+    bucket.pause(1.0)
+
+    assert bucket.acquire() == pytest.approx(5.5)
+    assert clock.sleeps == pytest.approx([5.0, 0.5])
+
+
+def test_invalid_bucket_settings_are_rejected():
+    with pytest.raises(ValueError):
+        TokenBucket(rate=0)
+    with pytest.raises(ValueError):
+        TokenBucket(rate=1, capacity=0.5)
+
+
+@pytest.mark.parametrize('headers, expected', [
+    ({'Retry-After': '7'}, 7.0),
+    ({'retry-after': '2.5'}, 2.5),
+    ({'Retry-After': '-3'}, 0.0),
+    ({'Retry-After': 'soon'}, DEFAULT_RETRY_AFTER),
+    ({}, DEFAULT_RETRY_AFTER),
+    (None, DEFAULT_RETRY_AFTER),
+])
+def test_parse_retry_after_seconds(headers, expected):
+    assert parse_retry_after(headers) == expected
+
+
+def test_parse_retry_after_http_date():
+    now = 1_700_000_000.0
+    headers = {'Retry-After': email.utils.formatdate(now + 30, usegmt=True)}
+
+    assert parse_retry_after(headers, now=now) == pytest.approx(30.0)
+    # A date in the past means retry right away
+    assert parse_retry_after(headers, now=now + 60) == 0.0
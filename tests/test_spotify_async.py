@@ -0,0 +1,60 @@
+"""Tests for the synchronous entry points of model/spotify_async."""
+
+import asyncio
+import threading
+
+import pytest
+
+import model.spotify_async as spotify_async
+from model.spotify_async import fetch_artists_by_id, fetch_tracks_by_id
+
+
+class FakeClient:
+    """Spotify client stand-in that records the threads its requests come from."""
+
+    def __init__(self):
+        self.threads = []
+
+    def artists(self, artist_ids):
+        self.threads.append(threading.current_thread())
+        return {'artists': [{'id': artist_id} for artist_id in artist_ids]}
+
+    def tracks(self, track_ids):
+        self.threads.append(threading.current_thread())
+        return {'tracks': [{'id': track_id} for track_id in track_ids]}
+
+    def artist(self, artist_id):
+        return {'id': artist_id}
+
+    def track(self, track_id):
+        return {'id': track_id}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = FakeClient()
+    # Stand in for the client the shared lazy client would create
+    monkeypatch.setattr(spotify_async.sp, '_client', client)
+    return client
+
+
+def test_fetch_uses_worker_threads_outside_an_event_loop(client):
+    ids = [f'id{i}' for i in range(120)]
+
+    assert set(fetch_artists_by_id(ids)) == set(ids)
+    assert set(fetch_tracks_by_id(ids)) == set(ids)
+    assert len(client.threads) == 6
+    assert threading.current_thread() not in client.threads
+
+
+def test_fetch_falls_back_to_sync_requests_inside_a_running_loop(client):
+    ids = [f'id{i}' for i in range(120)]
+
+    async def fetch_from_loop():
+        return fetch_artists_by_id(ids), fetch_tracks_by_id(ids)
+
+    artists, tracks = asyncio.run(fetch_from_loop())
+
+    assert set(artists) == set(ids)
+    assert set(tracks) == set(ids)
+    assert client.threads == [threading.current_thread()] * 6
@@ -0,0 +1,113 @@
+"""Tests for the rate-limited Spotify client in model/spotify_client."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
+
+import pytest
+import spotipy
+
+from model.Rate_Limiter import TokenBucket
+from model.spotify_client import RateLimitedSpotify
+
+
+class _ThrottlingHandler(BaseHTTPRequestHandler):
+    """Answers the first request with 429 and Retry-After, and later ones with an artist."""
+
+    requests_seen = 0
+
+    def do_GET(self):
+        type(self).requests_seen += 1
+        if type(self).requests_seen == 1:
+            body = json.dumps({'error': {'status': 429, 'message': 'API rate limit exceeded'}})
+            self.send_response(429)
+            self.send_header('Retry-After', '7')
+        else:
+            body = json.dumps({'id': 'artist1', 'name': 'Artist One', 'genres': []})
+            self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body.encode('utf-8'))
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def throttling_server():
+    _ThrottlingHandler.requests_seen = 0
+    server = HTTPServer(('127.0.0.1', 0), _ThrottlingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_429_pauses_shared_rate_limiter(throttling_server):
+    rate_limiter = mock.Mock()
+    client = RateLimitedSpotify(auth='token', rate_limiter=rate_limiter, requests_timeout=5)
+    client.prefix = f"http://127.0.0.1:{throttling_server.server_port}/v1/"
+
+    artist = client.artist('artist1')
+
+    assert artist['name'] == 'Artist One'
+    assert _ThrottlingHandler.requests_seen == 2
+    # The 429 reached _internal_call, which paused the limiter for Retry-After
+    rate_limiter.pause.assert_called_once_with(7.0)
+    assert rate_limiter.acquire.call_count == 2
+
+
+def _throttled(retry_after):
+    return spotipy.SpotifyException(429, -1, 'API rate limit exceeded', headers={'Retry-After': retry_after})
+
+
+@pytest.fixture
+def clocked_client():
+    """Client whose rate limiter runs on a fake clock that advances only when it sleeps."""
+    clock = mock.Mock(now=0.0)
+    clock.side_effect = lambda: clock.now
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        clock.now += seconds
+
+    rate_limiter = TokenBucket(rate=4, capacity=4, clock=clock, sleep=sleep)
+    client = RateLimitedSpotify(auth='token', rate_limiter=rate_limiter, max_rate_limit_retries=2)
+    return client, sleeps
+
+
+def test_429_waits_for_retry_after_on_the_limiter_clock(clocked_client):
+    client, sleeps = clocked_client
+    with mock.patch.object(spotipy.Spotify, '_internal_call',
+                           side_effect=[_throttled('3'), _throttled('1.5'), {'id': 'artist1'}]) as call:
+        assert client._internal_call('GET', 'artists/artist1', None, {}) == {'id': 'artist1'}
+
+    assert call.call_count == 3
+    # Each retry waits out the pause, then for a token from the emptied bucket
+    assert sleeps == [3.0, 0.25, 1.5, 0.25]
+
+
+def test_429_is_raised_once_the_retries_are_used_up(clocked_client):
+    client, sleeps = clocked_client
+    with mock.patch.object(spotipy.Spotify, '_internal_call', side_effect=_throttled('1')) as call:
+        with pytest.raises(spotipy.SpotifyException) as raised:
+            client._internal_call('GET', 'artists/artist1', None, {})
+
+    assert raised.value.http_status == 429
+    assert call.call_count == 3
+    assert len(sleeps) == 4
+
+
+def test_other_errors_are_not_retried(clocked_client):
+    client, sleeps = clocked_client
+    error = spotipy.SpotifyException(404, -1, 'Not found')
+    with mock.patch.object(spotipy.Spotify, '_internal_call', side_effect=error) as call:
+        with pytest.raises(spotipy.SpotifyException):
+            client._internal_call('GET', 'artists/missing', None, {})
+
+    assert call.call_count == 1
+    assert sleeps == []
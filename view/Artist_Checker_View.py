@@ -2,29 +2,31 @@ import streamlit as st
 from model.Genre_Tools import load_artist_cache, save_artist_cache, get_artist_name_from_cache
 from model.Artist_Genres import search_artist_by_name, extract_artist_id_from_url
 from model.spotify_client import get_artist_with_retry
+from model.Artist_Record import ArtistRecord
 
 def update_tracks_for_artist(artist_id, artist_genres, cache):
     artist_name = get_artist_name_from_cache(artist_id, cache)
-    cache[artist_id] = {
-        'name': artist_name,
-        'genres': artist_genres,
-        'country': cache.get(artist_id, {}).get('country')
-    }
+    cache[artist_id] = ArtistRecord(
+        name=artist_name,
+        genres=artist_genres,
+        country=cache.get(artist_id, {}).get('country')
+    )
     save_artist_cache(cache)
     return artist_name
 
 def show_artist_genres(artist_id, cache):
     try:
-        artist_name = get_artist_name_from_cache(artist_id, cache)
         if artist_id not in cache or not cache[artist_id].get('genres'):
             artist = get_artist_with_retry(artist_id)
             artist_name = artist['name']
-            cache[artist_id] = {
-                'name': artist_name,
-                'genres': artist.get('genres', []),
-                'country': cache.get(artist_id, {}).get('country')
-            }
+            cache[artist_id] = ArtistRecord(
+                name=artist_name,
+                genres=artist.get('genres', []),
+                country=cache.get(artist_id, {}).get('country')
+            )
             save_artist_cache(cache)
+        else:
+            artist_name = get_artist_name_from_cache(artist_id, cache)
         genres = cache[artist_id].get('genres', [])
         st.write(f"**Artist:** {artist_name}")
         st.write(f"**Spotify ID:** {artist_id}")
@@ -42,9 +44,7 @@ def show_artist_genres(artist_id, cache):
 
 def artist_checker_view():
     st.title('Artist Checker')
-    if 'artist_cache' not in st.session_state:
-        st.session_state.artist_cache = load_artist_cache()
-    cache = st.session_state.artist_cache
+    cache = load_artist_cache()
     if 'artist_checker_menu' not in st.session_state:
         st.session_state.artist_checker_menu = 'menu'
     st.header('Artist Checker Menu')
@@ -63,6 +63,19 @@ def run_update_cache(progress_queue, error_queue):
     except Exception as e:
         error_queue.put(str(e))
 
+def run_refresh_stale_artists(progress_queue, error_queue):
+    """Run stale-only cache refresh in a separate thread."""
+    try:
+        def progress_callback(value):
+            progress_queue.put(value)
+            if st.session_state.cancel_flag:
+                raise Exception("Operation cancelled by user")
+        
+        Update_Cache.refresh_stale_artists(progress_callback=progress_callback)
+        progress_queue.put(1.0)
+    except Exception as e:
+        error_queue.put(str(e))
+
 def run_fix_custom_genres(playlist_id, progress_queue, error_queue):
     """Run fix custom genres in a separate thread."""
     try:
@@ -159,6 +172,24 @@ def show_main_menu():
             st.session_state.cache_thread.start()
             st.rerun()
     
+    if st.button('Refresh Stale Artists'):
+        if st.session_state.cache_thread and st.session_state.cache_thread.is_alive():
+            st.warning('Another operation is already running. Please wait or cancel it first.')
+        else:
+            # Reset state
+            st.session_state.cancel_flag = False
+            st.session_state.operation_status = "Refreshing Stale Artists..."
+            st.session_state.progress_queue = queue.Queue()
+            st.session_state.error_queue = queue.Queue()
+            
+            # Start thread
+            st.session_state.cache_thread = threading.Thread(
+                target=run_refresh_stale_artists,
+                args=(st.session_state.progress_queue, st.session_state.error_queue)
+            )
+            st.session_state.cache_thread.start()
+            st.rerun()
+    
     if st.button('Fix Custom Genres'):
         if playlist_id:
             if st.session_state.cache_thread and st.session_state.cache_thread.is_alive():
@@ -6,15 +6,16 @@ st.title('Manual Country Input')
 def get_artists_without_country(artist_cache):
     return [aid for aid, data in artist_cache.items() if data.get('country') is None]
 
-if 'country_artist_cache' not in st.session_state:
-    st.session_state.country_artist_cache = load_artist_cache()
-    st.session_state.country_artists = get_artists_without_country(st.session_state.country_artist_cache)
+# The shared artist cache is only re-read from disk when it changes, so load it on every rerun
+cache = load_artist_cache()
+
+if 'country_artists' not in st.session_state:
+    st.session_state.country_artists = get_artists_without_country(cache)
     st.session_state.country_index = 0
     st.session_state.country_processed = 0
     st.session_state.country_skipped = 0
 
 artists = st.session_state.country_artists
-cache = st.session_state.country_artist_cache
 idx = st.session_state.country_index
 
 if idx < len(artists):
@@ -1,9 +1,10 @@
 import streamlit as st
-from model.Genre_Tools import load_artist_cache, save_artist_cache, normalize_genre, deduplicate_hyphen_genres, get_artist_name_from_cache
+from model.Genre_Tools import load_artist_cache, save_artist_cache, normalize_genres_batch, get_artist_name_from_cache
+from model.Country_Tags import country_tagger
 
 def get_artists_without_genres(artist_cache):
     artists_without_genres = []
-    generic_regional_genres = {"brazilian music", "japanese music"}
+    generic_regional_genres = country_tagger.artist_tag_names()
     for artist_id, data in artist_cache.items():
         genres = data.get('genres', [])
         if not genres:
@@ -14,15 +15,16 @@ def get_artists_without_genres(artist_cache):
 
 st.title('Manual Genre Input')
 
-if 'artist_cache' not in st.session_state:
-    st.session_state.artist_cache = load_artist_cache()
-    st.session_state.artists = get_artists_without_genres(st.session_state.artist_cache)
+# The shared artist cache is only re-read from disk when it changes, so load it on every rerun
+cache = load_artist_cache()
+
+if 'artists' not in st.session_state:
+    st.session_state.artists = get_artists_without_genres(cache)
     st.session_state.current_index = 0
     st.session_state.processed = 0
     st.session_state.skipped = 0
 
 artists = st.session_state.artists
-cache = st.session_state.artist_cache
 idx = st.session_state.current_index
 
 if idx < len(artists):
@@ -37,10 +39,7 @@ if idx < len(artists):
     with col1:
         if st.button("Save Genres", key=f"save_{idx}"):
             genres = [g.strip() for g in genres_input.split(',') if g.strip()]
-            normalized_genres = []
-            for genre in genres:
-                normalized_genres.extend(normalize_genre(genre))
-            unique_genres = deduplicate_hyphen_genres(list(dict.fromkeys(normalized_genres)))
+            unique_genres = normalize_genres_batch([genres])[0]
             cache[artist_id]['genres'] = unique_genres
             save_artist_cache(cache)
             st.session_state.processed += 1
@@ -2,7 +2,7 @@ import streamlit as st
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from controller import Playlist_Creator, Fix_Custom_Genres, Genre_Lister, Genre_Ranker
+from controller import Playlist_Creator, Fix_Custom_Genres, Genre_Lister, Genre_Ranker, Genre_Analytics
 
 st.title('Playlist Tools')
 
@@ -51,5 +51,20 @@ if playlist_id:
             st.success('Genre ranking completed!')
         except Exception as e:
             st.error(f'Error ranking genres: {str(e)}')
+
+    # Related Genres
+    related_metric = st.selectbox('Similarity metric', Genre_Analytics.SIMILARITY_METRICS)
+    if st.button('Find Related Genres'):
+        try:
+            related = Genre_Analytics.analyze_playlist_genres(playlist_id, metric=related_metric)
+            st.dataframe([
+                {'Genre': genre, 'Related genre': related_genre, 'Similarity': round(similarity, 3),
+                 'Shared tracks': shared}
+                for genre, related_genres in related.items()
+                for related_genre, similarity, shared in related_genres
+            ])
+            st.success('Related genres found!')
+        except Exception as e:
+            st.error(f'Error finding related genres: {str(e)}')
 else:
     st.error('❌ No playlist ID available. Please enter a valid Spotify playlist URL in the main configuration.') 
\ No newline at end of file